@@ -1,13 +1,12 @@
 # PASO 8: Aplicación Flask principal
 # Archivo: app.py
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort
 from flask_login import (
     LoginManager, login_user, logout_user, login_required,
     current_user, UserMixin
 )
-from passlib.hash import pbkdf2_sha256
-
+import math
 import mysql.connector
 from config import Config
 from modulos import (
@@ -16,7 +15,32 @@ from modulos import (
     ArbolBinarioCultivos,
     ColaPrioridadAlertas,
     MetodosNumericos,
-    Algoritmos
+    Algoritmos,
+    SimulacionRiesgo,
+    PronosticoCosechas,
+    HashContrasenas,
+    ControlAdmision
+)
+from modulos.consultas import (
+    SQL_ALERTAS_COSECHA,
+    SQL_ALERTAS_MATERIALIZADAS,
+    SQL_INVALIDAR_ALERTAS_LOTE,
+    SQL_ELIMINAR_ALERTA_SIEMBRA,
+    SQL_INCREMENTAR_VERSION_LOTE,
+    SQL_INCREMENTAR_VERSION_SIEMBRA,
+    SQL_RESUMEN_DASHBOARD,
+    SQL_LISTAR_SIEMBRAS,
+    SQL_LOTES_ACTIVOS,
+    SQL_LISTAR_COSECHAS,
+    SQL_SIEMBRAS_SIN_COSECHA,
+    SQL_LISTAR_INSUMOS,
+    SQL_LISTAR_LOTES,
+    SQL_RENDIMIENTO_CULTIVOS,
+    SQL_RANKING_LOTES,
+    SQL_HISTORICO_PROYECCION,
+    SQL_COSTO_FIJO,
+    SQL_COSTO_VARIABLE,
+    SQL_PRECIO_PROMEDIO
 )
 from datetime import datetime, date
 
@@ -30,6 +54,20 @@ login_manager.init_app(app)
 login_manager.login_message = 'Por favor inicia sesión para acceder a esta página.'
 login_manager.login_message_category = 'info'
 
+# pbkdf2 fuera de los hilos del servidor: pool de procesos con cupo acotado
+hash_contrasenas = HashContrasenas(
+    rondas=getattr(Config, 'HASH_RONDAS', None),
+    procesos=getattr(Config, 'HASH_PROCESOS', 2),
+    limite=getattr(Config, 'HASH_LIMITE', 8),
+    espera_maxima=getattr(Config, 'HASH_ESPERA_MAXIMA', 5.0)
+)
+
+# Límites de concurrencia y de tasa por usuario para las rutas pesadas
+admision = ControlAdmision(
+    getattr(Config, 'ADMISION_RUTAS', None),
+    identificar=lambda: current_user.id if current_user.is_authenticated else None
+)
+
 
 class User(UserMixin):
     def __init__(self, id_usuario, email, nombre=None):
@@ -101,10 +139,24 @@ def ejecutar_query(query, params=None, fetch=True):
         print(f"Error en query: {err}")
         return None
 
+def actualizar_estadisticas(id_siembra):
+    """Lleva una siembra nueva o recién cosechada a las estadísticas incrementales"""
+    conexion = obtener_conexion()
+    if not conexion:
+        return
+    try:
+        user_id = current_user.id if current_user.is_authenticated else None
+        EstadisticasAgricolas(conexion).actualizar_siembra(id_siembra, user_id)
+    except mysql.connector.Error as err:
+        print(f"Error actualizando estadísticas: {err}")
+    finally:
+        conexion.close()
+
 # ==================== RUTA PRINCIPAL (DASHBOARD) ====================
 
 @app.route('/')
 @login_required
+@admision.limitar('index')
 def index():
     """
     Dashboard principal con resumen de estadísticas
@@ -124,75 +176,52 @@ def index():
     }
     
     # Consultar datos básicos
-    query_stats = """
-        SELECT 
-            COUNT(DISTINCT s.id_siembra) as total_siembras,
-            SUM(CASE WHEN s.estado != 'cosechado' THEN 1 ELSE 0 END) as siembras_activas,
-            COUNT(DISTINCT c.id_cosecha) as total_cosechas,
-            COALESCE(SUM(c.ingreso_total), 0) as ingreso_total
-        FROM siembra s
-        JOIN lote l ON s.id_lote = l.id_lote
-        JOIN finca f ON l.id_finca = f.id_finca
-        LEFT JOIN cosecha c ON s.id_siembra = c.id_siembra
-        WHERE f.user_id = %s
-    """
-    
-    resultado = ejecutar_query(query_stats, (current_user.id,))
+    resultado = ejecutar_query(SQL_RESUMEN_DASHBOARD, (current_user.id,))
     if resultado:
         stats = resultado[0]
     
     # Generar alertas con cola de prioridad (Estructura de Datos)
     cola_alertas = ColaPrioridadAlertas()
     
-    # Alertas: siembras próximas a cosechar
-    query_alertas = """
-        SELECT 
-            s.id_siembra,
-            cu.nombre as cultivo,
-            l.nombre as lote,
-            s.fecha_siembra,
-            cu.dias_cosecha_estimado,
-            DATEDIFF(CURDATE(), s.fecha_siembra) as dias_transcurridos
-        FROM siembra s
-        JOIN cultivo cu ON s.id_cultivo = cu.id_cultivo
-        JOIN lote l ON s.id_lote = l.id_lote
-        JOIN finca f ON l.id_finca = f.id_finca
-        LEFT JOIN cosecha co ON s.id_siembra = co.id_siembra
-        WHERE f.user_id = %s AND s.estado IN ('sembrado', 'crecimiento') AND co.id_cosecha IS NULL
-    """
-    
-    siembras = ejecutar_query(query_alertas, (current_user.id,))
-    alertas = []
-    
-    if siembras:
+    # Alertas: siembras próximas a cosechar. Se usa la lista que el job
+    # diario pre-materializa (aunque esté vacía); solo si no tiene la marca
+    # del día (no se refrescó o una escritura la invalidó) se consulta el
+    # rango acotado por fecha_cosecha_estimada.
+    materializadas = ejecutar_query(SQL_ALERTAS_MATERIALIZADAS, (current_user.id,))
+    if materializadas:
+        siembras = [s for s in materializadas if s['id_siembra'] is not None]
+    else:
+        siembras = ejecutar_query(SQL_ALERTAS_COSECHA, (current_user.id,))
+    
+    def generar_alertas(siembras):
         for siembra in siembras:
-            dias = siembra['dias_transcurridos']
-            dias_estimados = siembra['dias_cosecha_estimado']
-            
-            if dias >= dias_estimados - 5:  # Falta 5 días o menos
-                prioridad = 1  # Alta prioridad
+            if siembra['prioridad'] == 1:  # Falta 5 días o menos
                 mensaje = f"🔴 URGENTE: {siembra['cultivo']} en {siembra['lote']} listo para cosechar"
-            elif dias >= dias_estimados - 15:  # Falta 15 días o menos
-                prioridad = 2  # Media prioridad
+            else:  # Falta 15 días o menos
                 mensaje = f"🟡 {siembra['cultivo']} en {siembra['lote']} próximo a cosechar"
-            else:
-                prioridad = 3  # Baja prioridad
-                continue  # No mostrar alertas muy lejanas
             
-            cola_alertas.agregar_alerta(prioridad, mensaje, siembra['id_siembra'])
+            yield siembra['prioridad'], mensaje, siembra['id_siembra']
     
-    alertas = cola_alertas.obtener_todas()[:5]  # Top 5 alertas
+    # Carga masiva (heapify) y Top 5 sin ordenar todo el heap
+    cola_alertas.cargar_alertas(generar_alertas(siembras or []))
+    alertas = cola_alertas.top_k(5)
     
     # Generar gráfico de rendimientos (Estadística II)
     estadisticas = EstadisticasAgricolas(conexion)
     grafico_rendimientos = estadisticas.generar_grafico_rendimientos(user_id=current_user.id)
     
+    # Pronóstico de cosecha de todas las siembras activas (Métodos Numéricos)
+    pronosticos = PronosticoCosechas(conexion).pronosticar_activas(user_id=current_user.id)
+    kg_esperados = sum(p['kg_estimado'] for p in pronosticos)
+    
     conexion.close()
     
     return render_template('index.html', 
                          stats=stats, 
                          alertas=alertas,
-                         grafico=grafico_rendimientos)
+                         grafico=grafico_rendimientos,
+                         pronosticos=pronosticos[:5],
+                         kg_esperados=kg_esperados)
 
 # ==================== RUTAS DE SIEMBRAS ====================
 
@@ -203,23 +232,7 @@ def listar_siembras():
     Lista todas las siembras usando estructura de datos
     Demuestra: Lista Enlazada
     """
-    query = """
-        SELECT 
-            s.id_siembra,
-            l.nombre as lote,
-            c.nombre as cultivo,
-            s.fecha_siembra,
-            s.area_sembrada,
-            s.estado
-        FROM siembra s
-        JOIN lote l ON s.id_lote = l.id_lote
-        JOIN finca f ON l.id_finca = f.id_finca
-        JOIN cultivo c ON s.id_cultivo = c.id_cultivo
-        WHERE f.user_id = %s
-        ORDER BY s.fecha_siembra DESC
-    """
-    
-    siembras = ejecutar_query(query, (current_user.id,))
+    siembras = ejecutar_query(SQL_LISTAR_SIEMBRAS, (current_user.id,))
     
     # Almacenar en lista enlazada (Estructura de Datos)
     lista_siembras = ListaEnlazadaSiembras()
@@ -228,19 +241,12 @@ def listar_siembras():
             lista_siembras.agregar_siembra(siembra)
     
     # Obtener datos de lotes y cultivos para el formulario
-    lotes = ejecutar_query(
-        """
-        SELECT l.* FROM lote l
-        JOIN finca f ON l.id_finca = f.id_finca
-        WHERE l.estado = 'activo' AND f.user_id = %s
-        ORDER BY l.nombre
-        """,
-        (current_user.id,)
-    )
+    lotes = ejecutar_query(SQL_LOTES_ACTIVOS, (current_user.id,))
     cultivos = ejecutar_query("SELECT * FROM cultivo")
     
+    # La lista se recorre de forma perezosa en la plantilla (sin copia)
     return render_template('siembras.html', 
-                         siembras=lista_siembras.obtener_todas(),
+                         siembras=lista_siembras,
                          lotes=lotes,
                          cultivos=cultivos)
 
@@ -257,16 +263,24 @@ def agregar_siembra():
         
         query = """
             INSERT INTO siembra 
-            (id_lote, id_cultivo, fecha_siembra, area_sembrada, cantidad_semilla, costo_siembra)
-            VALUES (%s, %s, %s, %s, %s, %s)
+            (id_lote, id_cultivo, fecha_siembra, area_sembrada, cantidad_semilla, costo_siembra,
+             fecha_cosecha_estimada)
+            VALUES (%s, %s, %s, %s, %s, %s,
+                    DATE_ADD(%s, INTERVAL (SELECT COALESCE(dias_cosecha_estimado, 90)
+                                           FROM cultivo WHERE id_cultivo = %s) DAY))
         """
         
         resultado = ejecutar_query(query, 
                                   (id_lote, id_cultivo, fecha_siembra, 
-                                   area_sembrada, cantidad_semilla, costo_siembra),
+                                   area_sembrada, cantidad_semilla, costo_siembra,
+                                   fecha_siembra, id_cultivo),
                                   fetch=False)
         
         if resultado:
+            # La lista de alertas materializada del dueño ya no está al día
+            ejecutar_query(SQL_INVALIDAR_ALERTAS_LOTE, (id_lote,), fetch=False)
+            ejecutar_query(SQL_INCREMENTAR_VERSION_LOTE, (id_lote,), fetch=False)
+            actualizar_estadisticas(resultado)
             flash('Siembra registrada exitosamente', 'success')
         else:
             flash('Error al registrar siembra', 'danger')
@@ -299,21 +313,21 @@ def buscar_siembra():
         return jsonify({'error': 'No hay siembras registradas'})
     
     # Comparar algoritmos (Análisis de Algoritmos)
-    resultado = Algoritmos.comparar_algoritmos_busqueda(siembras, id_buscar)
+    # Una sola corrida medida: la medición repetida queda para modulos/benchmark.py
+    resultado = Algoritmos.comparar_algoritmos_busqueda(siembras, id_buscar, repeticiones=1, calentamiento=0)
 
     detalle = None
     if resultado['lineal']['encontrado']:
-        for s in siembras:
-            if int(s.get('id_siembra')) == id_buscar:
-                detalle = {
-                    'id_siembra': s.get('id_siembra'),
-                    'lote': s.get('lote'),
-                    'cultivo': s.get('cultivo'),
-                    'fecha_siembra': s.get('fecha_siembra'),
-                    'area_sembrada': float(s.get('area_sembrada') or 0),
-                    'estado': s.get('estado'),
-                }
-                break
+        # El índice de la búsqueda lineal apunta a la lista original
+        s = siembras[resultado['lineal']['indice']]
+        detalle = {
+            'id_siembra': s.get('id_siembra'),
+            'lote': s.get('lote'),
+            'cultivo': s.get('cultivo'),
+            'fecha_siembra': s.get('fecha_siembra'),
+            'area_sembrada': float(s.get('area_sembrada') or 0),
+            'estado': s.get('estado'),
+        }
     
     return jsonify({
         'encontrado': resultado['lineal']['encontrado'],
@@ -330,43 +344,10 @@ def buscar_siembra():
 @login_required
 def listar_cosechas():
     """Lista todas las cosechas registradas"""
-    query = """
-        SELECT 
-            co.id_cosecha,
-            c.nombre as cultivo,
-            l.nombre as lote,
-            s.fecha_siembra,
-            co.fecha_cosecha,
-            co.cantidad_kg,
-            s.area_sembrada,
-            co.cantidad_kg / s.area_sembrada as rendimiento,
-            co.ingreso_total
-        FROM cosecha co
-        JOIN siembra s ON co.id_siembra = s.id_siembra
-        JOIN cultivo c ON s.id_cultivo = c.id_cultivo
-        JOIN lote l ON s.id_lote = l.id_lote
-        JOIN finca f ON l.id_finca = f.id_finca
-        WHERE f.user_id = %s
-        ORDER BY co.fecha_cosecha DESC
-    """
-    
-    cosechas = ejecutar_query(query, (current_user.id,))
+    cosechas = ejecutar_query(SQL_LISTAR_COSECHAS, (current_user.id,))
     
     # Obtener siembras sin cosechar para el formulario
-    siembras_disponibles = ejecutar_query(
-        """
-        SELECT 
-            s.id_siembra,
-            CONCAT(c.nombre, ' - Lote ', l.nombre, ' (', s.fecha_siembra, ')') as descripcion
-        FROM siembra s
-        JOIN cultivo c ON s.id_cultivo = c.id_cultivo
-        JOIN lote l ON s.id_lote = l.id_lote
-        JOIN finca f ON l.id_finca = f.id_finca
-        LEFT JOIN cosecha co ON s.id_siembra = co.id_siembra
-        WHERE f.user_id = %s AND s.estado != 'cosechado' AND co.id_cosecha IS NULL
-    """,
-        (current_user.id,)
-    )
+    siembras_disponibles = ejecutar_query(SQL_SIEMBRAS_SIN_COSECHA, (current_user.id,))
     
     return render_template('cosechas.html', 
                          cosechas=cosechas,
@@ -400,6 +381,9 @@ def agregar_cosecha():
             # Actualizar estado de siembra
             ejecutar_query("UPDATE siembra SET estado = 'cosechado' WHERE id_siembra = %s",
                          (id_siembra,), fetch=False)
+            ejecutar_query(SQL_ELIMINAR_ALERTA_SIEMBRA, (id_siembra,), fetch=False)
+            ejecutar_query(SQL_INCREMENTAR_VERSION_SIEMBRA, (id_siembra,), fetch=False)
+            actualizar_estadisticas(id_siembra)
             flash('Cosecha registrada exitosamente', 'success')
         else:
             flash('Error al registrar cosecha', 'danger')
@@ -415,17 +399,7 @@ def agregar_cosecha():
 @login_required
 def listar_insumos():
     """Lista inventario de insumos"""
-    query = """
-        SELECT 
-            i.*,
-            f.nombre as finca
-        FROM insumo i
-        JOIN finca f ON i.id_finca = f.id_finca
-        WHERE f.user_id = %s
-        ORDER BY i.cantidad_disponible ASC
-    """
-    
-    insumos = ejecutar_query(query, (current_user.id,))
+    insumos = ejecutar_query(SQL_LISTAR_INSUMOS, (current_user.id,))
     
     # Alertas de stock bajo
     alertas_stock = []
@@ -482,16 +456,7 @@ def agregar_finca():
 @app.route('/lotes')
 @login_required
 def listar_lotes():
-    lotes = ejecutar_query(
-        """
-        SELECT l.*, f.nombre AS finca
-        FROM lote l
-        JOIN finca f ON l.id_finca = f.id_finca
-        WHERE f.user_id = %s
-        ORDER BY f.nombre, l.nombre
-        """,
-        (current_user.id,)
-    )
+    lotes = ejecutar_query(SQL_LISTAR_LOTES, (current_user.id,))
     fincas = ejecutar_query(
         "SELECT id_finca, nombre FROM finca WHERE user_id = %s ORDER BY nombre",
         (current_user.id,)
@@ -571,6 +536,7 @@ def agregar_insumo():
 
 @app.route('/reportes')
 @login_required
+@admision.limitar('reportes')
 def reportes():
     """
     Página de reportes y análisis
@@ -589,42 +555,17 @@ def reportes():
     correlacion = estadisticas.correlacion_insumo_rendimiento(user_id=current_user.id)
     grafico_correlacion = estadisticas.generar_grafico_correlacion(user_id=current_user.id)
     
-    # 3. RANKING DE LOTES (Algoritmos - QuickSort)
-    query_lotes = """
-        SELECT 
-            l.nombre as lote,
-            AVG(co.cantidad_kg / s.area_sembrada) as rendimiento,
-            COUNT(s.id_siembra) as total_siembras
-        FROM lote l
-        JOIN siembra s ON l.id_lote = s.id_lote
-        JOIN cosecha co ON s.id_siembra = co.id_siembra
-        JOIN finca f ON l.id_finca = f.id_finca
-        WHERE f.user_id = %s
-        GROUP BY l.id_lote
-        HAVING COUNT(s.id_siembra) > 0
-    """
-    
-    lotes_data = ejecutar_query(query_lotes, (current_user.id,))
-    ranking = []
-    if lotes_data:
-        ranking = Algoritmos.ranking_lotes(lotes_data)
+    # 3. RANKING DE LOTES (Algoritmos - Top-k)
+    # El ranking se resuelve en MySQL con ORDER BY ... LIMIT para no traer
+    # ni ordenar todos los lotes en Python.
+    criterio = request.args.get('criterio', 'rendimiento')
+    if criterio not in Algoritmos.CRITERIOS_RANKING:
+        criterio = 'rendimiento'
+    ranking = ejecutar_query(SQL_RANKING_LOTES.format(criterio=criterio), (current_user.id, 5)) or []
     
     # 4. PROYECCIÓN DE PRODUCCIÓN (Métodos Numéricos - Interpolación)
     proyeccion = None
-    query_historico = """
-        SELECT 
-            DATEDIFF(co.fecha_cosecha, s.fecha_siembra) as dia,
-            co.cantidad_kg as kg
-        FROM cosecha co
-        JOIN siembra s ON co.id_siembra = s.id_siembra
-        JOIN lote l ON s.id_lote = l.id_lote
-        JOIN finca f ON l.id_finca = f.id_finca
-        WHERE f.user_id = %s
-        ORDER BY s.fecha_siembra
-        LIMIT 10
-    """
-    
-    datos_historicos = ejecutar_query(query_historico, (current_user.id,))
+    datos_historicos = ejecutar_query(SQL_HISTORICO_PROYECCION, (current_user.id,))
     if datos_historicos and len(datos_historicos) >= 3:
         # Proyectar para los próximos 30, 60, 90 días
         proyeccion = MetodosNumericos.proyectar_produccion(
@@ -632,27 +573,11 @@ def reportes():
             [30, 60, 90, 120]
         )
     
-    # 5. PUNTO DE EQUILIBRIO (Métodos Numéricos - Bisección)
+    # 5. PUNTO DE EQUILIBRIO (Métodos Numéricos - solución analítica)
     # Costo fijo: promedio de costo de siembra
-    costo_fijo_row = ejecutar_query("""
-        SELECT AVG(s.costo_siembra) as costo_fijo
-        FROM siembra s
-        JOIN lote l ON s.id_lote = l.id_lote
-        JOIN finca f ON l.id_finca = f.id_finca
-        WHERE f.user_id = %s
-    """, (current_user.id,))
+    costo_fijo_row = ejecutar_query(SQL_COSTO_FIJO, (current_user.id,))
     # Costo variable estimado por kg producido: suma de costos de aplicación / suma de kg cosechados
-    costo_var_row = ejecutar_query("""
-        SELECT 
-            COALESCE(SUM(ai.costo_aplicacion), 0) AS costo_apps,
-            COALESCE(SUM(co.cantidad_kg), 0) AS kg_totales
-        FROM siembra s
-        JOIN lote l ON s.id_lote = l.id_lote
-        JOIN finca f ON l.id_finca = f.id_finca
-        LEFT JOIN aplicacion_insumo ai ON ai.id_siembra = s.id_siembra
-        LEFT JOIN cosecha co ON co.id_siembra = s.id_siembra
-        WHERE f.user_id = %s
-    """, (current_user.id,))
+    costo_var_row = ejecutar_query(SQL_COSTO_VARIABLE, (current_user.id,))
     
     punto_equilibrio = None
     costo_fijo = costo_fijo_row[0].get('costo_fijo') if costo_fijo_row else None
@@ -663,14 +588,7 @@ def reportes():
         costo_variable = float(costo_apps) / float(kg_totales)
     
     if costo_fijo is not None:
-        precio_venta_promedio = ejecutar_query("""
-            SELECT AVG(co.precio_venta_kg) as precio 
-            FROM cosecha co
-            JOIN siembra s ON co.id_siembra = s.id_siembra
-            JOIN lote l ON s.id_lote = l.id_lote
-            JOIN finca f ON l.id_finca = f.id_finca
-            WHERE co.precio_venta_kg > 0 AND f.user_id = %s
-        """, (current_user.id,))
+        precio_venta_promedio = ejecutar_query(SQL_PRECIO_PROMEDIO, (current_user.id,))
         precio_prom = precio_venta_promedio[0].get('precio') if precio_venta_promedio else None
         if precio_prom is not None and float(precio_prom) > 0 and costo_variable is not None:
             punto_eq = MetodosNumericos.calcular_punto_equilibrio(
@@ -681,6 +599,36 @@ def reportes():
             if punto_eq is not None:
                 punto_equilibrio = round(punto_eq, 2)
     
+    escenarios_riesgo = getattr(Config, 'SIMULACION_ESCENARIOS', 2000)
+    
+    def analizar_hechos(tabla_hechos):
+        """Equilibrio por cultivo, riesgo y pronóstico: se recalculan solo si cambian los datos del usuario"""
+        # Punto de equilibrio por cultivo (vectorizado) y su sensibilidad a un
+        # precio de venta 10% menor / mayor
+        equilibrio_cultivos = MetodosNumericos.equilibrio_por_grupo(tabla_hechos, ('cultivo',))
+        if equilibrio_cultivos:
+            malla = MetodosNumericos.sensibilidad_equilibrio(
+                [g['costo_fijo'] for g in equilibrio_cultivos],
+                [g['costo_variable'] if g['costo_variable'] is not None else math.nan for g in equilibrio_cultivos],
+                [g['precio'] if g['precio'] is not None else math.nan for g in equilibrio_cultivos],
+                variacion=0.1, pasos=3)
+            for grupo, cantidades in zip(equilibrio_cultivos, malla['cantidades']):
+                grupo['precio_bajo'] = None if math.isnan(cantidades[0, 1]) else float(cantidades[0, 1])
+                grupo['precio_alto'] = None if math.isnan(cantidades[2, 1]) else float(cantidades[2, 1])
+        
+        # 6. RIESGO (Estadística II - Monte Carlo) de las siembras activas por finca
+        riesgo_fincas = None
+        if len(tabla_hechos):
+            riesgo_fincas = SimulacionRiesgo.simular_activas(tabla_hechos, escenarios=escenarios_riesgo)['fincas']
+        
+        # 7. PRONÓSTICO de cosecha de las siembras activas por cultivo
+        pronostico_cultivos = PronosticoCosechas.resumen_por_cultivo(
+            PronosticoCosechas(conexion).pronosticar_activas(user_id=current_user.id))
+        return equilibrio_cultivos, riesgo_fincas, pronostico_cultivos
+    
+    equilibrio_cultivos, riesgo_fincas, pronostico_cultivos = estadisticas.analisis_cacheado(
+        current_user.id, ('reportes', escenarios_riesgo), analizar_hechos)
+    
     conexion.close()
     
     return render_template('reportes.html',
@@ -688,8 +636,13 @@ def reportes():
                          correlacion=correlacion,
                          grafico_correlacion=grafico_correlacion,
                          ranking=ranking,
+                         criterio=criterio,
                          proyeccion=proyeccion,
-                         punto_equilibrio=punto_equilibrio)
+                         punto_equilibrio=punto_equilibrio,
+                         equilibrio_cultivos=equilibrio_cultivos,
+                         riesgo_fincas=riesgo_fincas,
+                         escenarios_riesgo=escenarios_riesgo,
+                         pronostico_cultivos=pronostico_cultivos)
 
 # ==================== RUTA DE DEMOSTRACIÓN ====================
 
@@ -703,17 +656,7 @@ def demo_estructuras():
     # Árbol binario de búsqueda
     arbol = ArbolBinarioCultivos()
     
-    query = """
-        SELECT 
-            c.nombre as cultivo,
-            AVG(co.cantidad_kg / s.area_sembrada) as rendimiento
-        FROM cultivo c
-        JOIN siembra s ON c.id_cultivo = s.id_cultivo
-        JOIN cosecha co ON s.id_siembra = co.id_siembra
-        GROUP BY c.id_cultivo
-    """
-    
-    cultivos = ejecutar_query(query)
+    cultivos = ejecutar_query(SQL_RENDIMIENTO_CULTIVOS)
     
     if cultivos:
         for cultivo in cultivos:
@@ -727,6 +670,27 @@ def demo_estructuras():
         'descripcion': 'Cultivos organizados por rendimiento (kg/ha)'
     })
 
+# ==================== MÉTRICAS ====================
+
+@app.route('/metricas')
+def metricas():
+    """
+    Métricas de operación para ajustar los límites de concurrencia.
+    Son globales (de todos los usuarios): solo las ven los emails de
+    METRICAS_ADMINS o, si METRICAS_LOCALHOST está activo, las peticiones
+    locales (no activarlo detrás de un proxy en la misma máquina).
+    """
+    admin = (current_user.is_authenticated
+             and current_user.email in getattr(Config, 'METRICAS_ADMINS', ()))
+    local = (getattr(Config, 'METRICAS_LOCALHOST', False)
+             and request.remote_addr in ('127.0.0.1', '::1'))
+    if not (admin or local):
+        abort(404)
+    return jsonify({
+        'hash_contrasenas': hash_contrasenas.metricas(),
+        'admision': admision.metricas()
+    })
+
 # ==================== RUTAS DE AUTENTICACIÓN ====================
 
 @app.route('/auth/login', methods=['GET', 'POST'])
@@ -735,7 +699,20 @@ def login():
         email = request.form.get('email', '').strip().lower()
         password = request.form.get('password', '')
         row = User.get_by_email(email)
-        if row and pbkdf2_sha256.verify(password, row['password_hash']):
+        valida, nuevo_hash = False, None
+        if row:
+            try:
+                valida, nuevo_hash = hash_contrasenas.verificar(password, row['password_hash'])
+            except TimeoutError:
+                flash('Servidor ocupado, intenta de nuevo en unos segundos', 'warning')
+                return render_template('auth_login.html'), 503, {'Retry-After': '5'}
+        if valida:
+            if nuevo_hash:
+                # El hash guardado usa otro costo: se reemplaza por uno con las rondas configuradas
+                ejecutar_query(
+                    "UPDATE usuario SET password_hash = %s WHERE id_usuario = %s",
+                    (nuevo_hash, row['id_usuario']), fetch=False
+                )
             user = User(row['id_usuario'], row['email'], row.get('nombre'))
             login_user(user)
             flash('Bienvenido', 'success')
@@ -757,7 +734,11 @@ def register():
         if User.get_by_email(email):
             flash('El email ya está registrado', 'warning')
             return render_template('auth_register.html')
-        pwd_hash = pbkdf2_sha256.hash(password)
+        try:
+            pwd_hash = hash_contrasenas.hashear(password)
+        except TimeoutError:
+            flash('Servidor ocupado, intenta de nuevo en unos segundos', 'warning')
+            return render_template('auth_register.html'), 503, {'Retry-After': '5'}
         ejecutar_query(
             "INSERT INTO usuario (email, password_hash, nombre) VALUES (%s, %s, %s)",
             (email, pwd_hash, nombre), fetch=False
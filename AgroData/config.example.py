@@ -9,3 +9,23 @@ class Config:
 
     SECRET_KEY = 'replace-this-key'
     DEBUG = True
+
+    # Hashing de contraseñas (pool de procesos acotado)
+    HASH_RONDAS = 29000        # al cambiarlo, los hashes se actualizan en el siguiente login
+    HASH_PROCESOS = 2          # 0 = hashear en el hilo de la petición
+    HASH_LIMITE = 8            # operaciones de contraseña en vuelo
+    HASH_ESPERA_MAXIMA = 5.0   # segundos de espera por cupo antes de responder 503
+
+    # Control de admisión de rutas pesadas (por proceso): limite = en ejecución,
+    # cola = en espera, espera = segundos máximos en cola, tasa/rafaga = cubeta por usuario
+    ADMISION_RUTAS = {
+        'index': {'limite': 8, 'cola': 16, 'espera': 2.0, 'tasa': 1.0, 'rafaga': 5},
+        'reportes': {'limite': 2, 'cola': 4, 'espera': 5.0, 'tasa': 0.2, 'rafaga': 3},
+    }
+
+    # Escenarios Monte Carlo de la sección de riesgo en /reportes
+    SIMULACION_ESCENARIOS = 2000
+
+    # Acceso a /metricas (estado global de límites y del pool de hashing)
+    METRICAS_ADMINS = ()          # emails autorizados, ej: ('admin@agrodata.com',)
+    METRICAS_LOCALHOST = False    # permitir peticiones desde 127.0.0.1 / ::1 sin sesión
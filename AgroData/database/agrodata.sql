@@ -7,6 +7,8 @@ CREATE DATABASE IF NOT EXISTS agrodata;
 USE agrodata;
 
 -- Eliminar tablas si existen (en orden inverso por dependencias)
+DROP TABLE IF EXISTS alerta_cosecha_refresco;
+DROP TABLE IF EXISTS alerta_cosecha;
 DROP TABLE IF EXISTS aplicacion_insumo;
 DROP TABLE IF EXISTS cosecha;
 DROP TABLE IF EXISTS siembra;
@@ -63,6 +65,7 @@ CREATE TABLE siembra (
     cantidad_semilla DECIMAL(10,2),
     costo_siembra DECIMAL(10,2),
     estado ENUM('sembrado', 'crecimiento', 'floracion', 'cosechado', 'perdido') DEFAULT 'sembrado',
+    fecha_cosecha_estimada DATE,
     observaciones TEXT,
     FOREIGN KEY (id_lote) REFERENCES lote(id_lote) ON DELETE CASCADE,
     FOREIGN KEY (id_cultivo) REFERENCES cultivo(id_cultivo) ON DELETE CASCADE
@@ -139,6 +142,11 @@ INSERT INTO siembra (id_lote, id_cultivo, fecha_siembra, area_sembrada, cantidad
 (4, 4, '2024-02-20', 12.00, 1800.00, 3000.00, 'cosechado'),
 (1, 5, '2024-01-10', 10.00, 180.00, 1200.00, 'cosechado');
 
+-- Fecha estimada de cosecha (fecha de siembra + días estimados del cultivo)
+UPDATE siembra s
+JOIN cultivo c ON s.id_cultivo = c.id_cultivo
+SET s.fecha_cosecha_estimada = DATE_ADD(s.fecha_siembra, INTERVAL COALESCE(c.dias_cosecha_estimado, 90) DAY);
+
 -- Insertar cosechas de ejemplo
 INSERT INTO cosecha (id_siembra, fecha_cosecha, cantidad_kg, calidad_porcentaje, precio_venta_kg, ingreso_total) VALUES
 (4, '2024-05-30', 28500.00, 95.00, 0.60, 17100.00),
@@ -163,6 +171,7 @@ CREATE INDEX idx_siembra_fecha ON siembra(fecha_siembra);
 CREATE INDEX idx_cosecha_fecha ON cosecha(fecha_cosecha);
 CREATE INDEX idx_lote_finca ON lote(id_finca);
 CREATE INDEX idx_siembra_estado ON siembra(estado);
+CREATE INDEX idx_siembra_lote_cosecha_estimada ON siembra(id_lote, fecha_cosecha_estimada);
 
 -- ==================== VISTAS ÚTILES ====================
 
@@ -222,6 +231,8 @@ JOIN finca f ON i.id_finca = f.id_finca;
 
 -- ==================== PROCEDIMIENTOS ALMACENADOS ====================
 
+DROP PROCEDURE IF EXISTS calcular_rendimiento_siembra;
+
 DELIMITER //
 
 -- Procedimiento: Calcular rendimiento de una siembra
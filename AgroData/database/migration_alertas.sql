@@ -0,0 +1,36 @@
+-- Migración: fecha estimada de cosecha y alertas pre-materializadas
+-- Requiere migration_auth.sql (tabla usuario y finca.user_id)
+USE agrodata;
+
+-- Fecha estimada de cosecha por siembra (se mantiene al insertar desde app.py)
+ALTER TABLE siembra ADD COLUMN IF NOT EXISTS fecha_cosecha_estimada DATE AFTER estado;
+CREATE INDEX IF NOT EXISTS idx_siembra_lote_cosecha_estimada ON siembra(id_lote, fecha_cosecha_estimada);
+
+UPDATE siembra s
+JOIN cultivo c ON s.id_cultivo = c.id_cultivo
+SET s.fecha_cosecha_estimada = DATE_ADD(s.fecha_siembra, INTERVAL COALESCE(c.dias_cosecha_estimado, 90) DAY)
+WHERE s.fecha_cosecha_estimada IS NULL;
+
+-- Alertas de cosecha pre-calculadas por usuario (scripts/refrescar_alertas.py)
+CREATE TABLE IF NOT EXISTS alerta_cosecha (
+    user_id INT NOT NULL,
+    id_siembra INT NOT NULL,
+    cultivo VARCHAR(100),
+    lote VARCHAR(50),
+    fecha_cosecha_estimada DATE NOT NULL,
+    prioridad TINYINT NOT NULL,
+    fecha_calculo DATE NOT NULL,
+    PRIMARY KEY (user_id, id_siembra),
+    INDEX idx_alerta_usuario_fecha (user_id, fecha_calculo, prioridad),
+    INDEX idx_alerta_siembra (id_siembra),
+    FOREIGN KEY (user_id) REFERENCES usuario(id_usuario) ON DELETE CASCADE,
+    FOREIGN KEY (id_siembra) REFERENCES siembra(id_siembra) ON DELETE CASCADE
+);
+
+-- Usuarios cuya lista de alertas está al día (refrescada en fecha_calculo y
+-- sin escrituras posteriores). Sin fila, el dashboard consulta en vivo.
+CREATE TABLE IF NOT EXISTS alerta_cosecha_refresco (
+    user_id INT NOT NULL PRIMARY KEY,
+    fecha_calculo DATE NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES usuario(id_usuario) ON DELETE CASCADE
+);
@@ -0,0 +1,17 @@
+-- Migración: versión de los datos por usuario (valida las estadísticas cacheadas)
+-- Requiere migration_auth.sql (finca.user_id)
+USE agrodata;
+
+-- Se incrementa en cada escritura de siembras, cosechas o aplicaciones del
+-- usuario (app.py y scripts de carga). user_id = 0: fincas sin dueño.
+CREATE TABLE IF NOT EXISTS version_datos (
+    user_id INT NOT NULL PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+-- Invalida los cachés de todos los procesos tras aplicar la migración
+INSERT INTO version_datos (user_id, version)
+SELECT DISTINCT COALESCE(f.user_id, 0), 1
+FROM finca f
+WHERE 1 = 1
+ON DUPLICATE KEY UPDATE version = version + 1;
@@ -13,17 +13,42 @@ Contiene implementaciones de:
 from .estadisticas import EstadisticasAgricolas
 from .estructuras import (
     ListaEnlazadaSiembras,
+    IndiceFechasSiembras,
     ArbolBinarioCultivos,
     ColaPrioridadAlertas
 )
 from .metodos_numericos import MetodosNumericos
 from .algoritmos import Algoritmos
+from .benchmark import Benchmark
+from .columnar import TablaColumnar
+from .snapshots import SnapshotsAnaliticos
+from .segmentos import Segmentos
+from .simulacion import SimulacionRiesgo
+from .acumuladores import AcumuladorEstadistico, EstadisticasIncrementales
+from .pronostico import PronosticoCosechas
+from .cargador_sql import CargadorSQL
+from .generador_datos import GeneradorDatos
+from .contrasenas import HashContrasenas
+from .admision import ControlAdmision
 
 __all__ = [
     'EstadisticasAgricolas',
     'ListaEnlazadaSiembras',
+    'IndiceFechasSiembras',
     'ArbolBinarioCultivos',
     'ColaPrioridadAlertas',
     'MetodosNumericos',
-    'Algoritmos'
+    'Algoritmos',
+    'Benchmark',
+    'TablaColumnar',
+    'SnapshotsAnaliticos',
+    'Segmentos',
+    'SimulacionRiesgo',
+    'AcumuladorEstadistico',
+    'EstadisticasIncrementales',
+    'PronosticoCosechas',
+    'CargadorSQL',
+    'GeneradorDatos',
+    'HashContrasenas',
+    'ControlAdmision'
 ]
\ No newline at end of file
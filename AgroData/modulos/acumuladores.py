@@ -0,0 +1,242 @@
+# Módulo de estadísticas incrementales (un solo recorrido, combinables)
+# Archivo: modulos/acumuladores.py
+
+import bisect
+import math
+
+
+class HistogramaStreaming:
+    """
+    Resumen aproximado de cuantiles con un número fijo de centroides
+    (histograma en streaming de Ben-Haim y Tom-Tov). Se actualiza en
+    O(B) por valor, ocupa O(B) memoria y dos histogramas se pueden
+    combinar, lo que permite calcular cuantiles por particiones.
+    Con menos de B valores distintos los cuantiles son exactos.
+    """
+    __slots__ = ('max_centroides', 'valores', 'conteos', 'total')
+
+    def __init__(self, max_centroides=64):
+        self.max_centroides = max_centroides
+        self.valores = []   # Centroides ordenados
+        self.conteos = []
+        self.total = 0
+
+    def agregar(self, x, conteo=1):
+        """Agrega un valor (o varios iguales) - O(B)"""
+        i = bisect.bisect_left(self.valores, x)
+        if i < len(self.valores) and self.valores[i] == x:
+            self.conteos[i] += conteo
+        else:
+            self.valores.insert(i, x)
+            self.conteos.insert(i, conteo)
+        self.total += conteo
+        self._reducir()
+
+    def quitar(self, x, conteo=1):
+        """Resta un valor del centroide más cercano (aproximado) - O(log B)"""
+        if not self.valores:
+            return
+        i = bisect.bisect_left(self.valores, x)
+        if i == len(self.valores) or (i > 0 and x - self.valores[i - 1] < self.valores[i] - x):
+            i -= 1
+        self.conteos[i] -= conteo
+        self.total -= conteo
+        if self.conteos[i] <= 0:
+            self.total -= self.conteos[i]
+            del self.valores[i]
+            del self.conteos[i]
+
+    def _reducir(self):
+        """Fusiona los centroides más cercanos hasta respetar el máximo"""
+        while len(self.valores) > self.max_centroides:
+            i = min(range(len(self.valores) - 1),
+                    key=lambda j: self.valores[j + 1] - self.valores[j])
+            n1, n2 = self.conteos[i], self.conteos[i + 1]
+            self.valores[i] = (self.valores[i] * n1 + self.valores[i + 1] * n2) / (n1 + n2)
+            self.conteos[i] = n1 + n2
+            del self.valores[i + 1]
+            del self.conteos[i + 1]
+
+    def combinar(self, otro):
+        """Incorpora otro histograma (particiones distintas) - O(B log B)"""
+        pares = sorted(zip(self.valores + otro.valores, self.conteos + otro.conteos))
+        self.valores, self.conteos = [], []
+        for valor, conteo in pares:
+            if self.valores and self.valores[-1] == valor:
+                self.conteos[-1] += conteo
+            else:
+                self.valores.append(valor)
+                self.conteos.append(conteo)
+        self.total += otro.total
+        self._reducir()
+        return self
+
+    def cuantil(self, q, minimo=None, maximo=None):
+        """
+        Estima el cuantil q (0..1) interpolando entre centroides.
+        minimo/maximo exactos, si se conocen, acotan los extremos.
+        """
+        if not self.valores:
+            return None
+        objetivo = q * self.total
+        acumulado = 0.0
+        anterior_pos, anterior_val = 0.0, minimo if minimo is not None else self.valores[0]
+        for valor, conteo in zip(self.valores, self.conteos):
+            posicion = acumulado + conteo / 2
+            if objetivo <= posicion:
+                if posicion == anterior_pos:
+                    return valor
+                t = (objetivo - anterior_pos) / (posicion - anterior_pos)
+                return anterior_val + t * (valor - anterior_val)
+            anterior_pos, anterior_val = posicion, valor
+            acumulado += conteo
+        return maximo if maximo is not None else self.valores[-1]
+
+
+class AcumuladorEstadistico:
+    """
+    Estadísticas descriptivas en un solo recorrido: media y varianza con
+    el algoritmo de Welford, mínimo/máximo y mediana aproximada con un
+    HistogramaStreaming. Admite quitar o reemplazar valores y combinar
+    acumuladores de distintas particiones (fórmula de Chan et al.).
+    Demuestra: Estadística II - Momentos muestrales incrementales
+    """
+    __slots__ = ('n', 'media', 'm2', 'minimo', 'maximo', 'histograma')
+
+    def __init__(self, max_centroides=64):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.histograma = HistogramaStreaming(max_centroides)
+
+    def agregar(self, x):
+        """Agrega una observación - O(1) + O(B) del histograma"""
+        x = float(x)
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (x - self.media)
+        self.minimo = min(self.minimo, x)
+        self.maximo = max(self.maximo, x)
+        self.histograma.agregar(x)
+
+    def quitar(self, x):
+        """
+        Quita una observación previamente agregada (Welford inverso).
+        Media y varianza siguen siendo exactas; si se quita un extremo,
+        el mínimo/máximo pasa a estimarse desde el histograma.
+        """
+        x = float(x)
+        if self.n <= 1:
+            self.__init__(self.histograma.max_centroides)
+            return
+        media_previa = (self.n * self.media - x) / (self.n - 1)
+        self.m2 = max(0.0, self.m2 - (x - media_previa) * (x - self.media))
+        self.media = media_previa
+        self.n -= 1
+        self.histograma.quitar(x)
+        if x <= self.minimo:
+            self.minimo = self.histograma.valores[0]
+        if x >= self.maximo:
+            self.maximo = self.histograma.valores[-1]
+
+    def reemplazar(self, anterior, nuevo):
+        """Actualiza una observación (ej: la siembra recibió su cosecha)"""
+        self.quitar(anterior)
+        self.agregar(nuevo)
+
+    def combinar(self, otro):
+        """Combina con el acumulador de otra partición - O(B log B)"""
+        if otro.n == 0:
+            return self
+        n = self.n + otro.n
+        delta = otro.media - self.media
+        self.m2 += otro.m2 + delta * delta * self.n * otro.n / n
+        self.media += delta * otro.n / n
+        self.n = n
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self.histograma.combinar(otro.histograma)
+        return self
+
+    def resultado(self):
+        """Estadísticas descriptivas actuales - O(B). None si no hay datos."""
+        if self.n == 0:
+            return None
+        varianza = self.m2 / (self.n - 1) if self.n > 1 else float('nan')
+        return {
+            'media': self.media,
+            'mediana': self.histograma.cuantil(0.5, self.minimo, self.maximo),
+            'desviacion_std': math.sqrt(varianza),
+            'varianza': varianza,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'total_siembras': self.n
+        }
+
+
+class EstadisticasIncrementales:
+    """
+    Acumuladores de rendimiento por grupo (global, cultivo, lote y finca)
+    que se mantienen al día con cada siembra o cosecha registrada, de modo
+    que las estadísticas descriptivas se consultan sin volver a leer datos.
+    """
+    NIVELES = ('cultivo', 'lote', 'finca')
+
+    def __init__(self, max_centroides=64):
+        self.max_centroides = max_centroides
+        self.grupos = {}
+        self.siembras = {}  # id_siembra -> (valor, claves de grupo)
+
+    def _claves(self, fila):
+        # Los nombres de lote se repiten entre fincas: el lote se agrupa por (finca, lote)
+        return [('global', None),
+                ('cultivo', fila.get('cultivo')),
+                ('lote', (fila.get('finca'), fila.get('lote'))),
+                ('finca', fila.get('finca'))]
+
+    def _acumulador(self, clave):
+        if clave not in self.grupos:
+            self.grupos[clave] = AcumuladorEstadistico(self.max_centroides)
+        return self.grupos[clave]
+
+    def registrar(self, fila, columna='rendimiento'):
+        """
+        Agrega o actualiza la observación de una siembra (fila con
+        id_siembra, el valor y sus grupos) en todos sus grupos.
+        """
+        valor = float(fila[columna] or 0)
+        claves = self._claves(fila)
+        previa = self.siembras.get(fila['id_siembra'])
+        if previa is not None:
+            valor_previo, claves_previas = previa
+            for clave in claves_previas:
+                self.grupos[clave].quitar(valor_previo)
+        for clave in claves:
+            self._acumulador(clave).agregar(valor)
+        self.siembras[fila['id_siembra']] = (valor, claves)
+
+    def cargar(self, filas, columna='rendimiento'):
+        """Construye los acumuladores en un único recorrido de las filas"""
+        for fila in filas:
+            self.registrar(fila, columna)
+        return self
+
+    def combinar(self, otro):
+        """Combina los grupos de otra partición con siembras disjuntas"""
+        for clave, acumulador in otro.grupos.items():
+            self._acumulador(clave).combinar(acumulador)
+        self.siembras.update(otro.siembras)
+        return self
+
+    def consultar(self, nivel='global', clave=None):
+        """Estadísticas descriptivas de un grupo, sin recorrer los datos"""
+        acumulador = self.grupos.get((nivel, clave))
+        return acumulador.resultado() if acumulador else None
+
+    def por_nivel(self, nivel):
+        """Estadísticas de todos los grupos de un nivel: {clave: estadísticas}"""
+        return {clave: acumulador.resultado()
+                for (n, clave), acumulador in self.grupos.items() if n == nivel}
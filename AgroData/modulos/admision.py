@@ -0,0 +1,171 @@
+# Módulo de control de admisión para las rutas costosas
+# Archivo: modulos/admision.py
+
+import math
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+import numpy as np
+
+
+class ControlAdmision:
+    """
+    Limita la concurrencia y la tasa de las rutas pesadas (dashboard, reportes).
+
+    Por ruta:
+    - `limite` peticiones ejecutándose a la vez (semáforo)
+    - `cola` peticiones esperando cupo como máximo; si la cola está llena se
+      responde 503 de inmediato, y también si no hay cupo en `espera` segundos
+    Por usuario y ruta:
+    - cubeta de tokens con `tasa` peticiones/s sostenidas y `rafaga` de
+      capacidad; sin tokens se responde 429
+
+    Los rechazos llevan Retry-After. Los límites son por proceso: con varios
+    workers la capacidad total es limite * workers.
+    metricas() exporta decisiones y percentiles de espera y duración.
+    Demuestra: Análisis de Algoritmos (teoría de colas + cubeta de tokens)
+    """
+
+    LIMITES_DEFECTO = {
+        'index': {'limite': 8, 'cola': 16, 'espera': 2.0, 'tasa': 1.0, 'rafaga': 5},
+        'reportes': {'limite': 2, 'cola': 4, 'espera': 5.0, 'tasa': 0.2, 'rafaga': 3},
+    }
+    MUESTRAS = 1000
+    MAX_CUBETAS = 10000
+
+    def __init__(self, limites=None, identificar=None):
+        """
+        limites: {ruta: {'limite', 'cola', 'espera', 'tasa', 'rafaga'}}
+        identificar: función sin argumentos que retorna el id del usuario actual
+        """
+        self.identificar = identificar or (lambda: None)
+        self._bloqueo = threading.Lock()
+        self._cubetas = {}  # (ruta, usuario) -> [tokens, instante]
+        self._rutas = {}
+        for ruta, config in (limites or self.LIMITES_DEFECTO).items():
+            self._rutas[ruta] = dict(
+                config,
+                cupos=threading.BoundedSemaphore(config['limite']),
+                en_cola=0,
+                en_curso=0,
+                decisiones={'admitidas': 0, 'tasa_429': 0, 'cola_llena_503': 0, 'espera_agotada_503': 0},
+                esperas=deque(maxlen=self.MUESTRAS),
+                duraciones=deque(maxlen=self.MUESTRAS),
+            )
+
+    # ---------- Cubeta de tokens ----------
+
+    def _consumir_token(self, ruta, usuario, ahora):
+        """Retorna 0 si hay token, o los segundos hasta el siguiente"""
+        config = self._rutas[ruta]
+        clave = (ruta, usuario)
+        with self._bloqueo:
+            cubeta = self._cubetas.get(clave)
+            if cubeta is None:
+                if len(self._cubetas) >= self.MAX_CUBETAS:
+                    self._purgar_cubetas(ahora)
+                cubeta = self._cubetas[clave] = [float(config['rafaga']), ahora]
+            tokens = min(config['rafaga'], cubeta[0] + (ahora - cubeta[1]) * config['tasa'])
+            cubeta[1] = ahora
+            if tokens >= 1:
+                cubeta[0] = tokens - 1
+                return 0.0
+            cubeta[0] = tokens
+            return (1 - tokens) / config['tasa']
+
+    def _purgar_cubetas(self, ahora):
+        """Descarta las cubetas ya llenas (equivalen a una nueva); se llama con el bloqueo tomado"""
+        for clave, (tokens, instante) in list(self._cubetas.items()):
+            config = self._rutas[clave[0]]
+            if tokens + (ahora - instante) * config['tasa'] >= config['rafaga']:
+                del self._cubetas[clave]
+
+    # ---------- Admisión ----------
+
+    def _reintentar_en(self, ruta):
+        """Segundos sugeridos: duración típica por turno de cola, al menos 1"""
+        estado = self._rutas[ruta]
+        duraciones = list(estado['duraciones'])
+        tipica = float(np.median(duraciones)) if duraciones else estado['espera']
+        return max(1, math.ceil(tipica * (estado['en_cola'] + 1) / estado['limite']))
+
+    def _rechazo(self, ruta, decision, status, segundos):
+        with self._bloqueo:
+            self._rutas[ruta]['decisiones'][decision] += 1
+        mensaje = ('Demasiadas solicitudes, espera unos segundos.' if status == 429
+                   else 'Servidor ocupado, intenta de nuevo en unos segundos.')
+        return mensaje, status, {'Retry-After': str(max(1, math.ceil(segundos)))}
+
+    def admitir(self, ruta, funcion, *args, **kwargs):
+        """Ejecuta funcion si la ruta y el usuario tienen cupo; si no, retorna la respuesta de rechazo"""
+        estado = self._rutas[ruta]
+        encolado = time.monotonic()
+
+        espera_token = self._consumir_token(ruta, self.identificar(), encolado)
+        if espera_token:
+            return self._rechazo(ruta, 'tasa_429', 429, espera_token)
+
+        with self._bloqueo:
+            cola_llena = estado['en_cola'] >= estado['cola']
+            if not cola_llena:
+                estado['en_cola'] += 1
+        if cola_llena:
+            return self._rechazo(ruta, 'cola_llena_503', 503, self._reintentar_en(ruta))
+
+        admitida = estado['cupos'].acquire(timeout=estado['espera'])
+        inicio = time.monotonic()
+        with self._bloqueo:
+            estado['en_cola'] -= 1
+            estado['esperas'].append(inicio - encolado)
+            if admitida:
+                estado['en_curso'] += 1
+                estado['decisiones']['admitidas'] += 1
+        if not admitida:
+            return self._rechazo(ruta, 'espera_agotada_503', 503, self._reintentar_en(ruta))
+
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            estado['cupos'].release()
+            with self._bloqueo:
+                estado['en_curso'] -= 1
+                estado['duraciones'].append(time.monotonic() - inicio)
+
+    def limitar(self, ruta):
+        """Decorador para una vista: @admision.limitar('reportes')"""
+        def decorador(vista):
+            @wraps(vista)
+            def envoltura(*args, **kwargs):
+                return self.admitir(ruta, vista, *args, **kwargs)
+            return envoltura
+        return decorador
+
+    # ---------- Métricas ----------
+
+    @staticmethod
+    def _resumen_tiempos(muestras):
+        if not muestras:
+            return {'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        p50, p95, maximo = np.percentile(np.asarray(muestras) * 1000, [50, 95, 100])
+        return {'p50_ms': round(float(p50), 2), 'p95_ms': round(float(p95), 2), 'max_ms': round(float(maximo), 2)}
+
+    def metricas(self):
+        """Decisiones, ocupación y tiempos de espera/duración por ruta"""
+        resultado = {}
+        with self._bloqueo:
+            for ruta, estado in self._rutas.items():
+                resultado[ruta] = {
+                    'limites': {c: estado[c] for c in ('limite', 'cola', 'espera', 'tasa', 'rafaga')},
+                    'decisiones': dict(estado['decisiones']),
+                    'en_curso': estado['en_curso'],
+                    'en_cola': estado['en_cola'],
+                    'esperas': list(estado['esperas']),
+                    'duraciones': list(estado['duraciones']),
+                }
+            usuarios = len(self._cubetas)
+        for estado in resultado.values():
+            estado['espera_cola'] = self._resumen_tiempos(estado.pop('esperas'))
+            estado['duracion'] = self._resumen_tiempos(estado.pop('duraciones'))
+        return {'rutas': resultado, 'cubetas_activas': usuarios}
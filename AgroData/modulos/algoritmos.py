@@ -1,7 +1,17 @@
 # PASO 7.4: Módulo de Análisis y Diseño de Algoritmos
 # Archivo: modulos/algoritmos.py
 
+import heapq
+import math
+import statistics
 import time
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+
+from .columnar import TablaColumnar
+from .estructuras import IndiceFechasSiembras
 
 class Algoritmos:
     """
@@ -9,20 +19,23 @@ class Algoritmos:
     Demuestra: Análisis y Diseño de Algoritmos
     """
     
+    # Criterios válidos para rankings (también usados para ORDER BY en SQL)
+    CRITERIOS_RANKING = ('rendimiento', 'ingreso_total', 'margen')
+    
     @staticmethod
     def busqueda_lineal(lista, objetivo, clave='id'):
         """
         Búsqueda lineal - O(n)
         Recorre toda la lista hasta encontrar el elemento.
         """
-        inicio = time.time()
+        inicio = time.perf_counter()
         
         for i, elemento in enumerate(lista):
             if elemento.get(clave) == objetivo:
-                tiempo = time.time() - inicio
+                tiempo = time.perf_counter() - inicio
                 return {'encontrado': True, 'indice': i, 'tiempo': tiempo}
         
-        tiempo = time.time() - inicio
+        tiempo = time.perf_counter() - inicio
         return {'encontrado': False, 'indice': -1, 'tiempo': tiempo}
     
     @staticmethod
@@ -32,7 +45,7 @@ class Algoritmos:
         Requiere lista ordenada. Divide el espacio de búsqueda a la mitad.
         Mucho más eficiente que búsqueda lineal para listas grandes.
         """
-        inicio = time.time()
+        inicio = time.perf_counter()
         
         izq = 0
         der = len(lista_ordenada) - 1
@@ -44,7 +57,7 @@ class Algoritmos:
             valor_medio = lista_ordenada[medio].get(clave)
             
             if valor_medio == objetivo:
-                tiempo = time.time() - inicio
+                tiempo = time.perf_counter() - inicio
                 return {
                     'encontrado': True,
                     'indice': medio,
@@ -56,7 +69,7 @@ class Algoritmos:
             else:
                 der = medio - 1
         
-        tiempo = time.time() - inicio
+        tiempo = time.perf_counter() - inicio
         return {
             'encontrado': False,
             'indice': -1,
@@ -138,57 +151,232 @@ class Algoritmos:
         return resultado
     
     @staticmethod
-    def comparar_algoritmos_busqueda(lista, objetivo):
+    def medir_tiempo(funcion, *args, repeticiones=5, calentamiento=1,
+                     conservar_resultado=False, **kwargs):
+        """
+        Mide el tiempo de ejecución de una función con perf_counter_ns.
+        Ejecuta primero `calentamiento` corridas descartadas y luego
+        `repeticiones` corridas medidas.
+        
+        Retorna: diccionario con mediana, p95, desviación estándar,
+        mínimo y máximo en nanosegundos. Con conservar_resultado=True
+        incluye además 'resultado', el valor de la última corrida medida,
+        para no tener que ejecutar la función una vez más fuera de la medición.
+        """
+        for _ in range(calentamiento):
+            funcion(*args, **kwargs)
+        
+        muestras = []
+        resultado = None
+        for _ in range(max(1, repeticiones)):
+            inicio = time.perf_counter_ns()
+            resultado = funcion(*args, **kwargs)
+            muestras.append(time.perf_counter_ns() - inicio)
+        
+        muestras.sort()
+        # Percentil 95 por rango más cercano
+        indice_p95 = max(0, math.ceil(0.95 * len(muestras)) - 1)
+        medicion = {
+            'repeticiones': len(muestras),
+            'mediana_ns': statistics.median(muestras),
+            'p95_ns': muestras[indice_p95],
+            'desviacion_ns': statistics.stdev(muestras) if len(muestras) > 1 else 0.0,
+            'minimo_ns': muestras[0],
+            'maximo_ns': muestras[-1]
+        }
+        if conservar_resultado:
+            medicion['resultado'] = resultado
+        return medicion
+    
+    @staticmethod
+    def _columna_ordenable(valores):
+        """
+        Convierte una columna de valores en un arreglo numérico ordenable.
+        Números y fechas se convierten directamente; el resto (texto) se
+        reemplaza por su rango entre los valores únicos. Los None van primero.
+        """
+        muestra = next((v for v in valores if v is not None), None)
+        
+        if isinstance(muestra, (int, float, Decimal)) and not isinstance(muestra, bool):
+            return np.array([-np.inf if v is None else v for v in valores], dtype=float)
+        if isinstance(muestra, datetime):
+            return np.array([-np.inf if v is None else v.timestamp() for v in valores], dtype=float)
+        if isinstance(muestra, date):
+            return np.array([-np.inf if v is None else v.toordinal() for v in valores], dtype=float)
+        
+        nulos = np.array([v is None for v in valores], dtype=bool)
+        columna = np.array(['' if v is None else str(v) for v in valores])
+        _, rangos = np.unique(columna, return_inverse=True)
+        rangos = rangos.astype(float)
+        rangos[nulos] = -np.inf
+        return rangos
+    
+    @staticmethod
+    def orden_columnar(filas, claves):
+        """
+        Ordenamiento columnar multi-clave - O(k·n log n) en C (NumPy)
+        Extrae cada clave una sola vez a un arreglo y ordena con np.lexsort,
+        que es estable, en lugar de llamar .get(clave) en cada comparación.
+        
+        Parámetros:
+        - filas: lista de diccionarios
+        - claves: lista de campos o tuplas (campo, ascendente), por prioridad.
+          Ej: ['finca', 'cultivo', ('fecha_siembra', False)]
+        
+        Retorna: arreglo de índices (permutación); usar aplicar_orden
+        para reordenar las filas sin copiar los diccionarios.
+        Acepta también una TablaColumnar (usa sus columnas directamente).
+        Los valores faltantes (None / NaN) quedan al final tanto en orden
+        ascendente como descendente.
+        """
+        if isinstance(claves, str):
+            claves = [claves]
+        if not len(filas) or not claves:
+            return np.arange(len(filas))
+        
+        columnas = []
+        for clave in claves:
+            campo, ascendente = (clave, True) if isinstance(clave, str) else clave
+            if isinstance(filas, TablaColumnar):
+                columna = filas.numerica(campo)
+            else:
+                columna = Algoritmos._columna_ordenable([fila.get(campo) for fila in filas])
+            # Faltantes: -inf (None) o NaN; se ordenan por una clave previa
+            # "es faltante" para que la negación no los mueva al inicio
+            faltantes = np.isnan(columna) | np.isneginf(columna)
+            columna = np.where(faltantes, 0.0, columna)
+            columnas.append(faltantes)
+            columnas.append(columna if ascendente else -columna)
+        
+        # np.lexsort usa la última clave como primaria
+        return np.lexsort(columnas[::-1])
+    
+    @staticmethod
+    def aplicar_orden(filas, indices):
+        """Reordena filas según una permutación de índices - O(n)"""
+        if isinstance(filas, TablaColumnar):
+            return filas.tomar(indices)
+        return [filas[i] for i in indices]
+    
+    @staticmethod
+    def comparar_algoritmos_busqueda(lista, objetivo, repeticiones=7, calentamiento=1):
         """
         Compara el rendimiento de búsqueda lineal vs binaria.
         Útil para demostrar diferencias de complejidad.
+        Los tiempos reportados son la mediana de varias repeticiones,
+        así la mejora no depende del ruido de una sola corrida. En una
+        petición web usar repeticiones=1, calentamiento=0 (la medición
+        repetida corresponde a modulos/benchmark.py). El resultado se toma
+        de la última corrida medida, así cada búsqueda no recorre la lista
+        una vez más fuera de la medición.
         """
         # Búsqueda lineal
-        resultado_lineal = Algoritmos.busqueda_lineal(lista, objetivo, 'id_siembra')
+        medicion_lineal = Algoritmos.medir_tiempo(
+            Algoritmos.busqueda_lineal, lista, objetivo, 'id_siembra',
+            repeticiones=repeticiones, calentamiento=calentamiento,
+            conservar_resultado=True
+        )
+        resultado_lineal = medicion_lineal['resultado']
+        resultado_lineal['tiempo'] = medicion_lineal['mediana_ns'] / 1e9
         
         # Ordenar lista para búsqueda binaria
         lista_ordenada = sorted(lista, key=lambda x: x.get('id_siembra', 0))
         
         # Búsqueda binaria
-        resultado_binaria = Algoritmos.busqueda_binaria(lista_ordenada, objetivo, 'id_siembra')
+        medicion_binaria = Algoritmos.medir_tiempo(
+            Algoritmos.busqueda_binaria, lista_ordenada, objetivo, 'id_siembra',
+            repeticiones=repeticiones, calentamiento=calentamiento,
+            conservar_resultado=True
+        )
+        resultado_binaria = medicion_binaria['resultado']
+        resultado_binaria['tiempo'] = medicion_binaria['mediana_ns'] / 1e9
         
         return {
             'lineal': resultado_lineal,
             'binaria': resultado_binaria,
-            'mejora': (resultado_lineal['tiempo'] / resultado_binaria['tiempo'] 
-                      if resultado_binaria['tiempo'] > 0 else 0)
+            'mejora': (medicion_lineal['mediana_ns'] / medicion_binaria['mediana_ns']
+                      if medicion_binaria['mediana_ns'] > 0 else 0)
         }
     
     @staticmethod
-    def ranking_lotes(lotes_data):
+    def top_k(lista, k=5, claves=('rendimiento',), descendente=True, incluir_empates=False):
         """
-        Genera ranking de mejores lotes por rendimiento usando QuickSort.
-        Retorna top 5 lotes más productivos.
+        Selección parcial Top-k con heap - O(n log k)
+        Evita ordenar toda la lista cuando solo interesan los k primeros.
+        
+        Parámetros:
+        - lista: lista de diccionarios
+        - k: cantidad de elementos a retornar
+        - claves: campo o tupla de campos; se comparan en orden lexicográfico
+        - descendente: True para los mayores primero
+        - incluir_empates: agrega los elementos empatados con el k-ésimo
+        
+        Los empates conservan el orden original (selección estable) y los
+        valores faltantes (None) quedan al final en ambas direcciones.
         """
-        if not lotes_data:
+        if not len(lista) or k <= 0:
             return []
+        if isinstance(claves, str):
+            claves = (claves,)
+        
+        if isinstance(lista, TablaColumnar):
+            # Versión vectorizada: orden estable sobre las columnas y corte en k
+            orden = Algoritmos.orden_columnar(lista, [(c, not descendente) for c in claves])
+            columnas = [lista.numerica(c) for c in claves]
+            fin = min(k, len(orden))
+            if incluir_empates:
+                umbral = [col[orden[fin - 1]] for col in columnas]
+                while fin < len(orden) and all(col[orden[fin]] == u for col, u in zip(columnas, umbral)):
+                    fin += 1
+            return [lista.fila(i) for i in orden[:fin]]
         
-        # Ordenar de mayor a menor rendimiento
-        lotes_ordenados = Algoritmos.quicksort(lotes_data, 'rendimiento', ascendente=False)
+        # Los valores faltantes van al final en ambas direcciones, como en
+        # orden_columnar: la marca de faltante precede al valor en la clave
+        def valor(elemento):
+            return tuple(((v is not None) if descendente else (v is None), v)
+                         for v in (elemento.get(c) for c in claves))
         
-        # Retornar top 5
-        return lotes_ordenados[:5]
+        seleccion = heapq.nlargest if descendente else heapq.nsmallest
+        top = seleccion(k, lista, key=valor)
+        
+        if incluir_empates and len(top) == k:
+            umbral = valor(top[-1])
+            incluidos = {id(x) for x in top}
+            top.extend(x for x in lista
+                       if id(x) not in incluidos and valor(x) == umbral)
+        
+        return top
+    
+    @staticmethod
+    def ranking_lotes(lotes_data, k=5, claves=('rendimiento',), incluir_empates=False):
+        """
+        Genera ranking de mejores lotes con selección Top-k (heap).
+        Por defecto retorna los 5 lotes con mayor rendimiento; claves puede
+        combinar 'rendimiento', 'ingreso_total' y 'margen'.
+        """
+        if not lotes_data:
+            return []
+        
+        return Algoritmos.top_k(lotes_data, k, claves, descendente=True,
+                                incluir_empates=incluir_empates)
     
     @staticmethod
     def buscar_siembras_por_rango_fecha(siembras, fecha_inicio, fecha_fin):
         """
         Busca siembras en un rango de fechas usando búsqueda binaria.
-        Lista debe estar ordenada por fecha.
+        Acepta una lista de siembras o un IndiceFechasSiembras ya construido;
+        con el índice cada consulta cuesta O(log n + k) sin reordenar.
+        Con una TablaColumnar filtra de forma vectorizada y retorna otra tabla.
         """
-        # Ordenar por fecha
-        siembras_ordenadas = Algoritmos.merge_sort(siembras, 'fecha_siembra')
-        
-        resultados = []
-        for siembra in siembras_ordenadas:
-            fecha = siembra.get('fecha_siembra', '')
-            if fecha_inicio <= fecha <= fecha_fin:
-                resultados.append(siembra)
-            elif fecha > fecha_fin:
-                break  # Ya no hay más en el rango
+        if isinstance(siembras, TablaColumnar):
+            # Filtro vectorizado sobre la columna datetime64
+            fechas = siembras.columna('fecha_siembra')
+            mascara = ((fechas >= np.datetime64(fecha_inicio, 'D'))
+                       & (fechas <= np.datetime64(fecha_fin, 'D')))
+            return siembras.filtrar(mascara)
+        if isinstance(siembras, IndiceFechasSiembras):
+            indice = siembras
+        else:
+            indice = IndiceFechasSiembras(siembras, 'fecha_siembra')
         
-        return resultados
\ No newline at end of file
+        return indice.rango(fecha_inicio, fecha_fin)
@@ -0,0 +1,426 @@
+# Módulo de Benchmarks de Algoritmos
+# Archivo: modulos/benchmark.py
+
+import json
+import math
+import platform
+import random
+import sys
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from .algoritmos import Algoritmos
+from .columnar import TablaColumnar
+from .metodos_numericos import MetodosNumericos
+from .estructuras import (
+    ArbolBinarioCultivos,
+    ColaPrioridadAlertas,
+    IndiceFechasSiembras,
+    ListaEnlazadaSiembras
+)
+
+
+class _NodoSiembraOriginal:
+    """Nodo de la lista enlazada original (con __dict__, sin enlace hacia atrás), solo como referencia"""
+    def __init__(self, datos_siembra):
+        self.datos = datos_siembra
+        self.siguiente = None
+
+
+class _ListaEnlazadaOriginal:
+    """Lista simplemente enlazada original, sin índice por id, solo como referencia de memoria"""
+    def __init__(self):
+        self.cabeza = None
+        self.tamaño = 0
+
+    def agregar_siembra(self, datos_siembra):
+        nuevo_nodo = _NodoSiembraOriginal(datos_siembra)
+        nuevo_nodo.siguiente = self.cabeza
+        self.cabeza = nuevo_nodo
+        self.tamaño += 1
+
+
+class Benchmark:
+    """
+    Harness de micro-benchmarks para los algoritmos de AgroData.
+    Genera siembras sintéticas de 10^2 a 10^6 elementos y mide cada
+    algoritmo con calentamiento, repeticiones y mediana/p95/desviación.
+    Demuestra: Análisis de Algoritmos (medición empírica)
+    """
+
+    TAMANOS_DEFECTO = (10**2, 10**3, 10**4, 10**5, 10**6)
+    CULTIVOS = ('Maíz', 'Frijol', 'Tomate', 'Papa', 'Trigo')
+
+    @staticmethod
+    def generar_siembras(n, semilla=42):
+        """
+        Genera n siembras sintéticas con ids únicos en orden aleatorio,
+        rendimiento en kg/ha y fecha de siembra en los últimos 5 años.
+        """
+        rng = random.Random(semilla)
+        ids = list(range(1, n + 1))
+        rng.shuffle(ids)
+        fecha_base = date(2020, 1, 1)
+
+        siembras = []
+        for id_siembra in ids:
+            siembras.append({
+                'id_siembra': id_siembra,
+                'id_lote': rng.randint(1, max(1, n // 20)),
+                'cultivo': rng.choice(Benchmark.CULTIVOS),
+                'fecha_siembra': fecha_base + timedelta(days=rng.randint(0, 5 * 365)),
+                'area_sembrada': round(rng.uniform(1, 20), 2),
+                'rendimiento': round(rng.lognormvariate(8.5, 0.6), 2)
+            })
+        return siembras
+
+    @staticmethod
+    def casos(siembras, semilla=42):
+        """
+        Retorna la lista de casos a medir para un conjunto de siembras:
+        tuplas (nombre, función, argumentos).
+        """
+        rng = random.Random(semilla)
+        objetivo = rng.randint(1, len(siembras))
+        ordenadas_id = sorted(siembras, key=lambda x: x['id_siembra'])
+
+        # Rango de fechas que cubre aproximadamente el 10% de las siembras
+        fechas = sorted(s['fecha_siembra'] for s in siembras)
+        inicio_rango = fechas[int(len(fechas) * 0.45)]
+        fin_rango = fechas[min(len(fechas) - 1, int(len(fechas) * 0.55))]
+        indice_fechas = IndiceFechasSiembras(siembras)
+        tabla = TablaColumnar.desde_filas(siembras)
+
+        return [
+            ('busqueda_lineal', Algoritmos.busqueda_lineal,
+             (siembras, objetivo, 'id_siembra')),
+            ('busqueda_binaria', Algoritmos.busqueda_binaria,
+             (ordenadas_id, objetivo, 'id_siembra')),
+            ('quicksort', Algoritmos.quicksort,
+             (siembras, 'rendimiento', False)),
+            ('orden_columnar', Algoritmos.orden_columnar,
+             (siembras, [('rendimiento', False)])),
+            ('orden_columnar_multiclave', Algoritmos.orden_columnar,
+             (siembras, ['cultivo', 'id_lote', ('fecha_siembra', False)])),
+            ('orden_columnar_tabla', Algoritmos.orden_columnar,
+             (tabla, ['cultivo', 'id_lote', ('fecha_siembra', False)])),
+            ('ranking_quicksort', lambda l: Algoritmos.quicksort(l, 'rendimiento', False)[:5],
+             (siembras,)),
+            ('ranking_top_k', Algoritmos.ranking_lotes,
+             (siembras,)),
+            ('ranking_top_k_multiclave', Algoritmos.top_k,
+             (siembras, 5, ('rendimiento', 'area_sembrada'))),
+            ('merge_sort', Algoritmos.merge_sort,
+             (siembras, 'fecha_siembra')),
+            ('merge_sort_columnar', Algoritmos.orden_columnar,
+             (siembras, ['fecha_siembra'])),
+            ('rango_fechas', Algoritmos.buscar_siembras_por_rango_fecha,
+             (siembras, inicio_rango, fin_rango)),
+            ('rango_fechas_indice', indice_fechas.rango,
+             (inicio_rango, fin_rango)),
+            ('rango_fechas_tabla', Algoritmos.buscar_siembras_por_rango_fecha,
+             (tabla, inicio_rango, fin_rango)),
+            ('rango_fechas_conteo', indice_fechas.contar_rango,
+             (inicio_rango, fin_rango)),
+        ]
+
+    @staticmethod
+    def ejecutar(tamanos=TAMANOS_DEFECTO, repeticiones=5, calentamiento=1,
+                 semilla=42, algoritmos=None, progreso=None):
+        """
+        Ejecuta todos los casos para cada tamaño de dataset.
+
+        Parámetros:
+        - tamanos: tamaños de dataset (número de siembras)
+        - repeticiones / calentamiento: corridas medidas y descartadas
+        - algoritmos: nombres de casos a incluir (None = todos)
+        - progreso: función opcional llamada con cada resultado
+
+        Retorna: diccionario serializable a JSON con metadatos y resultados
+        """
+        resultados = []
+        for n in tamanos:
+            siembras = Benchmark.generar_siembras(n, semilla)
+            for nombre, funcion, args in Benchmark.casos(siembras, semilla):
+                if algoritmos and nombre not in algoritmos:
+                    continue
+                medicion = Algoritmos.medir_tiempo(
+                    funcion, *args,
+                    repeticiones=repeticiones,
+                    calentamiento=calentamiento
+                )
+                resultado = {'algoritmo': nombre, 'n': n}
+                resultado.update(medicion)
+                resultados.append(resultado)
+                if progreso:
+                    progreso(resultado)
+
+        return {
+            'meta': {
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'plataforma': platform.platform(),
+                'repeticiones': repeticiones,
+                'calentamiento': calentamiento,
+                'semilla': semilla
+            },
+            'resultados': resultados
+        }
+
+    @staticmethod
+    def medir_memoria(construir):
+        """
+        Mide con tracemalloc los bytes reservados por construir().
+        Retorna: (objeto construido, bytes netos reservados)
+        """
+        tracemalloc.start()
+        try:
+            antes = tracemalloc.get_traced_memory()[0]
+            objeto = construir()
+            despues = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        return objeto, despues - antes
+
+    @staticmethod
+    def memoria_lista_enlazada(n=10**5, semilla=42):
+        """
+        Bytes por siembra antes (lista simplemente enlazada con nodos con
+        __dict__) y después (ListaEnlazadaSiembras: nodos con __slots__ y
+        doble enlace + índice por id), sin contar los diccionarios de datos,
+        que ya existían antes. El índice hace O(1) buscar y eliminar por id
+        a cambio de más memoria por siembra que la lista original.
+        """
+        siembras = Benchmark.generar_siembras(n, semilla)
+
+        def construir(clase):
+            lista = clase()
+            for siembra in siembras:
+                lista.agregar_siembra(siembra)
+            return lista
+
+        _, total_original = Benchmark.medir_memoria(lambda: construir(_ListaEnlazadaOriginal))
+        lista, total = Benchmark.medir_memoria(lambda: construir(ListaEnlazadaSiembras))
+        return {
+            'estructura': 'ListaEnlazadaSiembras',
+            'n': n,
+            'antes': {
+                'bytes_total': total_original,
+                'bytes_por_siembra': total_original / n,
+            },
+            'despues': {
+                'bytes_total': total,
+                'bytes_por_siembra': total / n,
+                'bytes_nodo': sys.getsizeof(lista.cabeza),
+                'bytes_indice_por_siembra': sys.getsizeof(lista._indice) / n,
+            },
+            'diferencia_bytes_por_siembra': (total - total_original) / n,
+        }
+
+    @staticmethod
+    def memoria_tabla_columnar(n=10**5, semilla=42):
+        """
+        Bytes por fila de n siembras como lista de diccionarios (lo que
+        retorna cursor(dictionary=True)) vs TablaColumnar.
+        """
+        siembras, bytes_filas = Benchmark.medir_memoria(
+            lambda: Benchmark.generar_siembras(n, semilla))
+        tabla, bytes_tabla = Benchmark.medir_memoria(
+            lambda: TablaColumnar.desde_filas(siembras))
+        return {
+            'estructura': 'TablaColumnar',
+            'n': n,
+            'bytes_por_fila_diccionarios': bytes_filas / n,
+            'bytes_por_fila_columnar': bytes_tabla / n,
+            'reduccion': bytes_filas / bytes_tabla if bytes_tabla else None
+        }
+
+    @staticmethod
+    def arbol_cultivos(n=10**5, repeticiones=3, semilla=42):
+        """
+        Altura y tiempos de ArbolBinarioCultivos con n claves insertadas
+        en orden (peor caso de un BST sin balancear), en orden aleatorio
+        y construidas en bloque desde una lista ordenada.
+        """
+        rng = random.Random(semilla)
+        ordenados = [(f'cultivo_{i}', float(i)) for i in range(n)]
+        aleatorios = ordenados[:]
+        rng.shuffle(aleatorios)
+
+        def insertar_todos(pares):
+            arbol = ArbolBinarioCultivos()
+            for cultivo, rendimiento in pares:
+                arbol.insertar(cultivo, rendimiento)
+            return arbol
+
+        def construir_bloque(pares):
+            arbol = ArbolBinarioCultivos()
+            arbol.construir_desde_ordenados(pares)
+            return arbol
+
+        resultados = []
+        for nombre, construir, pares in (('insercion_ordenada', insertar_todos, ordenados),
+                                         ('insercion_aleatoria', insertar_todos, aleatorios),
+                                         ('construccion_bloque', construir_bloque, ordenados)):
+            arbol = construir(pares)
+            resultado = {'estructura': 'ArbolBinarioCultivos', 'caso': nombre, 'n': n,
+                         'altura': arbol.altura()}
+            resultado.update(Algoritmos.medir_tiempo(construir, pares,
+                                                     repeticiones=repeticiones, calentamiento=0))
+            resultados.append(resultado)
+
+        consultas = (('rango', arbol.rango, (n * 0.45, n * 0.55)),
+                     ('k_mas_cercanos', arbol.k_mas_cercanos, (n / 3, 10)))
+        for nombre, funcion, args in consultas:
+            resultado = {'estructura': 'ArbolBinarioCultivos', 'caso': nombre, 'n': n,
+                         'altura': arbol.altura()}
+            resultado.update(Algoritmos.medir_tiempo(funcion, *args, repeticiones=repeticiones))
+            resultados.append(resultado)
+        return resultados
+
+    @staticmethod
+    def alertas(n=10**5, repeticiones=3, semilla=42):
+        """
+        Costo de generar las alertas del dashboard con n siembras activas:
+        inserción una a una vs carga masiva con heapify, y Top 5 con
+        top_k vs ordenar todas las alertas.
+        """
+        rng = random.Random(semilla)
+        alertas = [(rng.randint(1, 3), f'Alerta siembra {i}', i) for i in range(n)]
+
+        def insertar_una_a_una():
+            cola = ColaPrioridadAlertas()
+            for prioridad, mensaje, id_siembra in alertas:
+                cola.agregar_alerta(prioridad, mensaje, id_siembra)
+            return cola
+
+        def carga_masiva():
+            cola = ColaPrioridadAlertas()
+            cola.cargar_alertas(alertas)
+            return cola
+
+        cola = carga_masiva()
+        casos = (('insercion_una_a_una', insertar_una_a_una, ()),
+                 ('carga_masiva', carga_masiva, ()),
+                 ('top_5', cola.top_k, (5,)),
+                 ('ordenar_todas_top_5', lambda: cola.obtener_todas()[:5], ()))
+        resultados = []
+        for nombre, funcion, args in casos:
+            resultado = {'estructura': 'ColaPrioridadAlertas', 'caso': nombre, 'n': n}
+            resultado.update(Algoritmos.medir_tiempo(funcion, *args, repeticiones=repeticiones))
+            resultados.append(resultado)
+        return resultados
+
+    @staticmethod
+    def regresion(series=1000, puntos=30, repeticiones=3, semilla=42):
+        """
+        Ajuste de tendencias lineales para muchas series (ej: rendimiento vs
+        fertilizante por lote): calcular_tendencia_lineal y stats.linregress
+        en un bucle vs MetodosNumericos.regresion_lote, más una regresión
+        múltiple de 4 variables (fertilizante, pH, área y días).
+        """
+        from scipy import stats
+        rng = random.Random(semilla)
+        x = [[rng.uniform(0, 200) for _ in range(puntos)] for _ in range(series)]
+        y = [[3 * xi + rng.gauss(0, 50) for xi in fila] for fila in x]
+        X4 = [[[xi, rng.uniform(5, 8), rng.uniform(1, 20), rng.uniform(60, 150)] for xi in fila]
+              for fila in x]
+
+        casos = (
+            ('bucle_tendencia_lineal',
+             lambda: [MetodosNumericos.calcular_tendencia_lineal(a, b) for a, b in zip(x, y)], ()),
+            ('bucle_linregress', lambda: [stats.linregress(a, b) for a, b in zip(x, y)], ()),
+            ('regresion_lote', MetodosNumericos.regresion_lote, (x, y)),
+            ('regresion_lote_multiple', MetodosNumericos.regresion_lote, (X4, y)),
+        )
+        resultados = []
+        for nombre, funcion, args in casos:
+            resultado = {'estructura': 'MetodosNumericos', 'caso': nombre,
+                         'series': series, 'puntos': puntos}
+            resultado.update(Algoritmos.medir_tiempo(funcion, *args, repeticiones=repeticiones))
+            resultados.append(resultado)
+        return resultados
+
+    @staticmethod
+    def proyeccion(puntos=200, horizontes=500, repeticiones=3, semilla=42):
+        """
+        Proyección de producción para muchos horizontes: una llamada a
+        interpolacion_cubica por día (re-ajusta cada vez) vs un ajuste
+        vectorizado de proyectar_produccion, sin caché y desde la caché.
+        """
+        rng = random.Random(semilla)
+        datos = [{'dia': rng.randint(60, 150), 'kg': rng.uniform(100, 2000)} for _ in range(puntos)]
+        fechas = [d['dia'] for d in datos]
+        kgs = [d['kg'] for d in datos]
+        dias = list(range(1, horizontes + 1))
+
+        def por_dia_sin_cache():
+            resultado = []
+            for dia in dias:
+                MetodosNumericos._ajustes.clear()
+                resultado.append(MetodosNumericos.interpolacion_cubica(fechas, kgs, dia))
+            return resultado
+
+        def vectorizada_sin_cache():
+            MetodosNumericos._ajustes.clear()
+            return MetodosNumericos.proyectar_produccion(datos, dias)
+
+        casos = (('por_dia_sin_cache', por_dia_sin_cache, ()),
+                 ('vectorizada_sin_cache', vectorizada_sin_cache, ()),
+                 ('vectorizada_cacheada', MetodosNumericos.proyectar_produccion, (datos, dias)))
+        resultados = []
+        for nombre, funcion, args in casos:
+            resultado = {'estructura': 'MetodosNumericos', 'caso': nombre,
+                         'puntos': puntos, 'horizontes': horizontes}
+            resultado.update(Algoritmos.medir_tiempo(funcion, *args, repeticiones=repeticiones))
+            resultados.append(resultado)
+        return resultados
+
+    @staticmethod
+    def lagrange(tamanos=(10, 50, 100, 200), puntos=50, repeticiones=3):
+        """
+        Interpolación de Lagrange con n nodos de Chebyshev en [60, 150]
+        días: fórmula clásica (doble bucle por punto) vs baricéntrica.
+        Reporta tiempo y error máximo contra la función original.
+        """
+        def lagrange_clasica(fechas, producciones, dias):
+            # Versión de libro: O(n²) por punto evaluado
+            resultado = []
+            for dia in dias:
+                total = 0.0
+                for i in range(len(fechas)):
+                    termino = producciones[i]
+                    for j in range(len(fechas)):
+                        if i != j:
+                            termino *= (dia - fechas[j]) / (fechas[i] - fechas[j])
+                    total += termino
+                resultado.append(total)
+            return resultado
+
+        def funcion(dia):
+            return 1000 + 800 * math.sin(dia / 12) + 1 / (1 + ((dia - 105) / 9) ** 2) * 500
+
+        dias = [60 + 90 * (k + 0.5) / puntos for k in range(puntos)]
+        reales = [funcion(d) for d in dias]
+        resultados = []
+        for n in tamanos:
+            nodos = [105 + 45 * math.cos(math.pi * (2 * k + 1) / (2 * n)) for k in range(n)]
+            producciones = [funcion(d) for d in nodos]
+            for nombre, metodo in (('lagrange_clasica', lagrange_clasica),
+                                   ('lagrange_baricentrica', MetodosNumericos.interpolacion_baricentrica)):
+                estimados = metodo(nodos, producciones, dias)
+                resultado = {'estructura': 'MetodosNumericos', 'caso': nombre, 'n': n, 'puntos': puntos,
+                             'error_maximo': max(abs(e - r) for e, r in zip(estimados, reales))}
+                resultado.update(Algoritmos.medir_tiempo(metodo, nodos, producciones, dias,
+                                                         repeticiones=repeticiones))
+                resultados.append(resultado)
+        return resultados
+
+    @staticmethod
+    def a_json(reporte, ruta=None):
+        """Serializa un reporte a JSON; si se da ruta, lo guarda en disco"""
+        texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+        if ruta:
+            with open(ruta, 'w', encoding='utf-8') as f:
+                f.write(texto)
+        return texto
@@ -0,0 +1,318 @@
+# Módulo de carga masiva de SQL (archivos de esquema, seeds y volcados)
+# Archivo: modulos/cargador_sql.py
+
+import os
+import re
+import sys
+import tempfile
+import time
+
+
+class CargadorSQL:
+    """
+    Ejecuta archivos SQL grandes de forma rápida y sin perder sentencias:
+    - tokenizador que respeta comillas ('...', "...", `...`), comentarios
+      (--, #, /* */) y bloques DELIMITER (procedimientos almacenados)
+    - lee el archivo por bloques de líneas, sin cargarlo completo
+    - une INSERT consecutivos a la misma tabla en INSERT extendidos
+      (varias filas por sentencia) y confirma por lotes de sentencias
+      dentro de una transacción
+    - reporta progreso (bytes, sentencias, filas y sentencias/s)
+    Para filas generadas en Python: cargar_filas (executemany por lotes o
+    LOAD DATA LOCAL INFILE).
+    Demuestra: Estructura de Datos (autómata de tokens) + Análisis de Algoritmos
+    """
+
+    TAMANO_BLOQUE = 1 << 20      # Bytes leídos del archivo por bloque
+    MAX_BYTES_INSERT = 1 << 20   # Tamaño máximo de un INSERT extendido (< max_allowed_packet)
+
+    _RE_DELIMITER = re.compile(r'[ \t\r\n]*DELIMITER[ \t]+(\S+)[^\n]*(?:\n|\Z)', re.IGNORECASE)
+    _RE_INSERT = re.compile(
+        r'(INSERT\s+(?:IGNORE\s+)?INTO\s+[`\w.]+\s*\([^()]*\)\s*VALUES)\s*(\(.*\))',
+        re.IGNORECASE | re.DOTALL)
+    _RE_NO_AGRUPABLE = re.compile(r'\bON\s+DUPLICATE\b|\bLAST_INSERT_ID\b|@', re.IGNORECASE)
+    _RE_ESPACIOS = re.compile(r'\s+')
+    _patrones = {}
+
+    def __init__(self, conexion, tamano_lote=500, filas_por_insert=1000,
+                 continuar_en_error=False, progreso=None, intervalo_progreso=1.0):
+        """
+        - tamano_lote: sentencias ejecutadas por transacción (commit)
+        - filas_por_insert: filas máximas al unir INSERT consecutivos
+        - continuar_en_error: registrar el error y seguir (por defecto se
+          revierte el lote y se detiene)
+        - progreso: función que recibe el diccionario de estado
+        """
+        self.conexion = conexion
+        self.tamano_lote = tamano_lote
+        self.filas_por_insert = filas_por_insert
+        self.continuar_en_error = continuar_en_error
+        self.progreso = progreso
+        self.intervalo_progreso = intervalo_progreso
+
+    # ---------- Tokenizador ----------
+
+    @staticmethod
+    def _patron(delimitador):
+        """Tokens que importan al separar sentencias: literales, comentarios y delimitador"""
+        patron = CargadorSQL._patrones.get(delimitador)
+        if patron is None:
+            patron = re.compile(
+                r"'(?:[^'\\]+|\\[\s\S]|'')*'?"
+                r'|"(?:[^"\\]+|\\[\s\S]|"")*"?'
+                r'|`(?:[^`]+|``)*`?'
+                r'|--(?=[ \t\r\n]|\Z)[^\n]*'
+                r'|#[^\n]*'
+                r'|/\*(?!!)[\s\S]*?(?:\*/|\Z)'
+                r'|' + re.escape(delimitador))
+            CargadorSQL._patrones[delimitador] = patron
+        return patron
+
+    @staticmethod
+    def sentencias(bloques):
+        """
+        Generador de sentencias a partir de texto SQL.
+        bloques: texto completo o iterable de fragmentos que terminan en fin
+        de línea (así un delimitador nunca queda partido entre dos bloques).
+        Los comentarios se descartan, salvo los ejecutables /*! ... */.
+        """
+        if isinstance(bloques, str):
+            bloques = [bloques]
+        fuente = iter(bloques)
+        delimitador = ';'
+        patron = CargadorSQL._patron(delimitador)
+        buffer = ''
+        pos = inicio = 0      # pos: siguiente carácter a examinar; inicio: texto aún no copiado
+        partes = []           # Fragmentos de la sentencia actual (sin comentarios)
+        vacia = True          # La sentencia actual aún no tiene texto
+        fin = False
+
+        while True:
+            m = CargadorSQL._RE_DELIMITER.match(buffer, pos) if vacia else None
+            if m is None:
+                m = patron.search(buffer, pos)
+            # Un token que llega al final del buffer puede continuar en el siguiente bloque
+            if m is None or m.end() == len(buffer):
+                if not fin:
+                    bloque = next(fuente, None)
+                    if bloque is None:
+                        fin = True
+                    else:
+                        buffer = buffer[inicio:] + bloque
+                        pos -= inicio
+                        inicio = 0
+                    continue
+                if m is None:
+                    partes.append(buffer[inicio:])
+                    sentencia = ''.join(partes).strip()
+                    if sentencia:
+                        yield sentencia
+                    return
+
+            if m.re is CargadorSQL._RE_DELIMITER:
+                delimitador = m.group(1)
+                patron = CargadorSQL._patron(delimitador)
+                pos = inicio = m.end()
+                partes = []
+                continue
+
+            token = m.group()
+            if vacia and buffer[pos:m.start()].strip():
+                vacia = False
+            if token == delimitador:
+                partes.append(buffer[inicio:m.start()])
+                sentencia = ''.join(partes).strip()
+                if sentencia:
+                    yield sentencia
+                partes = []
+                vacia = True
+            elif token[0] in '-#/':
+                # Comentario: se reemplaza por un espacio
+                partes.append(buffer[inicio:m.start()])
+                partes.append(' ')
+            else:
+                vacia = False
+                pos = m.end()
+                continue
+            pos = inicio = m.end()
+
+    @staticmethod
+    def leer_bloques(ruta, tamano=TAMANO_BLOQUE, contador=None):
+        """
+        Lee el archivo por bloques de líneas completas (UTF-8).
+        contador: lista de un elemento donde se acumulan los bytes leídos.
+        """
+        codificacion = 'utf-8-sig'  # Descarta el BOM del primer bloque si existe
+        with open(ruta, 'rb') as f:
+            while True:
+                lineas = f.readlines(tamano)
+                if not lineas:
+                    return
+                bloque = b''.join(lineas)
+                if contador is not None:
+                    contador[0] += len(bloque)
+                yield bloque.decode(codificacion)
+                codificacion = 'utf-8'
+
+    # ---------- INSERT extendidos ----------
+
+    @staticmethod
+    def agrupar_inserts(sentencias, filas_por_insert=1000, max_bytes=MAX_BYTES_INSERT):
+        """
+        Une INSERT ... VALUES consecutivos a la misma tabla y columnas en un
+        solo INSERT extendido. Retorna tuplas (sentencia, sentencias_origen).
+        No se unen sentencias con variables, LAST_INSERT_ID u ON DUPLICATE;
+        tampoco la última fila antes de una sentencia que usa LAST_INSERT_ID,
+        para que siga refiriéndose a la misma fila.
+        """
+        prefijo, valores, tamano = None, [], 0
+
+        def vaciar(separar_ultima=False):
+            if not valores:
+                return
+            grupos = [valores[:-1], valores[-1:]] if separar_ultima and len(valores) > 1 else [valores]
+            for grupo in grupos:
+                yield f"{prefijo} {','.join(grupo)}", len(grupo)
+            valores.clear()
+
+        for sentencia in sentencias:
+            m = CargadorSQL._RE_INSERT.fullmatch(sentencia)
+            if m and not CargadorSQL._RE_NO_AGRUPABLE.search(m.group(2)):
+                clave = CargadorSQL._RE_ESPACIOS.sub(' ', m.group(1))
+                if clave != prefijo or len(valores) >= filas_por_insert or tamano + len(m.group(2)) > max_bytes:
+                    yield from vaciar()
+                    prefijo, tamano = clave, 0
+                valores.append(m.group(2))
+                tamano += len(m.group(2)) + 1
+                continue
+            yield from vaciar(separar_ultima=bool(CargadorSQL._RE_NO_AGRUPABLE.search(sentencia)))
+            prefijo = None
+            yield sentencia, 1
+        yield from vaciar()
+
+    # ---------- Ejecución ----------
+
+    def _reportar(self, estado, forzar=False):
+        ahora = time.perf_counter()
+        if self.progreso is None or (not forzar and ahora - estado['_ultimo'] < self.intervalo_progreso):
+            return
+        estado['_ultimo'] = ahora
+        estado['segundos'] = ahora - estado['_inicio']
+        estado['sentencias_por_s'] = estado['sentencias_origen'] / estado['segundos'] if estado['segundos'] else 0.0
+        self.progreso({k: v for k, v in estado.items() if not k.startswith('_')})
+
+    def ejecutar(self, sentencias, bytes_total=None, contador=None):
+        """
+        Ejecuta sentencias (iterable de texto) agrupando INSERT y haciendo
+        commit cada tamano_lote sentencias. Retorna el resumen de la carga.
+        """
+        cursor = self.conexion.cursor()
+        inicio = time.perf_counter()
+        estado = {'sentencias': 0, 'sentencias_origen': 0, 'filas': 0, 'errores': 0,
+                  'bytes': 0, 'bytes_total': bytes_total, '_inicio': inicio, '_ultimo': inicio}
+        pendientes = 0
+        try:
+            for sentencia, origen in self.agrupar_inserts(sentencias, self.filas_por_insert):
+                try:
+                    cursor.execute(sentencia)
+                    if cursor.with_rows:
+                        cursor.fetchall()
+                    estado['filas'] += max(cursor.rowcount, 0)
+                except Exception as err:
+                    resumen = ' '.join(sentencia[:200].split())
+                    if not self.continuar_en_error:
+                        self.conexion.rollback()
+                        raise RuntimeError(
+                            f"Error en la sentencia {estado['sentencias_origen'] + 1}: {err}\n  {resumen}") from err
+                    estado['errores'] += 1
+                    print(f"Error (se continúa): {err}\n  {resumen}", file=sys.stderr)
+                estado['sentencias'] += 1
+                estado['sentencias_origen'] += origen
+                pendientes += 1
+                if pendientes >= self.tamano_lote:
+                    self.conexion.commit()
+                    pendientes = 0
+                if contador is not None:
+                    estado['bytes'] = contador[0]
+                self._reportar(estado)
+            self.conexion.commit()
+        finally:
+            cursor.close()
+        if contador is not None:
+            estado['bytes'] = contador[0]
+        self._reportar(estado, forzar=True)
+        estado['segundos'] = time.perf_counter() - inicio
+        estado['sentencias_por_s'] = estado['sentencias_origen'] / estado['segundos'] if estado['segundos'] else 0.0
+        return {k: v for k, v in estado.items() if not k.startswith('_')}
+
+    def ejecutar_archivo(self, ruta):
+        """Ejecuta un archivo SQL completo (streaming). Retorna el resumen de la carga."""
+        contador = [0]
+        bloques = self.leer_bloques(ruta, contador=contador)
+        return self.ejecutar(self.sentencias(bloques), os.path.getsize(ruta), contador)
+
+    # ---------- Filas generadas en Python ----------
+
+    @staticmethod
+    def _valor_tsv(valor):
+        if valor is None:
+            return '\\N'
+        if hasattr(valor, 'isoformat'):
+            return valor.isoformat()
+        return (str(valor).replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+
+    def cargar_filas(self, tabla, columnas, filas, infile=False, tamano_lote=None):
+        """
+        Inserta filas (iterable de tuplas) en la tabla:
+        - infile=False: executemany por lotes (el conector los envía como
+          un INSERT extendido por lote)
+        - infile=True: escribe un TSV temporal y usa LOAD DATA LOCAL INFILE
+          (la conexión debe abrirse con allow_local_infile=True)
+        No hace commit; lo decide quien llama. Retorna el número de filas.
+        """
+        lista_columnas = ', '.join(columnas)
+        cursor = self.conexion.cursor()
+        total = 0
+        try:
+            if infile:
+                with tempfile.NamedTemporaryFile('w', suffix='.tsv', encoding='utf-8',
+                                                 newline='\n', delete=False) as archivo:
+                    for fila in filas:
+                        archivo.write('\t'.join(self._valor_tsv(v) for v in fila) + '\n')
+                        total += 1
+                try:
+                    cursor.execute(
+                        f"LOAD DATA LOCAL INFILE %s INTO TABLE {tabla} CHARACTER SET utf8mb4 "
+                        f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                        f"({lista_columnas})",
+                        (archivo.name,))
+                finally:
+                    os.remove(archivo.name)
+                return total
+
+            tamano_lote = tamano_lote or self.filas_por_insert
+            sql = (f"INSERT INTO {tabla} ({lista_columnas}) "
+                   f"VALUES ({', '.join(['%s'] * len(columnas))})")
+            lote = []
+            for fila in filas:
+                lote.append(tuple(fila))
+                if len(lote) >= tamano_lote:
+                    cursor.executemany(sql, lote)
+                    total += len(lote)
+                    lote = []
+            if lote:
+                cursor.executemany(sql, lote)
+                total += len(lote)
+            return total
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def imprimir_progreso(estado):
+        """Función de progreso para scripts de consola"""
+        porcentaje = ''
+        if estado.get('bytes_total'):
+            porcentaje = f"{100 * estado['bytes'] / estado['bytes_total']:5.1f}% "
+        print(f"\r  {porcentaje}{estado['sentencias_origen']} sentencias, {estado['filas']} filas, "
+              f"{estado['sentencias_por_s']:.0f} sentencias/s", end='', flush=True)
@@ -0,0 +1,235 @@
+# Módulo de almacenamiento columnar para análisis en memoria
+# Archivo: modulos/columnar.py
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+
+
+class TablaColumnar:
+    """
+    Contenedor columnar compacto para filas de siembra/cosecha.
+    Cada columna es un arreglo NumPy: números en float64/int64, fechas en
+    datetime64 y textos (cultivo, lote, ...) como categorías internadas
+    (códigos int32 + tabla de etiquetas). Una fila ocupa unas decenas de
+    bytes en lugar de los cientos de un diccionario.
+    Demuestra: Estructura de Datos - Almacenamiento columnar
+    """
+
+    def __init__(self, columnas, categorias=None):
+        self.columnas = dict(columnas)
+        self.categorias = dict(categorias or {})
+        longitudes = {len(c) for c in self.columnas.values()}
+        if len(longitudes) > 1:
+            raise ValueError('Todas las columnas deben tener la misma longitud')
+
+    # ---------- Construcción ----------
+
+    @staticmethod
+    def _convertir(valores, categorica=False):
+        """Convierte una lista de valores de Python en (arreglo, categorías)"""
+        muestra = next((v for v in valores if v is not None), None)
+
+        if categorica or isinstance(muestra, str):
+            indice = {}
+            codigos = np.empty(len(valores), dtype=np.int32)
+            for i, v in enumerate(valores):
+                codigos[i] = -1 if v is None else indice.setdefault(v, len(indice))
+            etiquetas = np.empty(len(indice), dtype=object)
+            for etiqueta, codigo in indice.items():
+                etiquetas[codigo] = etiqueta
+            return codigos, etiquetas
+        if isinstance(muestra, bool):
+            return np.array(valores, dtype=bool), None
+        if isinstance(muestra, (int, float, Decimal)):
+            # int64 solo si todos son enteros (sin None); un float o Decimal en
+            # cualquier posición lleva la columna a float64
+            if all(isinstance(v, int) and not isinstance(v, bool) for v in valores):
+                return np.array(valores, dtype=np.int64), None
+            return np.array([np.nan if v is None else v for v in valores], dtype=np.float64), None
+        if isinstance(muestra, datetime):
+            return np.array(valores, dtype='datetime64[s]'), None
+        if isinstance(muestra, date):
+            return np.array(valores, dtype='datetime64[D]'), None
+        return np.array(valores, dtype=object), None
+
+    @classmethod
+    def desde_filas(cls, filas, categoricas=()):
+        """
+        Construye la tabla desde una lista de diccionarios (por ejemplo el
+        resultado de cursor(dictionary=True).fetchall()).
+        - categoricas: columnas a internar aunque no sean texto (ej: 'id_lote')
+        """
+        filas = list(filas)
+        if not filas:
+            return cls({})
+        nombres = list(filas[0].keys())
+        columnas, categorias = {}, {}
+        for nombre in nombres:
+            arreglo, etiquetas = cls._convertir([f.get(nombre) for f in filas],
+                                                nombre in categoricas)
+            columnas[nombre] = arreglo
+            if etiquetas is not None:
+                categorias[nombre] = etiquetas
+        return cls(columnas, categorias)
+
+    @classmethod
+    def desde_cursor(cls, cursor, categoricas=(), tamano_bloque=10000):
+        """
+        Construye la tabla leyendo el cursor por bloques con fetchmany,
+        para no mantener todas las filas como diccionarios a la vez.
+        Acepta cursores normales o de diccionario.
+        """
+        nombres = [d[0] for d in cursor.description]
+        partes = []
+        while True:
+            bloque = cursor.fetchmany(tamano_bloque)
+            if not bloque:
+                break
+            if not isinstance(bloque[0], dict):
+                bloque = [dict(zip(nombres, fila)) for fila in bloque]
+            partes.append(cls.desde_filas(bloque, categoricas))
+        if not partes:
+            return cls({nombre: np.empty(0) for nombre in nombres})
+        return cls.concatenar(partes)
+
+    @classmethod
+    def concatenar(cls, tablas):
+        """Une varias tablas con las mismas columnas, re-internando categorías"""
+        tablas = [t for t in tablas if len(t)]
+        if not tablas:
+            return cls({})
+        if len(tablas) == 1:
+            return tablas[0]
+        columnas, categorias = {}, {}
+        for nombre in tablas[0].columnas:
+            categorica = [nombre in t.categorias for t in tablas]
+            if all(categorica) and all(
+                    t.categorias[nombre] is tablas[0].categorias[nombre] for t in tablas):
+                # Misma tabla de categorías: basta concatenar los códigos
+                columnas[nombre] = np.concatenate([t.columnas[nombre] for t in tablas])
+                categorias[nombre] = tablas[0].categorias[nombre]
+            elif any(categorica) or len({t.columnas[nombre].dtype for t in tablas}) > 1:
+                # Categorías distintas o tipos inferidos distintos por bloque
+                # (enteros y decimales, un bloque solo con NULL): se vuelve a
+                # inferir el tipo sobre todos los valores
+                valores = np.concatenate([t.valores(nombre).astype(object) for t in tablas])
+                columnas[nombre], etiquetas = cls._convertir(valores.tolist(), any(categorica))
+                if etiquetas is not None:
+                    categorias[nombre] = etiquetas
+            else:
+                columnas[nombre] = np.concatenate([t.columnas[nombre] for t in tablas])
+        return cls(columnas, categorias)
+
+    # ---------- Acceso ----------
+
+    def __len__(self):
+        return len(next(iter(self.columnas.values()))) if self.columnas else 0
+
+    def __contains__(self, nombre):
+        return nombre in self.columnas
+
+    @property
+    def nombres(self):
+        return list(self.columnas.keys())
+
+    def columna(self, nombre):
+        """Arreglo de la columna (códigos int32 si es categórica)"""
+        return self.columnas[nombre]
+
+    def es_categorica(self, nombre):
+        return nombre in self.categorias
+
+    def valores(self, nombre):
+        """Valores decodificados de la columna (etiquetas si es categórica)"""
+        arreglo = self.columnas[nombre]
+        if nombre not in self.categorias:
+            return arreglo
+        etiquetas = np.append(self.categorias[nombre], None)  # código -1 -> None
+        return etiquetas[arreglo]
+
+    def numerica(self, nombre):
+        """Columna como float64 (fechas en días/segundos desde 1970, categorías por rango alfabético)"""
+        arreglo = self.columnas[nombre]
+        if nombre in self.categorias:
+            etiquetas = self.categorias[nombre]
+            rangos = np.empty(len(etiquetas) + 1, dtype=np.float64)
+            rangos[:-1] = np.argsort(np.argsort(etiquetas.astype(str), kind='stable'))
+            rangos[-1] = -np.inf  # None primero
+            return rangos[arreglo]
+        if np.issubdtype(arreglo.dtype, np.datetime64):
+            numeros = arreglo.astype(np.int64).astype(np.float64)
+            numeros[np.isnat(arreglo)] = -np.inf
+            return numeros
+        return arreglo.astype(np.float64)
+
+    def fila(self, i):
+        """Fila i como diccionario"""
+        return {nombre: self._escalar(nombre, i) for nombre in self.columnas}
+
+    def _escalar(self, nombre, i):
+        valor = self.columnas[nombre][i]
+        if nombre in self.categorias:
+            return None if valor < 0 else self.categorias[nombre][valor]
+        return valor.item() if hasattr(valor, 'item') else valor
+
+    def __iter__(self):
+        """Recorre las filas como diccionarios (compatibilidad con código basado en filas)"""
+        for i in range(len(self)):
+            yield self.fila(i)
+
+    def a_filas(self):
+        return list(self)
+
+    # ---------- Operaciones vectorizadas ----------
+
+    def tomar(self, indices):
+        """Nueva tabla con las filas indicadas (índices o máscara booleana)"""
+        return TablaColumnar({n: c[indices] for n, c in self.columnas.items()}, self.categorias)
+
+    def seleccionar(self, nombres):
+        """Nueva tabla solo con las columnas indicadas (sin copiar datos)"""
+        return TablaColumnar({n: self.columnas[n] for n in nombres},
+                             {n: c for n, c in self.categorias.items() if n in nombres})
+
+    def filtrar(self, mascara):
+        """Nueva tabla con las filas donde la máscara es True"""
+        return self.tomar(np.asarray(mascara, dtype=bool))
+
+    def codigo(self, nombre, etiqueta):
+        """Código de una etiqueta en una columna categórica (-2 si no existe)"""
+        coincidencias = np.flatnonzero(self.categorias[nombre] == etiqueta)
+        return int(coincidencias[0]) if len(coincidencias) else -2
+
+    def agregar_por(self, clave, valor, funcion='media'):
+        """
+        Agrega la columna `valor` por grupos de la columna categórica `clave`.
+        funcion: 'suma', 'media' o 'conteo'. Ignora valores NaN.
+        Retorna: diccionario etiqueta -> resultado
+        """
+        codigos = self.columnas[clave]
+        etiquetas = self.categorias[clave]
+        datos = self.numerica(valor)
+        validos = (codigos >= 0) & ~np.isnan(datos)
+        conteo = np.bincount(codigos[validos], minlength=len(etiquetas))
+        if funcion == 'conteo':
+            resultado = conteo.astype(np.float64)
+        else:
+            suma = np.bincount(codigos[validos], weights=datos[validos], minlength=len(etiquetas))
+            if funcion == 'suma':
+                resultado = suma
+            elif funcion == 'media':
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    resultado = suma / conteo
+            else:
+                raise ValueError(f'Función de agregación no soportada: {funcion}')
+        return {etiquetas[i]: float(resultado[i]) for i in range(len(etiquetas)) if conteo[i] > 0}
+
+    @property
+    def nbytes(self):
+        """Bytes ocupados por las columnas y las tablas de categorías"""
+        total = sum(c.nbytes for c in self.columnas.values())
+        for etiquetas in self.categorias.values():
+            total += etiquetas.nbytes + sum(len(str(e)) + 49 for e in etiquetas)
+        return total
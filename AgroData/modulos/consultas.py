@@ -0,0 +1,459 @@
+# Consultas SQL compartidas entre la aplicación y los scripts
+# Archivo: modulos/consultas.py
+
+"""
+Definiciones de consultas SQL reutilizadas por app.py y por los scripts
+de mantenimiento, para que ambos usen exactamente la misma lógica.
+"""
+
+# ==================== SIEMBRAS ACTIVAS ====================
+
+# Una siembra está activa (en el suelo) mientras no esté cosechada ni
+# perdida y no tenga cosechas registradas: sembrado, crecimiento y
+# floracion. Criterio único del dashboard, las alertas, el pronóstico y
+# la simulación de riesgo.
+ESTADOS_FINALES = ('cosechado', 'perdido')
+SQL_ESTADO_ACTIVO = "s.estado NOT IN ({})".format(", ".join(f"'{e}'" for e in ESTADOS_FINALES))
+
+# Filtro {filtro} de SQL_HECHOS_SIEMBRA (co = cosechas agregadas por siembra)
+FILTRO_SIEMBRAS_ACTIVAS = f"AND {SQL_ESTADO_ACTIVO} AND co.id_siembra IS NULL"
+
+# Siembra cerrada a una fecha de corte (la que entra a los snapshots): sembrada
+# antes del corte y finalizada, o con cosechas y ninguna desde el corte. Las
+# demás pueden cambiar todavía y se leen siempre de MySQL. Parámetros: (corte, corte)
+SQL_SIEMBRA_CERRADA = """(s.fecha_siembra < %s AND (s.estado IN ({estados}) OR (
+        EXISTS (SELECT 1 FROM cosecha cx WHERE cx.id_siembra = s.id_siembra)
+        AND NOT EXISTS (SELECT 1 FROM cosecha cx WHERE cx.id_siembra = s.id_siembra
+                        AND cx.fecha_cosecha >= %s))))""".format(
+    estados=", ".join(f"'{e}'" for e in ESTADOS_FINALES))
+
+# Ids de las siembras de una finca (las que existen al exportar un snapshot)
+SQL_IDS_SIEMBRA_FINCA = """
+    SELECT s.id_siembra
+    FROM siembra s
+    JOIN lote l ON s.id_lote = l.id_lote
+    WHERE l.id_finca = %s AND s.area_sembrada > 0
+"""
+
+# ==================== ALERTAS DE COSECHA ====================
+
+# Umbrales (días hasta la fecha estimada de cosecha) para cada prioridad
+DIAS_ALERTA_URGENTE = 5
+DIAS_ALERTA_PROXIMA = 15
+
+# Recalcula la fecha estimada de cosecha a partir de la fecha de siembra
+# y los días estimados del cultivo. {filtro} permite limitar las filas.
+SQL_CALCULAR_FECHA_COSECHA = """
+    UPDATE siembra s
+    JOIN cultivo c ON s.id_cultivo = c.id_cultivo
+    SET s.fecha_cosecha_estimada = DATE_ADD(s.fecha_siembra, INTERVAL COALESCE(c.dias_cosecha_estimado, 90) DAY)
+    {filtro}
+"""
+
+# Siembras activas sin cosechar cuya cosecha estimada cae dentro de la
+# ventana de alerta. Es un rango acotado sobre fecha_cosecha_estimada.
+_SELECT_ALERTAS_COSECHA = """
+    SELECT
+        {columnas_extra}
+        s.id_siembra,
+        cu.nombre as cultivo,
+        l.nombre as lote,
+        s.fecha_cosecha_estimada,
+        CASE WHEN s.fecha_cosecha_estimada <= CURDATE() + INTERVAL {urgente} DAY
+             THEN 1 ELSE 2 END as prioridad
+        {columnas_finales}
+    FROM finca f
+    JOIN lote l ON l.id_finca = f.id_finca
+    JOIN siembra s ON s.id_lote = l.id_lote
+    JOIN cultivo cu ON s.id_cultivo = cu.id_cultivo
+    LEFT JOIN cosecha co ON s.id_siembra = co.id_siembra
+    WHERE {filtro_usuario}
+      AND {estado_activo}
+      AND co.id_cosecha IS NULL
+      AND s.fecha_cosecha_estimada <= CURDATE() + INTERVAL {proxima} DAY
+"""
+
+SQL_ALERTAS_COSECHA = _SELECT_ALERTAS_COSECHA.format(
+    columnas_extra='',
+    columnas_finales='',
+    filtro_usuario='f.user_id = %s',
+    urgente=DIAS_ALERTA_URGENTE,
+    proxima=DIAS_ALERTA_PROXIMA,
+    estado_activo=SQL_ESTADO_ACTIVO
+)
+
+# Lista pre-materializada por el job diario (scripts/refrescar_alertas.py).
+# alerta_cosecha_refresco marca qué usuarios tienen la lista del día al día:
+# sin marca no hay filas (consultar en vivo); con marca y sin alertas queda
+# una única fila con id_siembra NULL (lista vacía pero vigente).
+SQL_ALERTAS_MATERIALIZADAS = """
+    SELECT a.id_siembra, a.cultivo, a.lote, a.fecha_cosecha_estimada, a.prioridad
+    FROM alerta_cosecha_refresco r
+    LEFT JOIN alerta_cosecha a
+           ON a.user_id = r.user_id AND a.fecha_calculo = r.fecha_calculo
+    WHERE r.user_id = %s AND r.fecha_calculo = CURDATE()
+"""
+
+SQL_REFRESCAR_ALERTAS = """
+    INSERT INTO alerta_cosecha
+        (user_id, id_siembra, cultivo, lote, fecha_cosecha_estimada, prioridad, fecha_calculo)
+""" + _SELECT_ALERTAS_COSECHA.format(
+    columnas_extra='f.user_id,',
+    columnas_finales=', CURDATE()',
+    filtro_usuario='f.user_id IS NOT NULL {filtro}',
+    urgente=DIAS_ALERTA_URGENTE,
+    proxima=DIAS_ALERTA_PROXIMA,
+    estado_activo=SQL_ESTADO_ACTIVO
+)
+
+# Marca los usuarios refrescados; {filtro} permite limitar a un usuario
+SQL_MARCAR_REFRESCO_ALERTAS = """
+    INSERT INTO alerta_cosecha_refresco (user_id, fecha_calculo)
+    SELECT DISTINCT f.user_id, CURDATE()
+    FROM finca f
+    WHERE f.user_id IS NOT NULL {filtro}
+    ON DUPLICATE KEY UPDATE fecha_calculo = VALUES(fecha_calculo)
+"""
+
+# Invalida la lista materializada del dueño de un lote (al registrar siembras):
+# basta con quitar su marca, el dashboard vuelve a la consulta en vivo y el
+# próximo refresco reemplaza las filas.
+SQL_INVALIDAR_ALERTAS_LOTE = """
+    DELETE r FROM alerta_cosecha_refresco r
+    JOIN finca f ON r.user_id = f.user_id
+    JOIN lote l ON l.id_finca = f.id_finca
+    WHERE l.id_lote = %s
+"""
+
+# Igual, para el dueño actual de una finca (antes y después de reasignarla)
+SQL_INVALIDAR_ALERTAS_FINCA = """
+    DELETE r FROM alerta_cosecha_refresco r
+    JOIN finca f ON r.user_id = f.user_id
+    WHERE f.id_finca = %s
+"""
+
+SQL_INVALIDAR_ALERTAS_USUARIO = "DELETE FROM alerta_cosecha_refresco WHERE user_id = %s"
+
+# Quita la alerta de una siembra (al registrar su cosecha)
+SQL_ELIMINAR_ALERTA_SIEMBRA = "DELETE FROM alerta_cosecha WHERE id_siembra = %s"
+
+# ==================== HECHOS HISTÓRICOS (ANÁLISIS) ====================
+
+# Hechos por siembra con cosecha e insumos ya agregados. {filtro} recibe
+# condiciones adicionales (usuario, finca, rango de fechas de siembra).
+SQL_HECHOS_SIEMBRA = """
+    SELECT
+        s.id_siembra,
+        YEAR(s.fecha_siembra) as anio,
+        f.id_finca,
+        f.nombre as finca,
+        l.nombre as lote,
+        c.nombre as cultivo,
+        s.estado,
+        s.fecha_siembra,
+        s.area_sembrada,
+        l.ph_suelo,
+        DATEDIFF(co.primera_cosecha, s.fecha_siembra) as dias_cosecha,
+        COALESCE(s.costo_siembra, 0) as costo_siembra,
+        COALESCE(co.total_kg, 0) as total_kg,
+        COALESCE(co.total_kg / s.area_sembrada, 0) as rendimiento,
+        COALESCE(co.ingreso_total, 0) as ingreso_total,
+        COALESCE(ap.costo_insumos, 0) as costo_insumos,
+        COALESCE(ap.cantidad_insumos, 0) as cantidad_insumos
+    FROM siembra s
+    JOIN cultivo c ON s.id_cultivo = c.id_cultivo
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    LEFT JOIN (
+        SELECT id_siembra, SUM(cantidad_kg) as total_kg, SUM(ingreso_total) as ingreso_total,
+               MIN(fecha_cosecha) as primera_cosecha
+        FROM cosecha
+        GROUP BY id_siembra
+    ) co ON s.id_siembra = co.id_siembra
+    LEFT JOIN (
+        SELECT id_siembra, SUM(costo_aplicacion) as costo_insumos, SUM(cantidad_aplicada) as cantidad_insumos
+        FROM aplicacion_insumo
+        GROUP BY id_siembra
+    ) ap ON s.id_siembra = ap.id_siembra
+    WHERE s.area_sembrada > 0 {filtro}
+    ORDER BY s.fecha_siembra, s.id_siembra
+"""
+
+# ==================== VERSIÓN DE LOS DATOS ====================
+
+# Contador por usuario (tabla version_datos) que se incrementa en cada
+# escritura de sus siembras, cosechas o aplicaciones, desde la aplicación o
+# desde los scripts de carga. Los cachés de estadísticas se validan con una
+# lectura por llave primaria en lugar de agregar el historial. Las fincas sin
+# dueño usan user_id = 0.
+SQL_VERSION_DATOS = "SELECT COALESCE(MAX(version), 0) FROM version_datos WHERE user_id = %s"
+SQL_VERSION_DATOS_TOTAL = "SELECT COALESCE(SUM(version), 0) FROM version_datos"
+
+SQL_INCREMENTAR_VERSION_USUARIO = """
+    INSERT INTO version_datos (user_id, version) VALUES (%s, 1)
+    ON DUPLICATE KEY UPDATE version = version + 1
+"""
+
+_INCREMENTAR_VERSION = """
+    INSERT INTO version_datos (user_id, version)
+    SELECT DISTINCT COALESCE(f.user_id, 0), 1
+    FROM finca f
+    {joins}
+    WHERE {condicion}
+    ON DUPLICATE KEY UPDATE version = version + 1
+"""
+
+SQL_INCREMENTAR_VERSION_FINCA = _INCREMENTAR_VERSION.format(joins='', condicion='f.id_finca = %s')
+SQL_INCREMENTAR_VERSION_LOTE = _INCREMENTAR_VERSION.format(
+    joins='JOIN lote l ON l.id_finca = f.id_finca', condicion='l.id_lote = %s')
+SQL_INCREMENTAR_VERSION_SIEMBRA = _INCREMENTAR_VERSION.format(
+    joins='JOIN lote l ON l.id_finca = f.id_finca JOIN siembra s ON s.id_lote = l.id_lote',
+    condicion='s.id_siembra = %s')
+# Todos los dueños de fincas (cargas masivas o cambios por SQL directo)
+SQL_INCREMENTAR_VERSIONES = _INCREMENTAR_VERSION.format(joins='', condicion='1 = 1')
+
+SQL_HECHOS_COSECHA = """
+    SELECT
+        co.id_cosecha,
+        co.id_siembra,
+        YEAR(s.fecha_siembra) as anio,
+        co.fecha_cosecha,
+        DATEDIFF(co.fecha_cosecha, s.fecha_siembra) as dias,
+        co.cantidad_kg,
+        co.calidad_porcentaje,
+        co.precio_venta_kg,
+        co.ingreso_total
+    FROM cosecha co
+    JOIN siembra s ON co.id_siembra = s.id_siembra
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE 1 = 1 {filtro}
+    ORDER BY co.fecha_cosecha, co.id_cosecha
+"""
+
+SQL_HECHOS_APLICACION = """
+    SELECT
+        ai.id_aplicacion,
+        ai.id_siembra,
+        YEAR(s.fecha_siembra) as anio,
+        ai.fecha_aplicacion,
+        i.nombre as insumo,
+        i.tipo,
+        ai.cantidad_aplicada,
+        ai.costo_aplicacion
+    FROM aplicacion_insumo ai
+    JOIN insumo i ON ai.id_insumo = i.id_insumo
+    JOIN siembra s ON ai.id_siembra = s.id_siembra
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE 1 = 1 {filtro}
+    ORDER BY ai.fecha_aplicacion, ai.id_aplicacion
+"""
+
+# ==================== PANTALLAS DE LA APLICACIÓN ====================
+
+# Resumen del dashboard (todas filtradas por el dueño de la finca)
+SQL_RESUMEN_DASHBOARD = """
+    SELECT 
+        COUNT(DISTINCT s.id_siembra) as total_siembras,
+        COUNT(DISTINCT CASE WHEN {estado_activo} AND c.id_cosecha IS NULL
+                            THEN s.id_siembra END) as siembras_activas,
+        COUNT(DISTINCT c.id_cosecha) as total_cosechas,
+        COALESCE(SUM(c.ingreso_total), 0) as ingreso_total
+    FROM siembra s
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    LEFT JOIN cosecha c ON s.id_siembra = c.id_siembra
+    WHERE f.user_id = %s
+""".format(estado_activo=SQL_ESTADO_ACTIVO)
+
+SQL_LISTAR_SIEMBRAS = """
+    SELECT 
+        s.id_siembra,
+        l.nombre as lote,
+        c.nombre as cultivo,
+        s.fecha_siembra,
+        s.area_sembrada,
+        s.estado
+    FROM siembra s
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    JOIN cultivo c ON s.id_cultivo = c.id_cultivo
+    WHERE f.user_id = %s
+    ORDER BY s.fecha_siembra DESC
+"""
+
+SQL_LOTES_ACTIVOS = """
+    SELECT l.* FROM lote l
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE l.estado = 'activo' AND f.user_id = %s
+    ORDER BY l.nombre
+"""
+
+SQL_LISTAR_COSECHAS = """
+    SELECT 
+        co.id_cosecha,
+        c.nombre as cultivo,
+        l.nombre as lote,
+        s.fecha_siembra,
+        co.fecha_cosecha,
+        co.cantidad_kg,
+        s.area_sembrada,
+        co.cantidad_kg / s.area_sembrada as rendimiento,
+        co.ingreso_total
+    FROM cosecha co
+    JOIN siembra s ON co.id_siembra = s.id_siembra
+    JOIN cultivo c ON s.id_cultivo = c.id_cultivo
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE f.user_id = %s
+    ORDER BY co.fecha_cosecha DESC
+"""
+
+# Siembras sin cosechar (opciones del formulario de cosecha)
+SQL_SIEMBRAS_SIN_COSECHA = """
+    SELECT 
+        s.id_siembra,
+        CONCAT(c.nombre, ' - Lote ', l.nombre, ' (', s.fecha_siembra, ')') as descripcion
+    FROM siembra s
+    JOIN cultivo c ON s.id_cultivo = c.id_cultivo
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    LEFT JOIN cosecha co ON s.id_siembra = co.id_siembra
+    WHERE f.user_id = %s AND s.estado != 'cosechado' AND co.id_cosecha IS NULL
+"""
+
+SQL_LISTAR_INSUMOS = """
+    SELECT 
+        i.*,
+        f.nombre as finca
+    FROM insumo i
+    JOIN finca f ON i.id_finca = f.id_finca
+    WHERE f.user_id = %s
+    ORDER BY i.cantidad_disponible ASC
+"""
+
+SQL_LISTAR_LOTES = """
+    SELECT l.*, f.nombre AS finca
+    FROM lote l
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE f.user_id = %s
+    ORDER BY f.nombre, l.nombre
+"""
+
+# Rendimiento promedio por cultivo de todos los usuarios (demo de estructuras)
+SQL_RENDIMIENTO_CULTIVOS = """
+    SELECT 
+        c.nombre as cultivo,
+        AVG(co.cantidad_kg / s.area_sembrada) as rendimiento
+    FROM cultivo c
+    JOIN siembra s ON c.id_cultivo = s.id_cultivo
+    JOIN cosecha co ON s.id_siembra = co.id_siembra
+    GROUP BY c.id_cultivo
+"""
+
+# ==================== REPORTES ====================
+
+# Top-k de lotes resuelto en MySQL. {criterio} es una columna de
+# Algoritmos.CRITERIOS_RANKING; parámetros: (user_id, k)
+SQL_RANKING_LOTES = """
+    SELECT 
+        l.nombre as lote,
+        AVG(co.kg / s.area_sembrada) as rendimiento,
+        COUNT(s.id_siembra) as total_siembras,
+        SUM(co.ingreso) as ingreso_total,
+        SUM(co.ingreso - COALESCE(s.costo_siembra, 0) - COALESCE(ap.costo_apps, 0)) as margen
+    FROM lote l
+    JOIN siembra s ON l.id_lote = s.id_lote
+    JOIN (
+        SELECT id_siembra, SUM(cantidad_kg) as kg, COALESCE(SUM(ingreso_total), 0) as ingreso
+        FROM cosecha
+        GROUP BY id_siembra
+    ) co ON s.id_siembra = co.id_siembra
+    LEFT JOIN (
+        SELECT id_siembra, SUM(costo_aplicacion) as costo_apps
+        FROM aplicacion_insumo
+        GROUP BY id_siembra
+    ) ap ON s.id_siembra = ap.id_siembra
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE f.user_id = %s AND s.area_sembrada > 0
+    GROUP BY l.id_lote
+    ORDER BY {criterio} DESC, l.id_lote
+    LIMIT %s
+"""
+
+# Historial (día desde la siembra, kg) para la proyección por interpolación
+SQL_HISTORICO_PROYECCION = """
+    SELECT 
+        DATEDIFF(co.fecha_cosecha, s.fecha_siembra) as dia,
+        co.cantidad_kg as kg
+    FROM cosecha co
+    JOIN siembra s ON co.id_siembra = s.id_siembra
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE f.user_id = %s
+    ORDER BY s.fecha_siembra
+    LIMIT 10
+"""
+
+# Entradas del punto de equilibrio global del usuario
+SQL_COSTO_FIJO = """
+    SELECT AVG(s.costo_siembra) as costo_fijo
+    FROM siembra s
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE f.user_id = %s
+"""
+
+# Costo variable por kg: suma de costos de aplicación / suma de kg cosechados
+SQL_COSTO_VARIABLE = """
+    SELECT 
+        COALESCE(SUM(ai.costo_aplicacion), 0) AS costo_apps,
+        COALESCE(SUM(co.cantidad_kg), 0) AS kg_totales
+    FROM siembra s
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    LEFT JOIN aplicacion_insumo ai ON ai.id_siembra = s.id_siembra
+    LEFT JOIN cosecha co ON co.id_siembra = s.id_siembra
+    WHERE f.user_id = %s
+"""
+
+SQL_PRECIO_PROMEDIO = """
+    SELECT AVG(co.precio_venta_kg) as precio 
+    FROM cosecha co
+    JOIN siembra s ON co.id_siembra = s.id_siembra
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE co.precio_venta_kg > 0 AND f.user_id = %s
+"""
+
+# Fertilizante aplicado vs rendimiento por siembra (EstadisticasAgricolas)
+SQL_CORRELACION_INSUMO = """
+    SELECT 
+        s.id_siembra,
+        COALESCE(SUM(ai.cantidad_aplicada), 0) as fertilizante_total,
+        COALESCE(SUM(co.cantidad_kg) / s.area_sembrada, 0) as rendimiento
+    FROM siembra s
+    LEFT JOIN aplicacion_insumo ai ON s.id_siembra = ai.id_siembra
+    LEFT JOIN insumo i ON ai.id_insumo = i.id_insumo AND i.tipo = 'fertilizante'
+    LEFT JOIN cosecha co ON s.id_siembra = co.id_siembra
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE s.area_sembrada > 0 {filtro}
+    GROUP BY s.id_siembra
+    HAVING fertilizante_total > 0 AND rendimiento > 0
+"""
+
+# Rendimiento promedio por cultivo del usuario (gráfico del dashboard)
+SQL_RENDIMIENTO_POR_CULTIVO = """
+    SELECT 
+        c.nombre as cultivo,
+        AVG(co.cantidad_kg / s.area_sembrada) as rendimiento_promedio
+    FROM siembra s
+    JOIN cultivo c ON s.id_cultivo = c.id_cultivo
+    JOIN cosecha co ON s.id_siembra = co.id_siembra
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE s.area_sembrada > 0 {filtro}
+    GROUP BY c.id_cultivo
+"""
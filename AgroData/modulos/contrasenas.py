@@ -0,0 +1,158 @@
+# Módulo de hashing de contraseñas fuera de los hilos de la aplicación
+# Archivo: modulos/contrasenas.py
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.context import CryptContext
+from passlib.hash import pbkdf2_sha256
+
+_contextos = {}  # rondas -> CryptContext (uno por proceso)
+
+
+def _contexto(rondas):
+    """CryptContext que exige exactamente `rondas`: hashes con otro costo piden re-hash"""
+    contexto = _contextos.get(rondas)
+    if contexto is None:
+        contexto = _contextos[rondas] = CryptContext(
+            schemes=['pbkdf2_sha256'],
+            pbkdf2_sha256__default_rounds=rondas,
+            pbkdf2_sha256__min_rounds=rondas,
+            pbkdf2_sha256__max_rounds=rondas,
+        )
+    return contexto
+
+
+# Funciones de módulo (se envían a los procesos del pool); retornan además
+# el instante en que empezaron para medir el tiempo en cola
+
+def _hashear(password, rondas):
+    return time.time(), _contexto(rondas).hash(password)
+
+
+def _verificar(password, password_hash, rondas):
+    inicio = time.time()
+    try:
+        return inicio, _contexto(rondas).verify_and_update(password, password_hash)
+    except ValueError:
+        # Hash vacío o con formato desconocido: credenciales inválidas
+        return inicio, (False, None)
+
+
+class HashContrasenas:
+    """
+    Hashea y verifica contraseñas (pbkdf2_sha256) en un pool de procesos acotado.
+
+    - pbkdf2 es CPU puro: en un proceso aparte no retiene el GIL ni el hilo
+      del servidor que atiende las demás rutas
+    - un semáforo limita las operaciones en vuelo; si no hay cupo en
+      `espera_maxima` segundos se lanza TimeoutError (la ruta responde 503)
+    - verificar() indica el hash nuevo cuando el guardado usa otro costo
+      (rondas distintas a las configuradas) para re-hashear al iniciar sesión
+    - metricas() resume el tiempo en cola y de cómputo de las últimas operaciones
+
+    Con procesos=0 se hashea en el hilo que llama (desarrollo / pruebas).
+    Demuestra: Análisis de Algoritmos (concurrencia acotada y teoría de colas)
+    """
+
+    MUESTRAS = 1000
+
+    def __init__(self, rondas=None, procesos=2, limite=8, espera_maxima=5.0):
+        self.rondas = rondas or pbkdf2_sha256.default_rounds
+        self.procesos = procesos
+        self.limite = limite
+        self.espera_maxima = espera_maxima
+        self._cupos = threading.BoundedSemaphore(limite)
+        self._pool = None
+        self._bloqueo = threading.Lock()
+        self._esperas = deque(maxlen=self.MUESTRAS)
+        self._duraciones = deque(maxlen=self.MUESTRAS)
+        self._contadores = {'operaciones': 0, 'rechazadas': 0, 'rehash': 0, 'en_curso': 0}
+
+    def _obtener_pool(self):
+        with self._bloqueo:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.procesos)
+            return self._pool
+
+    def _ejecutar(self, funcion, *args):
+        """Ejecuta funcion(*args, rondas) respetando el límite de concurrencia"""
+        encolado = time.time()
+        if not self._cupos.acquire(timeout=self.espera_maxima):
+            with self._bloqueo:
+                self._contadores['rechazadas'] += 1
+            raise TimeoutError('Demasiadas operaciones de contraseña en curso')
+        with self._bloqueo:
+            self._contadores['en_curso'] += 1
+        try:
+            if self.procesos > 0:
+                try:
+                    inicio, resultado = self._obtener_pool().submit(funcion, *args, self.rondas).result()
+                except BrokenProcessPool:
+                    # Un proceso del pool murió: se recrea en la siguiente operación
+                    with self._bloqueo:
+                        self._pool = None
+                    inicio, resultado = funcion(*args, self.rondas)
+            else:
+                inicio, resultado = funcion(*args, self.rondas)
+        finally:
+            self._cupos.release()
+            fin = time.time()
+            with self._bloqueo:
+                self._contadores['en_curso'] -= 1
+        with self._bloqueo:
+            self._contadores['operaciones'] += 1
+            self._esperas.append(max(0.0, inicio - encolado))
+            self._duraciones.append(fin - inicio)
+        return resultado
+
+    def hashear(self, password):
+        """Hash nuevo con el costo configurado"""
+        return self._ejecutar(_hashear, password)
+
+    def verificar(self, password, password_hash):
+        """
+        Verifica la contraseña contra el hash guardado.
+        Retorna: (valida, nuevo_hash) - nuevo_hash es None salvo que haya que
+        reemplazar el guardado porque se generó con otro costo
+        """
+        valida, nuevo_hash = self._ejecutar(_verificar, password, password_hash)
+        if nuevo_hash:
+            with self._bloqueo:
+                self._contadores['rehash'] += 1
+        return valida, nuevo_hash
+
+    @staticmethod
+    def _percentiles(muestras):
+        """Mediana, p95 y máximo en milisegundos"""
+        if not muestras:
+            return {'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        ordenadas = sorted(muestras)
+        n = len(ordenadas)
+        return {
+            'p50_ms': round(ordenadas[n // 2] * 1000, 2),
+            'p95_ms': round(ordenadas[min(n - 1, int(n * 0.95))] * 1000, 2),
+            'max_ms': round(ordenadas[-1] * 1000, 2),
+        }
+
+    def metricas(self):
+        with self._bloqueo:
+            contadores = dict(self._contadores)
+            esperas, duraciones = list(self._esperas), list(self._duraciones)
+        contadores.update({
+            'rondas': self.rondas,
+            'procesos': self.procesos,
+            'limite': self.limite,
+            'espera_cola': self._percentiles(esperas),
+            'computo': self._percentiles(duraciones),
+        })
+        return contadores
+
+    def cerrar(self):
+        with self._bloqueo:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
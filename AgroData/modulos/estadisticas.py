@@ -9,6 +9,17 @@ import matplotlib.pyplot as plt
 from scipy import stats
 import io
 import base64
+import threading
+
+from .acumuladores import EstadisticasIncrementales
+from .columnar import TablaColumnar
+from .consultas import (
+    SQL_CORRELACION_INSUMO, SQL_HECHOS_SIEMBRA, SQL_RENDIMIENTO_POR_CULTIVO,
+    SQL_VERSION_DATOS, SQL_VERSION_DATOS_TOTAL
+)
+from .metodos_numericos import MetodosNumericos
+from .segmentos import Segmentos
+from .snapshots import SnapshotsAnaliticos
 
 class EstadisticasAgricolas:
     """
@@ -19,65 +30,299 @@ class EstadisticasAgricolas:
     def __init__(self, conexion):
         self.conexion = conexion
     
-    def estadisticas_descriptivas(self, user_id=None):
+    # Acumuladores incrementales por usuario, compartidos entre peticiones
+    # del proceso y actualizados al registrar siembras y cosechas. Se guardan
+    # con la versión de los datos del usuario (tabla version_datos, que toda
+    # escritura incrementa): si otro proceso o un script los modifica, la
+    # versión cambia y se reconstruyen.
+    _incrementales = {}  # user_id -> (version, EstadisticasIncrementales)
+    # Análisis costosos de /reportes sobre los hechos por siembra (Monte
+    # Carlo, equilibrio, pronóstico), con la versión en que se calcularon
+    _analisis = {}  # (user_id, clave) -> (version, resultado)
+    _bloqueo = threading.Lock()
+    
+    def estadisticas_descriptivas(self, user_id=None, nivel='global', clave=None):
         """
         Calcula media, mediana, desviación estándar y varianza
-        de los rendimientos por hectárea.
-        """
-        query = """
-            SELECT 
-                c.nombre as cultivo,
-                s.area_sembrada,
-                COALESCE(SUM(co.cantidad_kg), 0) as total_kg,
-                COALESCE(SUM(co.cantidad_kg) / s.area_sembrada, 0) as rendimiento
-            FROM siembra s
-            JOIN cultivo c ON s.id_cultivo = c.id_cultivo
-            LEFT JOIN cosecha co ON s.id_siembra = co.id_siembra
-            JOIN lote l ON s.id_lote = l.id_lote
-            JOIN finca f ON l.id_finca = f.id_finca
-            WHERE s.area_sembrada > 0 {user_filter}
-            GROUP BY s.id_siembra
-        """.format(user_filter=("AND f.user_id = %s" if user_id is not None else ""))
-        
-        df = pd.read_sql(query, self.conexion, params=[user_id] if user_id is not None else None)
+        de los rendimientos por hectárea, globales o de un grupo
+        (nivel 'cultivo', 'lote' o 'finca'). Se responde desde los
+        acumuladores incrementales sin volver a leer las siembras;
+        la mediana es aproximada cuando hay muchos valores distintos.
+        """
+        incrementales = self.estadisticas_incrementales(user_id)
+        with EstadisticasAgricolas._bloqueo:
+            return incrementales.consultar(nivel, clave)
+    
+    def estadisticas_por_grupo(self, nivel, user_id=None):
+        """Estadísticas descriptivas de cada cultivo, lote o finca"""
+        incrementales = self.estadisticas_incrementales(user_id)
+        with EstadisticasAgricolas._bloqueo:
+            return incrementales.por_nivel(nivel)
+    
+    def _hechos_siembra(self, filtro, params, tamano_bloque=10000):
+        """Recorre los hechos por siembra como diccionarios, leyendo por bloques"""
+        cursor = self.conexion.cursor(dictionary=True)
+        cursor.execute(SQL_HECHOS_SIEMBRA.format(filtro=filtro), params)
+        while True:
+            bloque = cursor.fetchmany(tamano_bloque)
+            if not bloque:
+                break
+            yield from bloque
+        cursor.close()
+    
+    @staticmethod
+    def _filtro_usuario(user_id):
+        if user_id is None:
+            return "", ()
+        return "AND f.user_id = %s", (user_id,)
+    
+    def _version(self, user_id):
+        """Versión de los datos del usuario (suma de todas si user_id es None) - O(1)"""
+        cursor = self.conexion.cursor()
+        if user_id is None:
+            cursor.execute(SQL_VERSION_DATOS_TOTAL)
+        else:
+            cursor.execute(SQL_VERSION_DATOS, (user_id,))
+        version = int(cursor.fetchone()[0])
+        cursor.close()
+        return version
+    
+    def analisis_cacheado(self, user_id, clave, calcular):
+        """
+        Resultado de calcular(tabla_siembras) del usuario, reutilizado
+        mientras no cambien sus siembras, cosechas ni aplicaciones.
+        - clave: distingue análisis (y sus parámetros) del mismo usuario
+        """
+        version = self._version(user_id)
+        with EstadisticasAgricolas._bloqueo:
+            guardado = EstadisticasAgricolas._analisis.get((user_id, clave))
+        if guardado is not None and guardado[0] == version:
+            return guardado[1]
+        resultado = calcular(self.tabla_siembras(user_id=user_id))
+        with EstadisticasAgricolas._bloqueo:
+            EstadisticasAgricolas._analisis[(user_id, clave)] = (version, resultado)
+        return resultado
+    
+    def estadisticas_incrementales(self, user_id=None):
+        """
+        Acumuladores del usuario. Se construyen en un solo recorrido de sus
+        siembras y se reutilizan mientras la versión de sus datos no cambie.
+        La versión se lee antes que las siembras: una escritura intermedia
+        solo provoca una reconstrucción de más.
+        """
+        version = self._version(user_id)
+        with EstadisticasAgricolas._bloqueo:
+            guardado = EstadisticasAgricolas._incrementales.get(user_id)
+        if guardado is not None and guardado[0] == version:
+            return guardado[1]
+        filtro, params = self._filtro_usuario(user_id)
+        incrementales = EstadisticasIncrementales().cargar(self._hechos_siembra(filtro, params))
+        with EstadisticasAgricolas._bloqueo:
+            EstadisticasAgricolas._incrementales[user_id] = (version, incrementales)
+        return incrementales
+    
+    def actualizar_siembra(self, id_siembra, user_id=None):
+        """
+        Incorpora a los acumuladores ya cargados una siembra nueva o el
+        nuevo rendimiento de una siembra que recibió cosecha. Se llama
+        después de incrementar la versión del usuario por esa escritura:
+        si la versión avanzó exactamente uno desde la guardada, el único
+        cambio es esta siembra y basta re-registrarla; si avanzó más (otro
+        proceso o script escribió entretanto), se descartan los acumuladores
+        para reconstruirlos en la siguiente consulta.
+        """
+        filas = None
+        for clave in {user_id, None}:
+            with EstadisticasAgricolas._bloqueo:
+                guardado = EstadisticasAgricolas._incrementales.get(clave)
+            if guardado is None:
+                continue
+            version_anterior, incrementales = guardado
+            version = self._version(clave)
+            if filas is None:
+                filas = list(self._hechos_siembra("AND s.id_siembra = %s", (id_siembra,)))
+            with EstadisticasAgricolas._bloqueo:
+                if EstadisticasAgricolas._incrementales.get(clave) is not guardado:
+                    continue
+                if version != version_anterior + 1 or not filas:
+                    EstadisticasAgricolas._incrementales.pop(clave, None)
+                    continue
+                for fila in filas:
+                    incrementales.registrar(fila)
+                EstadisticasAgricolas._incrementales[clave] = (version, incrementales)
+    
+    @staticmethod
+    def descriptivas(datos, columna='rendimiento'):
+        """
+        Media, mediana, desviación estándar, varianza, mínimo y máximo
+        calculados con NumPy sobre un arreglo, una lista o una TablaColumnar.
+        Ignora valores faltantes (NaN). Retorna None si no hay datos.
+        """
+        if isinstance(datos, TablaColumnar):
+            valores = datos.numerica(columna)
+        else:
+            valores = np.asarray(datos, dtype=float)
+        valores = valores[~np.isnan(valores)]
         
-        if len(df) == 0:
+        if len(valores) == 0:
             return None
         
-        # Cálculos estadísticos básicos
+        # Cálculos estadísticos básicos (varianza muestral, como pandas)
+        varianza = float(np.var(valores, ddof=1)) if len(valores) > 1 else float('nan')
         estadisticas = {
-            'media': df['rendimiento'].mean(),
-            'mediana': df['rendimiento'].median(),
-            'desviacion_std': df['rendimiento'].std(),
-            'varianza': df['rendimiento'].var(),
-            'minimo': df['rendimiento'].min(),
-            'maximo': df['rendimiento'].max(),
-            'total_siembras': len(df)
+            'media': float(np.mean(valores)),
+            'mediana': float(np.median(valores)),
+            'desviacion_std': float(np.sqrt(varianza)),
+            'varianza': varianza,
+            'minimo': float(np.min(valores)),
+            'maximo': float(np.max(valores)),
+            'total_siembras': len(valores)
         }
         
         return estadisticas
     
+    def tabla_siembras(self, user_id=None, id_finca=None, desde=None, no_exportadas=None):
+        """
+        Carga los hechos por siembra (rendimiento, ingresos, costos) como
+        TablaColumnar, leyendo el cursor por bloques.
+        - desde: fecha mínima de siembra
+        - no_exportadas: (ultimo_id, ids) de SnapshotsAnaliticos.no_exportadas;
+          solo las siembras que no contiene el snapshot
+        """
+        filtros, params = [], []
+        if user_id is not None:
+            filtros.append("AND f.user_id = %s")
+            params.append(user_id)
+        if id_finca is not None:
+            filtros.append("AND f.id_finca = %s")
+            params.append(id_finca)
+        if desde is not None:
+            filtros.append("AND s.fecha_siembra >= %s")
+            params.append(desde)
+        if no_exportadas is not None:
+            filtro, params_filtro = SnapshotsAnaliticos.filtro_no_exportadas(*no_exportadas)
+            filtros.append(filtro)
+            params.extend(params_filtro)
+        
+        cursor = self.conexion.cursor()
+        cursor.execute(SQL_HECHOS_SIEMBRA.format(filtro=" ".join(filtros)), tuple(params))
+        tabla = TablaColumnar.desde_cursor(cursor)
+        cursor.close()
+        return tabla
+    
+    def historico_siembras(self, id_finca, directorio_snapshots):
+        """
+        Historial completo de una finca: las siembras cerradas se leen del
+        snapshot en disco (memory-map) y el resto (temporada abierta,
+        siembras que seguían en el suelo al exportar y las creadas después)
+        se consulta en MySQL. Sin snapshot vigente, todo sale de la base de datos.
+        """
+        manifest = SnapshotsAnaliticos.manifest(directorio_snapshots, id_finca)
+        if manifest is None or manifest.get('version', 1) < SnapshotsAnaliticos.VERSION:
+            return self.tabla_siembras(id_finca=id_finca)
+        
+        cerradas = SnapshotsAnaliticos.cargar(directorio_snapshots, id_finca, 'siembra')
+        abierta = self.tabla_siembras(id_finca=id_finca, no_exportadas=SnapshotsAnaliticos.no_exportadas(
+            directorio_snapshots, id_finca, manifest))
+        if not len(abierta):
+            return cerradas
+        return TablaColumnar.concatenar([cerradas, abierta.seleccionar(cerradas.nombres)])
+    
+    def estadisticas_agrupadas(self, claves=('cultivo',), valor='rendimiento',
+                               x='cantidad_insumos', cuantiles=(0.25, 0.5, 0.75),
+                               tabla=None, user_id=None):
+        """
+        Estadísticas descriptivas, cuantiles, correlación de Pearson y
+        regresión lineal (valor vs x) para todos los grupos a la vez.
+        - claves: columnas de agrupación, ej: ('cultivo',), ('finca', 'lote'),
+          ('cultivo', 'anio') para comparar temporadas
+        - tabla: TablaColumnar de hechos por siembra (por defecto tabla_siembras)
+        Retorna: lista de diccionarios, uno por grupo
+        """
+        if tabla is None:
+            tabla = self.tabla_siembras(user_id=user_id)
+        if not len(tabla):
+            return []
+    
+        y = tabla.numerica(valor)
+        xs = tabla.numerica(x) if x else np.zeros(len(tabla))
+        validos = ~(np.isnan(y) | np.isnan(xs))
+        # Las categóricas se agrupan por código (un None es el código -1)
+        segmentos = Segmentos([tabla.columna(c)[validos] for c in claves])
+        y, xs = y[validos], xs[validos]
+    
+        resultados = {
+            'total_siembras': segmentos.conteos,
+            'media': segmentos.media(y),
+            'desviacion_std': segmentos.desviacion(y),
+            'varianza': segmentos.varianza(y),
+            'minimo': segmentos.minimo(y),
+            'maximo': segmentos.maximo(y),
+        }
+        valores_q = segmentos.cuantiles(y, cuantiles)
+        for j, q in enumerate(cuantiles):
+            resultados['mediana' if q == 0.5 else f'q{int(round(q * 100))}'] = valores_q[:, j]
+        if x:
+            resultados['correlacion'] = segmentos.correlacion(xs, y)
+            resultados.update(segmentos.regresion(xs, y))
+    
+        grupos = []
+        for i, etiqueta in enumerate(segmentos.etiquetas()):
+            grupo = {}
+            for clave, codigo in zip(claves, etiqueta):
+                if tabla.es_categorica(clave):
+                    codigo = None if codigo < 0 else tabla.categorias[clave][codigo]
+                grupo[clave] = codigo
+            for nombre, arreglo in resultados.items():
+                grupo[nombre] = arreglo[i].item()
+            grupos.append(grupo)
+        return grupos
+    
+    def regresion_por_grupo(self, claves=('id_finca', 'finca', 'lote'), valor='rendimiento',
+                            variables=('cantidad_insumos', 'ph_suelo', 'area_sembrada', 'dias_cosecha'),
+                            tabla=None, user_id=None):
+        """
+        Regresión múltiple valor ~ variables ajustada para cada grupo
+        (lote, cultivo, temporada...) en una sola llamada por lotes.
+        Retorna: lista de diccionarios con coeficientes y errores estándar
+        por variable, intercepto, r_cuadrado y n de cada grupo.
+        El nombre del lote solo es único dentro de su finca, por eso el
+        agrupamiento por defecto incluye la finca (id y nombre).
+        """
+        if tabla is None:
+            tabla = self.tabla_siembras(user_id=user_id)
+        if not len(tabla):
+            return []
+    
+        segmentos = Segmentos([tabla.columna(c) for c in claves])
+        X = np.column_stack([tabla.numerica(v) for v in variables])[segmentos.orden]
+        y = tabla.numerica(valor)[segmentos.orden]
+        X, _ = MetodosNumericos.rellenar_segmentos(X, segmentos.inicios)
+        y, mascara = MetodosNumericos.rellenar_segmentos(y, segmentos.inicios)
+        ajuste = MetodosNumericos.regresion_lote(X, y, mascara)
+    
+        grupos = []
+        for i, etiqueta in enumerate(segmentos.etiquetas()):
+            grupo = {}
+            for clave, codigo in zip(claves, etiqueta):
+                if tabla.es_categorica(clave):
+                    codigo = None if codigo < 0 else tabla.categorias[clave][codigo]
+                grupo[clave] = codigo
+            grupo['coeficientes'] = dict(zip(variables, ajuste['coeficientes'][i].tolist()))
+            grupo['errores_std'] = dict(zip(variables, ajuste['error_std'][i].tolist()))
+            grupo['intercepto'] = ajuste['intercepto'][i].item()
+            grupo['r_cuadrado'] = ajuste['r_cuadrado'][i].item()
+            grupo['n'] = ajuste['n'][i].item()
+            grupos.append(grupo)
+        return grupos
+    
     def correlacion_insumo_rendimiento(self, user_id=None):
         """
         Calcula la correlación de Pearson entre cantidad de fertilizante
         aplicado y rendimiento obtenido.
         Demuestra: Análisis de correlación
         """
-        query = """
-            SELECT 
-                s.id_siembra,
-                COALESCE(SUM(ai.cantidad_aplicada), 0) as fertilizante_total,
-                COALESCE(SUM(co.cantidad_kg) / s.area_sembrada, 0) as rendimiento
-            FROM siembra s
-            LEFT JOIN aplicacion_insumo ai ON s.id_siembra = ai.id_siembra
-            LEFT JOIN insumo i ON ai.id_insumo = i.id_insumo AND i.tipo = 'fertilizante'
-            LEFT JOIN cosecha co ON s.id_siembra = co.id_siembra
-            JOIN lote l ON s.id_lote = l.id_lote
-            JOIN finca f ON l.id_finca = f.id_finca
-            WHERE s.area_sembrada > 0 {user_filter}
-            GROUP BY s.id_siembra
-            HAVING fertilizante_total > 0 AND rendimiento > 0
-        """.format(user_filter=("AND f.user_id = %s" if user_id is not None else ""))
+        query = SQL_CORRELACION_INSUMO.format(filtro=("AND f.user_id = %s" if user_id is not None else ""))
         
         df = pd.read_sql(query, self.conexion, params=[user_id] if user_id is not None else None)
         
@@ -106,18 +351,7 @@ class EstadisticasAgricolas:
         Genera gráfico de barras con rendimiento por cultivo.
         Demuestra: Visualización con Matplotlib
         """
-        query = """
-            SELECT 
-                c.nombre as cultivo,
-                AVG(co.cantidad_kg / s.area_sembrada) as rendimiento_promedio
-            FROM siembra s
-            JOIN cultivo c ON s.id_cultivo = c.id_cultivo
-            JOIN cosecha co ON s.id_siembra = co.id_siembra
-            JOIN lote l ON s.id_lote = l.id_lote
-            JOIN finca f ON l.id_finca = f.id_finca
-            WHERE s.area_sembrada > 0 {user_filter}
-            GROUP BY c.id_cultivo
-        """.format(user_filter=("AND f.user_id = %s" if user_id is not None else ""))
+        query = SQL_RENDIMIENTO_POR_CULTIVO.format(filtro=("AND f.user_id = %s" if user_id is not None else ""))
         
         df = pd.read_sql(query, self.conexion, params=[user_id] if user_id is not None else None)
         
@@ -1,202 +1,509 @@
 # PASO 7.2: Módulo de Estructura de Datos
 # Archivo: modulos/estructuras.py
 
+import bisect
+import heapq
+import itertools
+
 class NodoSiembra:
     """
-    Nodo para lista enlazada de siembras.
+    Nodo para lista doblemente enlazada de siembras.
+    Usa __slots__ para no reservar un __dict__ por nodo.
     Demuestra: Estructura de Datos - Lista Enlazada
     """
+    __slots__ = ('datos', 'anterior', 'siguiente')
+    
     def __init__(self, datos_siembra):
         self.datos = datos_siembra
+        self.anterior = None
         self.siguiente = None
 
 class ListaEnlazadaSiembras:
     """
-    Lista enlazada para gestionar historial de siembras.
-    Permite insertar, buscar y recorrer siembras de forma eficiente.
+    Lista doblemente enlazada para gestionar historial de siembras.
+    Mantiene un índice hash id_siembra -> nodo, de modo que buscar y
+    eliminar por ID son O(1). Se recorre de forma perezosa con for.
+    Agregar un id_siembra que ya está en la lista reemplaza sus datos en
+    su posición actual (la lista y el índice nunca tienen ids repetidos).
     """
     def __init__(self):
         self.cabeza = None
+        self.cola = None
         self.tamaño = 0
+        self._indice = {}
+    
+    def _reemplazar(self, datos_siembra):
+        """Si el id ya existe, reemplaza los datos de su nodo y retorna True - O(1)"""
+        nodo = self._indice.get(datos_siembra['id_siembra'])
+        if nodo is None:
+            return False
+        nodo.datos = datos_siembra
+        return True
     
     def agregar_siembra(self, datos_siembra):
         """Agrega una siembra al inicio de la lista - O(1)"""
+        if self._reemplazar(datos_siembra):
+            return
         nuevo_nodo = NodoSiembra(datos_siembra)
         nuevo_nodo.siguiente = self.cabeza
+        if self.cabeza:
+            self.cabeza.anterior = nuevo_nodo
+        else:
+            self.cola = nuevo_nodo
         self.cabeza = nuevo_nodo
+        self._indice[datos_siembra['id_siembra']] = nuevo_nodo
+        self.tamaño += 1
+    
+    def agregar_al_final(self, datos_siembra):
+        """Agrega una siembra al final de la lista - O(1)"""
+        if self._reemplazar(datos_siembra):
+            return
+        nuevo_nodo = NodoSiembra(datos_siembra)
+        nuevo_nodo.anterior = self.cola
+        if self.cola:
+            self.cola.siguiente = nuevo_nodo
+        else:
+            self.cabeza = nuevo_nodo
+        self.cola = nuevo_nodo
+        self._indice[datos_siembra['id_siembra']] = nuevo_nodo
         self.tamaño += 1
     
     def buscar_por_id(self, id_siembra):
-        """Busca una siembra por ID - O(n)"""
+        """Busca una siembra por ID usando el índice hash - O(1)"""
+        nodo = self._indice.get(id_siembra)
+        return nodo.datos if nodo else None
+    
+    def __iter__(self):
+        """Recorre las siembras desde la cabeza sin copiar la lista - O(1) por paso"""
         actual = self.cabeza
         while actual:
-            if actual.datos['id_siembra'] == id_siembra:
-                return actual.datos
+            yield actual.datos
             actual = actual.siguiente
-        return None
+    
+    def __len__(self):
+        return self.tamaño
     
     def obtener_todas(self):
-        """Retorna todas las siembras como lista - O(n)"""
-        siembras = []
-        actual = self.cabeza
-        while actual:
-            siembras.append(actual.datos)
-            actual = actual.siguiente
-        return siembras
+        """Retorna todas las siembras como lista - O(n). Preferir iterar directamente."""
+        return list(self)
     
     def eliminar_siembra(self, id_siembra):
-        """Elimina una siembra por ID - O(n)"""
-        if not self.cabeza:
+        """Elimina una siembra por ID - O(1)"""
+        nodo = self._indice.pop(id_siembra, None)
+        if nodo is None:
             return False
         
-        # Si es el primer nodo
-        if self.cabeza.datos['id_siembra'] == id_siembra:
-            self.cabeza = self.cabeza.siguiente
-            self.tamaño -= 1
-            return True
-        
-        # Buscar en el resto de la lista
-        actual = self.cabeza
-        while actual.siguiente:
-            if actual.siguiente.datos['id_siembra'] == id_siembra:
-                actual.siguiente = actual.siguiente.siguiente
-                self.tamaño -= 1
-                return True
-            actual = actual.siguiente
+        if nodo.anterior:
+            nodo.anterior.siguiente = nodo.siguiente
+        else:
+            self.cabeza = nodo.siguiente
+        if nodo.siguiente:
+            nodo.siguiente.anterior = nodo.anterior
+        else:
+            self.cola = nodo.anterior
         
-        return False
+        nodo.anterior = nodo.siguiente = None
+        self.tamaño -= 1
+        return True
+
+
+class IndiceFechasSiembras:
+    """
+    Índice ordenado de siembras por fecha.
+    Se construye una vez (O(n log n)) y responde consultas por rango
+    [fecha_inicio, fecha_fin] en O(log n + k) mediante búsqueda binaria.
+    Demuestra: Estructura de Datos - Arreglo ordenado con bisección
+    """
+    def __init__(self, siembras=None, clave='fecha_siembra'):
+        self.clave = clave
+        self.fechas = []    # Claves ordenadas (paralelo a self.siembras)
+        self.siembras = []
+        if siembras:
+            self.construir(siembras)
+    
+    def construir(self, siembras):
+        """Construye el índice a partir de una lista de siembras - O(n log n)"""
+        pares = [(s[self.clave], s) for s in siembras if s.get(self.clave) is not None]
+        pares.sort(key=lambda par: par[0])  # sort estable: respeta el orden de entrada
+        self.fechas = [fecha for fecha, _ in pares]
+        self.siembras = [siembra for _, siembra in pares]
+    
+    def agregar_siembra(self, datos_siembra):
+        """Inserta una siembra manteniendo el orden - O(log n) búsqueda + O(n) desplazamiento"""
+        fecha = datos_siembra.get(self.clave)
+        if fecha is None:
+            return
+        posicion = bisect.bisect_right(self.fechas, fecha)
+        self.fechas.insert(posicion, fecha)
+        self.siembras.insert(posicion, datos_siembra)
+    
+    def _limites(self, fecha_inicio, fecha_fin):
+        """Posiciones [inicio, fin) de las siembras dentro del rango - O(log n)"""
+        inicio = bisect.bisect_left(self.fechas, fecha_inicio)
+        fin = bisect.bisect_right(self.fechas, fecha_fin, lo=inicio)
+        return inicio, fin
+    
+    def rango(self, fecha_inicio, fecha_fin):
+        """Retorna las siembras con fecha en [fecha_inicio, fecha_fin] - O(log n + k)"""
+        inicio, fin = self._limites(fecha_inicio, fecha_fin)
+        return self.siembras[inicio:fin]
+    
+    def iterar_rango(self, fecha_inicio, fecha_fin):
+        """Recorre las siembras del rango sin construir una lista nueva"""
+        inicio, fin = self._limites(fecha_inicio, fecha_fin)
+        for i in range(inicio, fin):
+            yield self.siembras[i]
+    
+    def contar_rango(self, fecha_inicio, fecha_fin):
+        """Cuenta las siembras del rango sin materializarlas - O(log n)"""
+        inicio, fin = self._limites(fecha_inicio, fecha_fin)
+        return fin - inicio
+    
+    def __len__(self):
+        return len(self.siembras)
 
 
 class NodoArbol:
     """
-    Nodo para árbol binario de búsqueda.
+    Nodo para árbol AVL.
     Demuestra: Estructura de Datos - Árbol Binario
     """
+    __slots__ = ('cultivo', 'rendimiento', 'izquierdo', 'derecho', 'altura')
+    
     def __init__(self, cultivo, rendimiento):
         self.cultivo = cultivo
         self.rendimiento = rendimiento
         self.izquierdo = None
         self.derecho = None
+        self.altura = 1
 
 class ArbolBinarioCultivos:
     """
-    Árbol binario de búsqueda para organizar cultivos por rendimiento.
-    Permite búsquedas eficientes - O(log n) en promedio.
+    Árbol AVL (binario de búsqueda auto-balanceado) de cultivos por rendimiento.
+    La altura se mantiene en O(log n) aunque se inserte en orden, y todas
+    las operaciones son iterativas (sin límite de recursión).
     """
     def __init__(self):
         self.raiz = None
+        self.tamaño = 0
+    
+    # ---------- Balanceo ----------
+    
+    @staticmethod
+    def _altura(nodo):
+        return nodo.altura if nodo else 0
+    
+    @staticmethod
+    def _actualizar(nodo):
+        nodo.altura = 1 + max(ArbolBinarioCultivos._altura(nodo.izquierdo),
+                              ArbolBinarioCultivos._altura(nodo.derecho))
+    
+    @staticmethod
+    def _rotar_derecha(nodo):
+        pivote = nodo.izquierdo
+        nodo.izquierdo = pivote.derecho
+        pivote.derecho = nodo
+        ArbolBinarioCultivos._actualizar(nodo)
+        ArbolBinarioCultivos._actualizar(pivote)
+        return pivote
+    
+    @staticmethod
+    def _rotar_izquierda(nodo):
+        pivote = nodo.derecho
+        nodo.derecho = pivote.izquierdo
+        pivote.izquierdo = nodo
+        ArbolBinarioCultivos._actualizar(nodo)
+        ArbolBinarioCultivos._actualizar(pivote)
+        return pivote
+    
+    @staticmethod
+    def _balancear(nodo):
+        """Aplica las rotaciones AVL necesarias y retorna la nueva raíz del subárbol"""
+        ArbolBinarioCultivos._actualizar(nodo)
+        altura = ArbolBinarioCultivos._altura
+        balance = altura(nodo.izquierdo) - altura(nodo.derecho)
+        
+        if balance > 1:
+            if altura(nodo.izquierdo.izquierdo) < altura(nodo.izquierdo.derecho):
+                nodo.izquierdo = ArbolBinarioCultivos._rotar_izquierda(nodo.izquierdo)
+            return ArbolBinarioCultivos._rotar_derecha(nodo)
+        if balance < -1:
+            if altura(nodo.derecho.derecho) < altura(nodo.derecho.izquierdo):
+                nodo.derecho = ArbolBinarioCultivos._rotar_derecha(nodo.derecho)
+            return ArbolBinarioCultivos._rotar_izquierda(nodo)
+        return nodo
+    
+    # ---------- Inserción y construcción ----------
     
     def insertar(self, cultivo, rendimiento):
-        """Inserta un cultivo en el árbol ordenado por rendimiento"""
+        """Inserta un cultivo en el árbol ordenado por rendimiento - O(log n)"""
+        nuevo = NodoArbol(cultivo, rendimiento)
+        self.tamaño += 1
         if not self.raiz:
-            self.raiz = NodoArbol(cultivo, rendimiento)
+            self.raiz = nuevo
+            return
+        
+        # Descender guardando el camino
+        camino = []
+        nodo = self.raiz
+        while nodo:
+            camino.append(nodo)
+            nodo = nodo.izquierdo if rendimiento < nodo.rendimiento else nodo.derecho
+        
+        padre = camino[-1]
+        if rendimiento < padre.rendimiento:
+            padre.izquierdo = nuevo
         else:
-            self._insertar_recursivo(self.raiz, cultivo, rendimiento)
-    
-    def _insertar_recursivo(self, nodo, cultivo, rendimiento):
-        """Función auxiliar recursiva para insertar"""
-        if rendimiento < nodo.rendimiento:
-            if nodo.izquierdo is None:
-                nodo.izquierdo = NodoArbol(cultivo, rendimiento)
+            padre.derecho = nuevo
+        
+        # Rebalancear de abajo hacia arriba
+        for i in range(len(camino) - 1, -1, -1):
+            nodo = camino[i]
+            altura_previa = nodo.altura
+            subarbol = self._balancear(nodo)
+            if i == 0:
+                self.raiz = subarbol
+            elif camino[i - 1].izquierdo is nodo:
+                camino[i - 1].izquierdo = subarbol
             else:
-                self._insertar_recursivo(nodo.izquierdo, cultivo, rendimiento)
-        else:
-            if nodo.derecho is None:
-                nodo.derecho = NodoArbol(cultivo, rendimiento)
+                camino[i - 1].derecho = subarbol
+            if subarbol is nodo and nodo.altura == altura_previa:
+                break  # Los ancestros no cambian de altura
+    
+    def construir_desde_ordenados(self, datos):
+        """
+        Construye un árbol perfectamente balanceado en O(n) a partir de
+        pares (cultivo, rendimiento) ordenados por rendimiento.
+        Si la entrada no está ordenada se ordena primero (O(n log n)).
+        """
+        datos = list(datos)
+        if any(datos[i][1] > datos[i + 1][1] for i in range(len(datos) - 1)):
+            datos.sort(key=lambda par: par[1])
+        
+        self.tamaño = len(datos)
+        self.raiz = None
+        if not datos:
+            return
+        
+        # Pila de subintervalos [inicio, fin) con el enlace del padre;
+        # las alturas se calculan al final en postorden.
+        raiz_temporal = NodoArbol(None, None)
+        pila = [(0, len(datos), raiz_temporal, True)]
+        creados = []
+        while pila:
+            inicio, fin, padre, es_izquierdo = pila.pop()
+            if inicio >= fin:
+                continue
+            medio = (inicio + fin) // 2
+            nodo = NodoArbol(*datos[medio])
+            if es_izquierdo:
+                padre.izquierdo = nodo
             else:
-                self._insertar_recursivo(nodo.derecho, cultivo, rendimiento)
+                padre.derecho = nodo
+            creados.append(nodo)
+            pila.append((inicio, medio, nodo, True))
+            pila.append((medio + 1, fin, nodo, False))
+        
+        # Los hijos siempre se crean después que su padre
+        for nodo in reversed(creados):
+            self._actualizar(nodo)
+        self.raiz = raiz_temporal.izquierdo
     
-    def buscar(self, rendimiento_objetivo):
-        """Busca cultivos con rendimiento específico - O(log n)"""
-        return self._buscar_recursivo(self.raiz, rendimiento_objetivo)
+    def altura(self):
+        """Altura del árbol - O(1)"""
+        return self._altura(self.raiz)
     
-    def _buscar_recursivo(self, nodo, rendimiento_objetivo):
-        """Función auxiliar recursiva para buscar"""
-        if nodo is None:
-            return None
+    # ---------- Consultas ----------
+    
+    def buscar(self, rendimiento_objetivo, tolerancia=100):
+        """Busca el cultivo con rendimiento más cercano dentro de la tolerancia - O(log n)"""
+        cercanos = self.k_mas_cercanos(rendimiento_objetivo, 1)
+        if cercanos and abs(cercanos[0]['rendimiento'] - rendimiento_objetivo) < tolerancia:
+            return cercanos[0]
+        return None
+    
+    def rango(self, minimo, maximo):
+        """Cultivos con rendimiento en [minimo, maximo], ordenados - O(log n + k)"""
+        resultado = []
+        pila = []
+        nodo = self.raiz
+        while pila or nodo:
+            if nodo:
+                # Solo bajar a la izquierda si puede haber valores >= minimo
+                pila.append(nodo)
+                nodo = nodo.izquierdo if nodo.rendimiento >= minimo else None
+                continue
+            nodo = pila.pop()
+            if nodo.rendimiento > maximo:
+                break
+            if nodo.rendimiento >= minimo:
+                resultado.append({'cultivo': nodo.cultivo, 'rendimiento': nodo.rendimiento})
+            nodo = nodo.derecho
+        return resultado
+    
+    def k_mas_cercanos(self, rendimiento_objetivo, k):
+        """
+        Retorna los k cultivos con rendimiento más cercano al objetivo - O(log n + k)
+        Recorre en paralelo predecesores y sucesores del objetivo.
+        """
+        # Pila de sucesores (>= objetivo) y de predecesores (< objetivo)
+        sucesores, predecesores = [], []
+        nodo = self.raiz
+        while nodo:
+            if nodo.rendimiento >= rendimiento_objetivo:
+                sucesores.append(nodo)
+                nodo = nodo.izquierdo
+            else:
+                predecesores.append(nodo)
+                nodo = nodo.derecho
         
-        if abs(nodo.rendimiento - rendimiento_objetivo) < 100:  # Tolerancia
-            return {'cultivo': nodo.cultivo, 'rendimiento': nodo.rendimiento}
+        def siguiente_sucesor():
+            nodo = sucesores.pop()
+            hijo = nodo.derecho
+            while hijo:
+                sucesores.append(hijo)
+                hijo = hijo.izquierdo
+            return nodo
         
-        if rendimiento_objetivo < nodo.rendimiento:
-            return self._buscar_recursivo(nodo.izquierdo, rendimiento_objetivo)
-        else:
-            return self._buscar_recursivo(nodo.derecho, rendimiento_objetivo)
+        def siguiente_predecesor():
+            nodo = predecesores.pop()
+            hijo = nodo.izquierdo
+            while hijo:
+                predecesores.append(hijo)
+                hijo = hijo.derecho
+            return nodo
+        
+        resultado = []
+        while len(resultado) < k and (sucesores or predecesores):
+            if not predecesores:
+                nodo = siguiente_sucesor()
+            elif not sucesores:
+                nodo = siguiente_predecesor()
+            elif (sucesores[-1].rendimiento - rendimiento_objetivo
+                  <= rendimiento_objetivo - predecesores[-1].rendimiento):
+                nodo = siguiente_sucesor()
+            else:
+                nodo = siguiente_predecesor()
+            resultado.append({'cultivo': nodo.cultivo, 'rendimiento': nodo.rendimiento})
+        return resultado
     
     def recorrido_inorden(self):
-        """Recorre el árbol en orden (menor a mayor rendimiento)"""
+        """Recorre el árbol en orden (menor a mayor rendimiento) - O(n) iterativo"""
         resultado = []
-        self._inorden_recursivo(self.raiz, resultado)
+        pila = []
+        nodo = self.raiz
+        while pila or nodo:
+            if nodo:
+                pila.append(nodo)
+                nodo = nodo.izquierdo
+            else:
+                nodo = pila.pop()
+                resultado.append({'cultivo': nodo.cultivo, 'rendimiento': nodo.rendimiento})
+                nodo = nodo.derecho
         return resultado
-    
-    def _inorden_recursivo(self, nodo, resultado):
-        """Función auxiliar para recorrido inorden"""
-        if nodo:
-            self._inorden_recursivo(nodo.izquierdo, resultado)
-            resultado.append({'cultivo': nodo.cultivo, 'rendimiento': nodo.rendimiento})
-            self._inorden_recursivo(nodo.derecho, resultado)
 
 
 class ColaPrioridadAlertas:
     """
-    Cola de prioridad (Min-Heap) para gestionar alertas.
+    Cola de prioridad (Min-Heap) para gestionar alertas, basada en heapq.
     Demuestra: Estructura de Datos - Heap
-    Las alertas con mayor prioridad (menor número) se procesan primero.
+    Las alertas con mayor prioridad (menor número) se procesan primero;
+    a igual prioridad, en orden de llegada. Hay como máximo una alerta
+    por id_siembra: agregar una alerta existente la actualiza.
     """
+    _ELIMINADA = object()  # Marca de entradas invalidadas (borrado perezoso)
+    
     def __init__(self):
+        # Entradas [prioridad, secuencia, id_siembra, mensaje]; la secuencia
+        # desempata y evita comparar mensajes o ids.
         self.heap = []
+        self._entradas = {}
+        self._secuencia = itertools.count()
+    
+    def _crear_entrada(self, prioridad, mensaje, id_siembra):
+        entrada = [prioridad, next(self._secuencia), id_siembra, mensaje]
+        self._entradas[id_siembra] = entrada
+        return entrada
+    
+    def _invalidar(self, id_siembra):
+        entrada = self._entradas.pop(id_siembra, None)
+        if entrada is None:
+            return False
+        entrada[2] = ColaPrioridadAlertas._ELIMINADA
+        return True
+    
+    @staticmethod
+    def _a_diccionario(entrada):
+        return {'prioridad': entrada[0], 'mensaje': entrada[3], 'id_siembra': entrada[2]}
     
     def agregar_alerta(self, prioridad, mensaje, id_siembra):
-        """Agrega una alerta con prioridad - O(log n)"""
-        alerta = {
-            'prioridad': prioridad,
-            'mensaje': mensaje,
-            'id_siembra': id_siembra
-        }
-        self.heap.append(alerta)
-        self._subir(len(self.heap) - 1)
-    
-    def _subir(self, indice):
-        """Mueve un elemento hacia arriba para mantener propiedad del heap"""
-        padre = (indice - 1) // 2
-        if indice > 0 and self.heap[indice]['prioridad'] < self.heap[padre]['prioridad']:
-            self.heap[indice], self.heap[padre] = self.heap[padre], self.heap[indice]
-            self._subir(padre)
+        """Agrega o actualiza la alerta de una siembra - O(log n)"""
+        self._invalidar(id_siembra)
+        heapq.heappush(self.heap, self._crear_entrada(prioridad, mensaje, id_siembra))
+        self._compactar()
+    
+    def cargar_alertas(self, alertas):
+        """
+        Carga masiva de tuplas (prioridad, mensaje, id_siembra) - O(n)
+        Usa heapify en lugar de n inserciones; la última alerta de cada
+        siembra reemplaza a las anteriores.
+        """
+        entradas = self._entradas
+        secuencia = self._secuencia
+        for prioridad, mensaje, id_siembra in alertas:
+            anterior = entradas.get(id_siembra)
+            if anterior is not None:
+                anterior[2] = ColaPrioridadAlertas._ELIMINADA
+            entradas[id_siembra] = [prioridad, next(secuencia), id_siembra, mensaje]
+        # Las entradas vigentes son exactamente las del mapa por siembra
+        self.heap = list(entradas.values())
+        heapq.heapify(self.heap)
+    
+    def eliminar_alerta(self, id_siembra):
+        """Elimina la alerta de una siembra - O(1) (borrado perezoso)"""
+        eliminada = self._invalidar(id_siembra)
+        if eliminada:
+            self._compactar()
+        return eliminada
+    
+    def _compactar(self):
+        """Reconstruye el heap cuando la mitad de las entradas están invalidadas - O(n) amortizado"""
+        if len(self.heap) > 2 * len(self._entradas) + 32:
+            self.heap = [e for e in self.heap if e[2] is not ColaPrioridadAlertas._ELIMINADA]
+            heapq.heapify(self.heap)
     
     def extraer_alerta_urgente(self):
         """Extrae la alerta más urgente (mayor prioridad) - O(log n)"""
-        if not self.heap:
-            return None
-        
-        if len(self.heap) == 1:
-            return self.heap.pop()
-        
-        alerta_urgente = self.heap[0]
-        self.heap[0] = self.heap.pop()
-        self._bajar(0)
-        
-        return alerta_urgente
+        while self.heap:
+            entrada = heapq.heappop(self.heap)
+            if entrada[2] is not ColaPrioridadAlertas._ELIMINADA:
+                del self._entradas[entrada[2]]
+                return self._a_diccionario(entrada)
+        return None
     
-    def _bajar(self, indice):
-        """Mueve un elemento hacia abajo para mantener propiedad del heap"""
-        menor = indice
-        izq = 2 * indice + 1
-        der = 2 * indice + 2
-        
-        if izq < len(self.heap) and self.heap[izq]['prioridad'] < self.heap[menor]['prioridad']:
-            menor = izq
-        
-        if der < len(self.heap) and self.heap[der]['prioridad'] < self.heap[menor]['prioridad']:
-            menor = der
-        
-        if menor != indice:
-            self.heap[indice], self.heap[menor] = self.heap[menor], self.heap[indice]
-            self._bajar(menor)
+    def top_k(self, k):
+        """
+        Retorna las k alertas más urgentes sin extraerlas ni ordenar todo el heap.
+        Recorre el heap desde la raíz con un heap auxiliar de frontera - O(k log k)
+        """
+        resultado = []
+        frontera = [(self.heap[0], 0)] if self.heap else []
+        while frontera and len(resultado) < k:
+            entrada, i = heapq.heappop(frontera)
+            if entrada[2] is not ColaPrioridadAlertas._ELIMINADA:
+                resultado.append(self._a_diccionario(entrada))
+            for hijo in (2 * i + 1, 2 * i + 2):
+                if hijo < len(self.heap):
+                    heapq.heappush(frontera, (self.heap[hijo], hijo))
+        return resultado
     
     def obtener_todas(self):
-        """Retorna todas las alertas sin extraerlas"""
-        return sorted(self.heap, key=lambda x: x['prioridad'])
+        """Retorna todas las alertas ordenadas sin extraerlas - O(n log n)"""
+        return [self._a_diccionario(e) for e in sorted(self._entradas.values())]
+    
+    def __len__(self):
+        return len(self._entradas)
     
     def esta_vacia(self):
         """Verifica si la cola está vacía"""
-        return len(self.heap) == 0
\ No newline at end of file
+        return len(self._entradas) == 0
@@ -0,0 +1,267 @@
+# Módulo de generación de datos sintéticos (cargas y benchmarks a escala)
+# Archivo: modulos/generador_datos.py
+
+from datetime import date
+
+import numpy as np
+
+
+class GeneradorDatos:
+    """
+    Genera usuarios, fincas, lotes, insumos, siembras, cosechas y
+    aplicaciones de insumos sintéticos con distribuciones realistas por
+    cultivo (rendimiento esperado, días a cosecha y precio de la tabla
+    cultivo).
+
+    Los datos se producen por bloques de usuarios y cada tabla de un bloque
+    se genera completa con operaciones vectorizadas de NumPy (np.repeat
+    sobre los conteos de hijos por padre), sin bucles por fila. La
+    aleatoriedad se deriva de la semilla raíz (SeedSequence) por sub-bloques
+    fijos de SUBBLOQUE usuarios y un bloque de carga es la concatenación de
+    varios de ellos, así que la misma semilla y cantidad de usuarios producen
+    los mismos datos con cualquier tamaño de bloque. Los ids se
+    asignan explícitamente desde los valores iniciales indicados para
+    poder enlazar las llaves foráneas sin consultar la base de datos.
+    Demuestra: Estadística II (distribuciones) + Análisis de Algoritmos
+    """
+
+    # Usuarios por sub-bloque con semilla propia (no depende de --bloque)
+    SUBBLOQUE = 100
+
+    TABLAS = ('usuario', 'finca', 'lote', 'insumo', 'siembra', 'cosecha', 'aplicacion_insumo')
+    COLUMNAS = {
+        'usuario': ('id_usuario', 'email', 'password_hash', 'nombre', 'fecha_registro'),
+        'finca': ('id_finca', 'nombre', 'ubicacion', 'area_total_hectareas', 'propietario',
+                  'fecha_registro', 'estado', 'user_id'),
+        'lote': ('id_lote', 'id_finca', 'nombre', 'area_hectareas', 'tipo_suelo', 'ph_suelo', 'estado'),
+        'insumo': ('id_insumo', 'id_finca', 'nombre', 'tipo', 'unidad_medida', 'cantidad_disponible',
+                   'costo_unitario', 'fecha_compra', 'proveedor'),
+        'siembra': ('id_siembra', 'id_lote', 'id_cultivo', 'fecha_siembra', 'area_sembrada',
+                    'cantidad_semilla', 'costo_siembra', 'estado', 'fecha_cosecha_estimada'),
+        'cosecha': ('id_cosecha', 'id_siembra', 'fecha_cosecha', 'cantidad_kg', 'calidad_porcentaje',
+                    'precio_venta_kg', 'ingreso_total'),
+        'aplicacion_insumo': ('id_aplicacion', 'id_siembra', 'id_insumo', 'fecha_aplicacion',
+                              'cantidad_aplicada', 'costo_aplicacion', 'metodo_aplicacion'),
+    }
+
+    # (nombre, tipo, unidad, costo unitario, dosis por ha)
+    CATALOGO_INSUMOS = (
+        ('Urea 46%', 'fertilizante', 'kg', 0.85, 25.0),
+        ('Fosfato Diamónico', 'fertilizante', 'kg', 1.20, 15.0),
+        ('Glifosato', 'herbicida', 'litro', 12.50, 2.0),
+        ('Insecticida Cipermetrina', 'pesticida', 'litro', 18.00, 0.8),
+    )
+    UBICACIONES = ('Valle Central', 'Zona Norte', 'Zona Sur', 'Altiplano', 'Costa', 'Piedemonte')
+    SUELOS = ('Franco', 'Franco arcilloso', 'Franco arenoso', 'Arcilloso', 'Limoso')
+    METODOS = ('Aplicación al voleo', 'Aplicación localizada', 'Fumigación foliar')
+    PROVEEDORES = ('AgroInsumos SA', 'Químicos Agrícolas', 'Cooperativa del Valle')
+
+    def __init__(self, cultivos, semilla=42, fincas_por_usuario=2, lotes_por_finca=4,
+                 siembras_por_lote=6, aplicaciones_por_siembra=2, anios=3, hoy=None,
+                 password_hash='', ids_iniciales=None):
+        """
+        - cultivos: lista de diccionarios de la tabla cultivo (id_cultivo,
+          dias_cosecha_estimado, rendimiento_esperado_kg_ha, precio_referencia_kg)
+        - *_por_*: promedios de hijos por padre (Poisson, mínimo 1 finca y lote)
+        - anios: años de historial de siembras hasta hoy
+        - password_hash: un único hash compartido por todos los usuarios
+          (hashear millones de contraseñas dominaría el tiempo de carga)
+        - ids_iniciales: {tabla: primer id a usar}
+        """
+        if not cultivos:
+            raise ValueError('Se necesita al menos un cultivo para generar siembras')
+        self.semilla = semilla
+        self.fincas_por_usuario = fincas_por_usuario
+        self.lotes_por_finca = lotes_por_finca
+        self.siembras_por_lote = siembras_por_lote
+        self.aplicaciones_por_siembra = aplicaciones_por_siembra
+        self.anios = anios
+        self.hoy = np.datetime64(hoy or date.today(), 'D')
+        self.password_hash = password_hash
+        self.siguiente = {tabla: 1 for tabla in self.TABLAS}
+        self.siguiente.update(ids_iniciales or {})
+
+        self.id_cultivo = np.array([c['id_cultivo'] for c in cultivos], dtype=np.int64)
+        self.dias_cultivo = np.array([c.get('dias_cosecha_estimado') or 90 for c in cultivos], dtype=np.int64)
+        self.rendimiento_cultivo = np.array([float(c.get('rendimiento_esperado_kg_ha') or 5000)
+                                             for c in cultivos])
+        self.precio_cultivo = np.array([float(c.get('precio_referencia_kg') or 0.5) for c in cultivos])
+
+    def _ids(self, tabla, n):
+        inicio = self.siguiente[tabla]
+        self.siguiente[tabla] = inicio + n
+        return np.arange(inicio, inicio + n, dtype=np.int64)
+
+    @staticmethod
+    def _textos(prefijo, ids):
+        return np.char.add(prefijo, ids.astype(str))
+
+    def bloque(self, indice, usuarios):
+        """
+        Genera el sub-bloque número 'indice' con 'usuarios' usuarios y todos
+        sus datos, con la semilla derivada de (semilla, indice).
+        Retorna: {tabla: {columna: arreglo}} en el orden de TABLAS
+        """
+        rng = np.random.default_rng(np.random.SeedSequence(self.semilla, spawn_key=(indice,)))
+        hoy = self.hoy
+        datos = {}
+
+        # Usuarios
+        id_usuario = self._ids('usuario', usuarios)
+        registro = hoy - rng.integers(self.anios * 365, (self.anios + 2) * 365, usuarios)
+        datos['usuario'] = {
+            'id_usuario': id_usuario,
+            'email': np.char.add(self._textos('productor', id_usuario), '@agrodata.test'),
+            'password_hash': np.full(usuarios, self.password_hash, dtype=object),
+            'nombre': self._textos('Productor ', id_usuario),
+            'fecha_registro': registro,
+        }
+
+        # Fincas (>= 1 por usuario)
+        por_usuario = 1 + rng.poisson(max(self.fincas_por_usuario - 1, 0), usuarios)
+        n_fincas = int(por_usuario.sum())
+        id_finca = self._ids('finca', n_fincas)
+        dueno = np.repeat(np.arange(usuarios), por_usuario)
+
+        # Lotes (>= 1 por finca)
+        por_finca = 1 + rng.poisson(max(self.lotes_por_finca - 1, 0), n_fincas)
+        n_lotes = int(por_finca.sum())
+        id_lote = self._ids('lote', n_lotes)
+        finca_lote = np.repeat(np.arange(n_fincas), por_finca)
+        numero_lote = np.arange(n_lotes) - np.repeat(np.cumsum(por_finca) - por_finca, por_finca) + 1
+        area_lote = np.round(np.clip(rng.lognormal(np.log(8.0), 0.6, n_lotes), 0.5, 200.0), 2)
+        ph_lote = np.round(np.clip(rng.normal(6.6, 0.45, n_lotes), 4.5, 8.5), 1)
+
+        datos['finca'] = {
+            'id_finca': id_finca,
+            'nombre': self._textos('Finca ', id_finca),
+            'ubicacion': np.array(self.UBICACIONES)[rng.integers(0, len(self.UBICACIONES), n_fincas)],
+            'area_total_hectareas': np.round(np.bincount(finca_lote, area_lote, n_fincas) * 1.15, 2),
+            'propietario': datos['usuario']['nombre'][dueno],
+            'fecha_registro': registro[dueno],
+            'estado': np.full(n_fincas, 'activa'),
+            'user_id': id_usuario[dueno],
+        }
+        datos['lote'] = {
+            'id_lote': id_lote,
+            'id_finca': id_finca[finca_lote],
+            'nombre': self._textos('Lote ', numero_lote),
+            'area_hectareas': area_lote,
+            'tipo_suelo': np.array(self.SUELOS)[rng.integers(0, len(self.SUELOS), n_lotes)],
+            'ph_suelo': ph_lote,
+            'estado': np.full(n_lotes, 'activo'),
+        }
+
+        # Insumos: el catálogo completo en cada finca
+        k = len(self.CATALOGO_INSUMOS)
+        catalogo = list(zip(*self.CATALOGO_INSUMOS))
+        id_insumo = self._ids('insumo', n_fincas * k)
+        tipo_insumo = np.tile(np.arange(k), n_fincas)
+        costo_insumo = np.round(np.array(catalogo[3])[tipo_insumo] * rng.uniform(0.9, 1.1, n_fincas * k), 2)
+        datos['insumo'] = {
+            'id_insumo': id_insumo,
+            'id_finca': np.repeat(id_finca, k),
+            'nombre': np.array(catalogo[0])[tipo_insumo],
+            'tipo': np.array(catalogo[1])[tipo_insumo],
+            'unidad_medida': np.array(catalogo[2])[tipo_insumo],
+            'cantidad_disponible': np.round(rng.uniform(20, 500, n_fincas * k), 2),
+            'costo_unitario': costo_insumo,
+            'fecha_compra': hoy - rng.integers(0, 365, n_fincas * k),
+            'proveedor': np.array(self.PROVEEDORES)[rng.integers(0, len(self.PROVEEDORES), n_fincas * k)],
+        }
+
+        # Siembras: fecha uniforme en el historial, estado según avance del ciclo
+        por_lote = rng.poisson(self.siembras_por_lote, n_lotes)
+        n_siembras = int(por_lote.sum())
+        id_siembra = self._ids('siembra', n_siembras)
+        lote_siembra = np.repeat(np.arange(n_lotes), por_lote)
+        cultivo = rng.integers(0, len(self.id_cultivo), n_siembras)
+        dias = self.dias_cultivo[cultivo]
+        fecha_siembra = hoy - rng.integers(0, self.anios * 365, n_siembras)
+        area = np.round(area_lote[lote_siembra] * rng.uniform(0.4, 1.0, n_siembras), 2)
+        avance = (hoy - fecha_siembra).astype(np.int64) / dias
+        perdida = rng.random(n_siembras) < 0.04
+        estado = np.select(
+            [(avance >= 1) & perdida, avance >= 1, avance < 0.3, avance < 0.7],
+            ['perdido', 'cosechado', 'sembrado', 'crecimiento'], 'floracion')
+        ingreso_esperado = self.rendimiento_cultivo[cultivo] * self.precio_cultivo[cultivo]
+        datos['siembra'] = {
+            'id_siembra': id_siembra,
+            'id_lote': id_lote[lote_siembra],
+            'id_cultivo': self.id_cultivo[cultivo],
+            'fecha_siembra': fecha_siembra,
+            'area_sembrada': area,
+            'cantidad_semilla': np.round(area * rng.uniform(2, 25, n_siembras), 2),
+            'costo_siembra': np.round(area * ingreso_esperado * rng.uniform(0.08, 0.18, n_siembras), 2),
+            'estado': estado,
+            'fecha_cosecha_estimada': fecha_siembra + dias,
+        }
+
+        # Cosechas de las siembras cosechadas: rendimiento lognormal alrededor
+        # del esperado, penalizado por pH lejos de 6.5 y con tendencia anual
+        cosechada = np.flatnonzero(estado == 'cosechado')
+        n_cosechas = len(cosechada)
+        c = cultivo[cosechada]
+        anios_atras = (hoy - fecha_siembra[cosechada]).astype(np.int64) / 365.0
+        factor = (rng.lognormal(0.0, 0.15, n_cosechas)
+                  * (1 - 0.08 * np.abs(ph_lote[lote_siembra[cosechada]] - 6.5))
+                  * (1 - 0.02 * anios_atras))
+        kg = np.round(area[cosechada] * self.rendimiento_cultivo[c] * factor, 2)
+        precio = np.round(self.precio_cultivo[c] * rng.lognormal(0.0, 0.1, n_cosechas), 2)
+        retraso = np.clip(np.round(rng.normal(0, 7, n_cosechas)), -10, 20).astype(np.int64)
+        datos['cosecha'] = {
+            'id_cosecha': self._ids('cosecha', n_cosechas),
+            'id_siembra': id_siembra[cosechada],
+            'fecha_cosecha': np.minimum(fecha_siembra[cosechada] + dias[cosechada] + retraso, hoy),
+            'cantidad_kg': kg,
+            'calidad_porcentaje': np.round(rng.uniform(80, 100, n_cosechas), 2),
+            'precio_venta_kg': precio,
+            'ingreso_total': np.round(kg * precio, 2),
+        }
+
+        # Aplicaciones de insumos del catálogo de la finca durante el ciclo
+        por_siembra = rng.poisson(self.aplicaciones_por_siembra, n_siembras)
+        n_aplicaciones = int(por_siembra.sum())
+        s = np.repeat(np.arange(n_siembras), por_siembra)
+        tipo = rng.integers(0, k, n_aplicaciones)
+        dia = np.floor(rng.uniform(0.05, 0.6, n_aplicaciones) * dias[s]).astype(np.int64)
+        cantidad = np.round(area[s] * np.array(catalogo[4])[tipo] * rng.uniform(0.7, 1.3, n_aplicaciones), 2)
+        indice_insumo = finca_lote[lote_siembra[s]] * k + tipo
+        fecha_aplicacion = np.minimum(fecha_siembra[s] + dia, hoy)
+        datos['aplicacion_insumo'] = {
+            'id_aplicacion': self._ids('aplicacion_insumo', n_aplicaciones),
+            'id_siembra': id_siembra[s],
+            'id_insumo': id_insumo[indice_insumo],
+            'fecha_aplicacion': fecha_aplicacion,
+            'cantidad_aplicada': cantidad,
+            'costo_aplicacion': np.round(cantidad * costo_insumo[indice_insumo], 2),
+            'metodo_aplicacion': np.array(self.METODOS)[rng.integers(0, len(self.METODOS), n_aplicaciones)],
+        }
+        return datos
+
+    def bloques(self, usuarios, tamano_bloque=1000):
+        """
+        Generador de bloques hasta completar 'usuarios' usuarios.
+        tamano_bloque se redondea hacia arriba a un múltiplo de SUBBLOQUE;
+        solo cambia cuántos sub-bloques se agrupan por carga, no los datos.
+        """
+        por_bloque = max(1, -(-tamano_bloque // self.SUBBLOQUE))
+        tamanos = [min(self.SUBBLOQUE, usuarios - inicio)
+                   for inicio in range(0, usuarios, self.SUBBLOQUE)]
+        for primero in range(0, len(tamanos), por_bloque):
+            yield self.concatenar([self.bloque(indice, tamanos[indice])
+                                   for indice in range(primero, min(primero + por_bloque, len(tamanos)))])
+
+    @staticmethod
+    def concatenar(bloques):
+        """Une bloques consecutivos columna por columna"""
+        if len(bloques) == 1:
+            return bloques[0]
+        return {tabla: {columna: np.concatenate([b[tabla][columna] for b in bloques])
+                        for columna in bloques[0][tabla]}
+                for tabla in bloques[0]}
+
+    @staticmethod
+    def filas(datos, tabla):
+        """Tuplas de valores Python (fechas como date) de una tabla del bloque, en el orden de COLUMNAS"""
+        return zip(*[datos[tabla][columna].tolist() for columna in GeneradorDatos.COLUMNAS[tabla]])
@@ -1,15 +1,27 @@
 # PASO 7.3: Módulo de Métodos Numéricos
 # Archivo: modulos/metodos_numericos.py
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 import numpy as np
 from scipy import interpolate
 
+from .columnar import TablaColumnar
+from .segmentos import Segmentos
+
 class MetodosNumericos:
     """
     Clase para aplicar métodos numéricos en predicciones agrícolas.
     Demuestra: Métodos Numéricos
     """
     
+    # Interpoladores ya ajustados (LRU), indexados por un hash del historial
+    MAX_AJUSTES = 256
+    _ajustes = OrderedDict()
+    _bloqueo_ajustes = threading.Lock()
+    
     @staticmethod
     def interpolacion_lagrange(fechas, producciones, fecha_nueva):
         """
@@ -18,24 +30,57 @@ class MetodosNumericos:
         Parámetros:
         - fechas: lista de días desde siembra (ej: [30, 60, 90])
         - producciones: lista de kg cosechados en esas fechas
-        - fecha_nueva: día para el cual queremos estimar
+        - fecha_nueva: día (o arreglo de días) para el cual queremos estimar
         
         Retorna: producción estimada en kg
         
-        Demuestra: Interpolación polinomial
+        Demuestra: Interpolación polinomial (forma baricéntrica)
         """
-        n = len(fechas)
-        resultado = 0.0
-        
-        # Fórmula de Lagrange
-        for i in range(n):
-            termino = producciones[i]
-            for j in range(n):
-                if i != j:
-                    termino *= (fecha_nueva - fechas[j]) / (fechas[i] - fechas[j])
-            resultado += termino
+        x, y = MetodosNumericos._promediar_duplicados(fechas, producciones)
+        if len(x) == 0:
+            return None
+        estimacion = np.maximum(0, MetodosNumericos.interpolacion_baricentrica(x, y, fecha_nueva))
+        return float(estimacion) if np.ndim(estimacion) == 0 else estimacion
+    
+    @staticmethod
+    def pesos_baricentricos(nodos):
+        """
+        Pesos w_j = 1 / prod_{k != j} (x_j - x_k) de la fórmula baricéntrica,
+        en O(n²) una sola vez. Se calculan en escala logarítmica y se
+        normalizan (la fórmula es invariante a un factor común) para no
+        desbordar con cientos de nodos. Los nodos deben ser distintos.
+        """
+        nodos = np.asarray(nodos, dtype=np.float64)
+        diferencias = nodos[:, None] - nodos[None, :]
+        np.fill_diagonal(diferencias, 1.0)
+        signo = np.prod(np.sign(diferencias), axis=1)
+        log_pesos = -np.sum(np.log(np.abs(diferencias)), axis=1)
+        return signo * np.exp(log_pesos - log_pesos.max())
+    
+    @staticmethod
+    def interpolacion_baricentrica(nodos, valores, x_nuevos, pesos=None):
+        """
+        Evalúa el polinomio interpolante de Lagrange con la segunda forma
+        baricéntrica: O(n) por punto, vectorizado sobre un arreglo de x,
+        y numéricamente estable. En un nodo retorna el valor exacto.
+        - pesos: resultado de pesos_baricentricos(nodos) para reutilizarlo
+        """
+        nodos = np.asarray(nodos, dtype=np.float64)
+        valores = np.asarray(valores, dtype=np.float64)
+        if pesos is None:
+            pesos = MetodosNumericos.pesos_baricentricos(nodos)
+        x = np.asarray(x_nuevos, dtype=np.float64)
+        puntos = np.atleast_1d(x)
         
-        return max(0, resultado)  # No puede ser negativo
+        diferencias = puntos[:, None] - nodos[None, :]
+        exactos = diferencias == 0
+        diferencias[exactos] = 1.0
+        terminos = pesos / diferencias
+        with np.errstate(invalid='ignore'):
+            resultado = (terminos @ valores) / terminos.sum(axis=1)
+        fila, columna = np.nonzero(exactos)
+        resultado[fila] = valores[columna]
+        return resultado if x.ndim else resultado[0]
     
     @staticmethod
     def interpolacion_cubica(fechas, producciones, fecha_nueva):
@@ -47,38 +92,87 @@ class MetodosNumericos:
         """
         if len(fechas) < 3:
             return None
-
-        # 1) Agregar puntos con el mismo día (x) promediando su producción (y)
-        #    y ordenar por día para cumplir requisitos de interp1d
-        acumulado = {}
-        conteo = {}
-        for x, y in zip(fechas, producciones):
-            if x is None or y is None:
-                continue
-            x = float(x)
-            y = float(y)
-            acumulado[x] = acumulado.get(x, 0.0) + y
-            conteo[x] = conteo.get(x, 0) + 1
-
-        if not acumulado:
+        
+        evaluar = MetodosNumericos.ajustar_interpolador(fechas, producciones, 'cubica')
+        if evaluar is None:
             return None
-
-        x_uniq = sorted(acumulado.keys())
-        y_uniq = [acumulado[x] / conteo[x] for x in x_uniq]
-
-        # 2) Si hay menos de 3 puntos únicos, usar aproximación más simple
-        if len(x_uniq) < 3:
-            try:
-                # Interpolación lineal con numpy
-                estim = float(np.interp(fecha_nueva, x_uniq, y_uniq))
-                return max(0, estim)
-            except Exception:
-                return None
-
-        # 3) Interpolación cúbica con puntos únicos y ordenados
-        f_cubica = interpolate.interp1d(x_uniq, y_uniq, kind='cubic', fill_value='extrapolate')
-        estimacion = float(f_cubica(fecha_nueva))
-        return max(0, estimacion)
+        return float(evaluar(fecha_nueva))
+    
+    @staticmethod
+    def _como_arreglo(valores):
+        """Lista con posibles None -> arreglo float64 con NaN"""
+        if isinstance(valores, np.ndarray):
+            return valores.astype(np.float64)
+        return np.array([np.nan if v is None else float(v) for v in valores], dtype=np.float64)
+    
+    @staticmethod
+    def _promediar_duplicados(fechas, producciones):
+        """
+        Descarta puntos incompletos y promedia la producción de los días
+        repetidos. Retorna (días distintos ordenados, producción media).
+        """
+        x = MetodosNumericos._como_arreglo(fechas)
+        y = MetodosNumericos._como_arreglo(producciones)
+        validos = ~(np.isnan(x) | np.isnan(y))
+        x_uniq, inversa = np.unique(x[validos], return_inverse=True)
+        conteo = np.bincount(inversa, minlength=len(x_uniq))
+        y_uniq = np.bincount(inversa, weights=y[validos], minlength=len(x_uniq)) / np.maximum(conteo, 1)
+        return x_uniq, y_uniq
+    
+    @staticmethod
+    def ajustar_interpolador(fechas, producciones, metodo='cubica'):
+        """
+        Ajusta una sola vez el modelo de interpolación de un historial y
+        retorna una función vectorizada: evaluar(dias) -> kg (>= 0) para
+        un día o un arreglo completo de días. Los ajustes se guardan en
+        caché por hash del historial, así que proyectar muchos horizontes
+        o repetir la misma consulta no vuelve a ajustar.
+        
+        - metodo 'cubica': promedia los días repetidos y usa spline cúbico
+          (interp1d), cuadrático con 3 días distintos o lineal con menos
+        - metodo 'lagrange': polinomio de Lagrange (baricéntrico, pesos
+          precalculados) sobre los días distintos
+        
+        Retorna None si no hay puntos válidos.
+        """
+        x = MetodosNumericos._como_arreglo(fechas)
+        y = MetodosNumericos._como_arreglo(producciones)
+        clave = hashlib.blake2b(metodo.encode() + x.tobytes() + y.tobytes(),
+                                digest_size=16).digest()
+        
+        with MetodosNumericos._bloqueo_ajustes:
+            if clave in MetodosNumericos._ajustes:
+                MetodosNumericos._ajustes.move_to_end(clave)
+                return MetodosNumericos._ajustes[clave]
+        
+        # Promediar la producción de los días repetidos (vectorizado)
+        x_uniq, y_uniq = MetodosNumericos._promediar_duplicados(x, y)
+        if len(x_uniq) == 0:
+            modelo = None
+        elif metodo == 'lagrange':
+            pesos = MetodosNumericos.pesos_baricentricos(x_uniq)
+            
+            def modelo(dias):
+                return MetodosNumericos.interpolacion_baricentrica(x_uniq, y_uniq, dias, pesos)
+        elif len(x_uniq) < 3:
+            def modelo(dias):
+                return np.interp(dias, x_uniq, y_uniq)
+        else:
+            # El spline cúbico necesita 4 puntos; con 3 se usa cuadrático
+            modelo = interpolate.interp1d(x_uniq, y_uniq,
+                                          kind='cubic' if len(x_uniq) > 3 else 'quadratic',
+                                          fill_value='extrapolate')
+        
+        evaluar = None
+        if modelo is not None:
+            def evaluar(dias):
+                return np.maximum(0, modelo(np.asarray(dias, dtype=np.float64)))
+        
+        with MetodosNumericos._bloqueo_ajustes:
+            MetodosNumericos._ajustes[clave] = evaluar
+            while len(MetodosNumericos._ajustes) > MetodosNumericos.MAX_AJUSTES:
+                MetodosNumericos._ajustes.popitem(last=False)
+        return evaluar
     
     @staticmethod
     def metodo_biseccion(func, a, b, tolerancia=0.01, max_iter=100):
@@ -116,22 +210,88 @@ class MetodosNumericos:
     def calcular_punto_equilibrio(costo_fijo, costo_variable, precio_venta):
         """
         Calcula cantidad a producir para alcanzar punto de equilibrio.
-        Usa método de bisección.
         
         Fórmula: Ingresos - Costos = 0
         precio_venta * Q - (costo_fijo + costo_variable * Q) = 0
+        Q = costo_fijo / (precio_venta - costo_variable)
         
-        Retorna: cantidad en kg necesaria para no tener pérdidas
+        Retorna: cantidad en kg necesaria para no tener pérdidas, o None
+        si el precio no supera el costo variable (nunca hay equilibrio)
         """
-        # Definir función: Ingreso - Costo = 0
-        def funcion_equilibrio(cantidad):
-            ingresos = precio_venta * cantidad
-            costos = costo_fijo + (costo_variable * cantidad)
-            return ingresos - costos
+        punto = MetodosNumericos.puntos_equilibrio(costo_fijo, costo_variable, precio_venta)
+        return None if np.isnan(punto) else float(punto)
+    
+    @staticmethod
+    def puntos_equilibrio(costos_fijos, costos_variables, precios):
+        """
+        Punto de equilibrio para muchos escenarios a la vez (arreglos con
+        broadcasting): Q = costo_fijo / (precio - costo_variable).
+        Retorna NaN donde el margen por kg no es positivo.
+        """
+        costos_fijos = np.asarray(costos_fijos, dtype=np.float64)
+        margen = np.asarray(precios, dtype=np.float64) - np.asarray(costos_variables, dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            puntos = np.where(margen > 0, np.maximum(costos_fijos, 0) / margen, np.nan)
+        return puntos
+    
+    @staticmethod
+    def sensibilidad_equilibrio(costo_fijo, costo_variable, precio, variacion=0.5, pasos=100):
+        """
+        Malla de sensibilidad precio x costo variable del punto de equilibrio,
+        variando ambos entre (1 - variacion) y (1 + variacion) de su valor.
+        Con arreglos de grupos (ej: un valor por cultivo) retorna una malla
+        por grupo.
         
-        # Buscar en rango [0, 10000] kg
-        punto = MetodosNumericos.metodo_biseccion(funcion_equilibrio, 0, 10000)
-        return punto
+        Retorna diccionario con:
+        - precios (..., pasos), costos_variables (..., pasos)
+        - cantidades (..., pasos, pasos): filas = precio, columnas = costo
+        """
+        factores = np.linspace(1 - variacion, 1 + variacion, pasos)
+        precios = np.asarray(precio, dtype=np.float64)[..., None] * factores
+        costos = np.asarray(costo_variable, dtype=np.float64)[..., None] * factores
+        fijos = np.asarray(costo_fijo, dtype=np.float64)[..., None, None]
+        return {
+            'precios': precios,
+            'costos_variables': costos,
+            'cantidades': MetodosNumericos.puntos_equilibrio(
+                fijos, costos[..., None, :], precios[..., :, None])
+        }
+    
+    @staticmethod
+    def equilibrio_por_grupo(tabla, claves=('cultivo',)):
+        """
+        Punto de equilibrio de cada grupo (cultivo, lote, finca...) desde
+        la TablaColumnar de hechos por siembra, en una pasada vectorizada:
+        - costo fijo: costo de siembra promedio del grupo
+        - costo variable: costo de insumos / kg cosechados
+        - precio: ingreso total / kg cosechados
+        Retorna: lista de diccionarios, uno por grupo (None donde no hay
+        cosechas o el precio no supera el costo variable)
+        """
+        if not len(tabla):
+            return []
+        segmentos = Segmentos([tabla.columna(c) for c in claves])
+        kg = segmentos.suma(tabla.numerica('total_kg'))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            costo_fijo = segmentos.media(tabla.numerica('costo_siembra'))
+            costo_variable = np.where(kg > 0, segmentos.suma(tabla.numerica('costo_insumos')) / kg, np.nan)
+            precio = np.where(kg > 0, segmentos.suma(tabla.numerica('ingreso_total')) / kg, np.nan)
+        puntos = MetodosNumericos.puntos_equilibrio(costo_fijo, costo_variable, precio)
+        
+        grupos = []
+        for i, etiqueta in enumerate(segmentos.etiquetas()):
+            grupo = {}
+            for clave, codigo in zip(claves, etiqueta):
+                if tabla.es_categorica(clave):
+                    codigo = None if codigo < 0 else tabla.categorias[clave][codigo]
+                grupo[clave] = codigo
+            grupo.update({
+                nombre: None if np.isnan(valores[i]) else float(valores[i])
+                for nombre, valores in (('costo_fijo', costo_fijo), ('costo_variable', costo_variable),
+                                        ('precio', precio), ('punto_equilibrio', puntos))
+            })
+            grupos.append(grupo)
+        return grupos
     
     @staticmethod
     def proyectar_produccion(datos_historicos, dias_futuros):
@@ -139,7 +299,8 @@ class MetodosNumericos:
         Proyecta producción futura usando interpolación.
         
         Parámetros:
-        - datos_historicos: lista de diccionarios con 'dia' y 'kg'
+        - datos_historicos: lista de diccionarios con 'dia' y 'kg',
+          o una TablaColumnar con esas columnas
         - dias_futuros: lista de días para proyectar
         
         Retorna: lista de proyecciones
@@ -147,26 +308,23 @@ class MetodosNumericos:
         if len(datos_historicos) < 2:
             return None
         
-        fechas = [d['dia'] for d in datos_historicos]
-        producciones = [d['kg'] for d in datos_historicos]
+        if isinstance(datos_historicos, TablaColumnar):
+            fechas = datos_historicos.numerica('dia').tolist()
+            producciones = datos_historicos.numerica('kg').tolist()
+        else:
+            fechas = [d['dia'] for d in datos_historicos]
+            producciones = [d['kg'] for d in datos_historicos]
         
-        proyecciones = []
-        for dia in dias_futuros:
-            if len(fechas) >= 3:
-                # Usar interpolación cúbica si hay suficientes datos
-                estimacion = MetodosNumericos.interpolacion_cubica(
-                    fechas, producciones, dia
-                )
-            else:
-                # Usar Lagrange para pocos datos
-                estimacion = MetodosNumericos.interpolacion_lagrange(
-                    fechas, producciones, dia
-                )
-            
-            proyecciones.append({
-                'dia': dia,
-                'kg_estimado': round(estimacion, 2) if estimacion else 0
-            })
+        # Un solo ajuste (cacheado) y una evaluación vectorizada de todos los días
+        metodo = 'cubica' if len(fechas) >= 3 else 'lagrange'
+        evaluar = MetodosNumericos.ajustar_interpolador(fechas, producciones, metodo)
+        dias = np.asarray(dias_futuros, dtype=np.float64)
+        estimaciones = evaluar(dias) if evaluar is not None else np.zeros(len(dias))
+        
+        proyecciones = [
+            {'dia': dia, 'kg_estimado': round(float(estimacion), 2)}
+            for dia, estimacion in zip(dias_futuros, estimaciones)
+        ]
         
         return proyecciones
     
@@ -199,4 +357,107 @@ class MetodosNumericos:
         m = numerador / denominador
         b = y_mean - m * x_mean
         
-        return m, b
\ No newline at end of file
+        return m, b
+    
+    @staticmethod
+    def rellenar_segmentos(valores, inicios, total=None):
+        """
+        Convierte valores concatenados por segmentos (serie i ocupa
+        valores[inicios[i]:inicios[i+1]]) en una matriz rellenada con NaN.
+        - valores: arreglo (n,) o (n, p)
+        Retorna: (matriz (series, ancho[, p]), máscara (series, ancho))
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        inicios = np.asarray(inicios, dtype=np.int64)
+        total = len(valores) if total is None else total
+        longitudes = np.diff(np.append(inicios, total))
+        ancho = int(longitudes.max()) if len(longitudes) else 0
+        columnas = np.arange(ancho)
+        mascara = columnas[None, :] < longitudes[:, None]
+        indices = np.minimum(inicios[:, None] + columnas[None, :], max(total - 1, 0))
+        matriz = valores[indices] if total else np.empty(indices.shape + valores.shape[1:])
+        if matriz.ndim == 3:
+            matriz[~mascara] = np.nan
+        else:
+            matriz = np.where(mascara, matriz, np.nan)
+        return matriz, mascara
+    
+    @staticmethod
+    def regresion_lote(X, y, mascara=None):
+        """
+        Mínimos cuadrados para muchas series a la vez (vectorizado).
+        
+        Parámetros:
+        - X: arreglo (series, n) para regresión simple o (series, n, p)
+          para regresión múltiple
+        - y: arreglo (series, n)
+        - mascara: (series, n) con True en los puntos válidos; los NaN de
+          X o y también se excluyen (relleno de series de distinto largo)
+        
+        Retorna diccionario de arreglos por serie:
+        - coeficientes (series, p), intercepto (series,)
+        - error_std (series, p), error_std_intercepto, r_cuadrado, n
+        Series con menos de p + 2 puntos o sin variación quedan en NaN.
+        
+        Demuestra: Ajuste de curvas (ecuaciones normales por lotes)
+        """
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if X.ndim == 2:
+            X = X[:, :, None]
+        validos = ~np.isnan(y) & ~np.isnan(X).any(axis=2)
+        if mascara is not None:
+            validos &= np.asarray(mascara, dtype=bool)
+        peso = validos.astype(np.float64)
+        n = peso.sum(axis=1)
+        p = X.shape[2]
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Centrar cada serie mejora el condicionamiento de X'X
+            Xv = np.where(validos[:, :, None], X, 0.0)
+            yv = np.where(validos, y, 0.0)
+            media_x = Xv.sum(axis=1) / n[:, None]
+            media_y = yv.sum(axis=1) / n
+            Xc = (Xv - media_x[:, None, :]) * peso[:, :, None]
+            yc = (yv - media_y[:, None]) * peso
+            
+            XtX = np.einsum('snp,snq->spq', Xc, Xc)
+            Xty = np.einsum('snp,sn->sp', Xc, yc)
+            inversa = np.linalg.pinv(XtX)
+            coeficientes = np.einsum('spq,sq->sp', inversa, Xty)
+            intercepto = media_y - np.einsum('sp,sp->s', media_x, coeficientes)
+            
+            residuos = yc - np.einsum('snp,sp->sn', Xc, coeficientes)
+            sse = np.einsum('sn,sn->s', residuos, residuos)
+            sst = np.einsum('sn,sn->s', yc, yc)
+            r_cuadrado = 1 - sse / sst
+            sigma2 = sse / (n - p - 1)
+            error_std = np.sqrt(sigma2[:, None] * np.diagonal(inversa, axis1=1, axis2=2))
+            error_std_intercepto = np.sqrt(sigma2 * (1 / n + np.einsum(
+                'sp,spq,sq->s', media_x, inversa, media_x)))
+        
+        # Series sin puntos suficientes o degeneradas
+        invalidas = (n < p + 2) | (sst == 0) | (np.diagonal(XtX, axis1=1, axis2=2) == 0).any(axis=1)
+        for arreglo in (coeficientes, error_std):
+            arreglo[invalidas] = np.nan
+        for arreglo in (intercepto, error_std_intercepto, r_cuadrado):
+            arreglo[invalidas] = np.nan
+        
+        return {
+            'coeficientes': coeficientes,
+            'intercepto': intercepto,
+            'error_std': error_std,
+            'error_std_intercepto': error_std_intercepto,
+            'r_cuadrado': r_cuadrado,
+            'n': n.astype(np.int64)
+        }
+    
+    @staticmethod
+    def tendencia_lineal_lote(fechas, valores, mascara=None):
+        """
+        Versión por lotes de calcular_tendencia_lineal: una recta por fila.
+        Retorna: (pendientes, ordenadas) como arreglos
+        """
+        ajuste = MetodosNumericos.regresion_lote(fechas, valores, mascara)
+        return ajuste['coeficientes'][:, 0], ajuste['intercepto']
+
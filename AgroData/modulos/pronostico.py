@@ -0,0 +1,226 @@
+# Módulo de pronóstico de cosechas para las siembras activas
+# Archivo: modulos/pronostico.py
+
+import threading
+
+import numpy as np
+
+from .columnar import TablaColumnar
+from .consultas import FILTRO_SIEMBRAS_ACTIVAS, SQL_HECHOS_SIEMBRA, SQL_VERSION_DATOS, SQL_VERSION_DATOS_TOTAL
+from .metodos_numericos import MetodosNumericos
+from .segmentos import Segmentos
+
+
+class PronosticoCosechas:
+    """
+    Pronostica kg esperados y fecha de cosecha de cada siembra activa.
+
+    Modelo (ajustado en una sola pasada vectorizada sobre el historial):
+    - por cultivo: rendimiento medio (kg/ha) con tendencia lineal por año
+      de siembra si hay varias temporadas, su desviación estándar y los
+      días promedio hasta la primera cosecha
+    - por lote: desviación del lote respecto a su cultivo, contraída hacia
+      cero según cuántas cosechas tiene (n / (n + K_CONTRACCION))
+
+    Los modelos se guardan en caché por usuario y solo se re-ajustan cuando
+    cambia la versión de sus datos (tabla version_datos).
+    Demuestra: Métodos Numéricos + Estadística II
+    """
+
+    K_CONTRACCION = 3
+    DIAS_DEFECTO = 90
+    _modelos = {}  # user_id -> (version, modelo)
+    _bloqueo = threading.Lock()
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    # ---------- Ajuste y predicción (sin base de datos) ----------
+
+    @staticmethod
+    def _etiquetas(tabla, claves, segmentos):
+        """Etiquetas decodificadas (tuplas) de cada segmento"""
+        def decodificar(clave, codigo):
+            if not tabla.es_categorica(clave):
+                return codigo
+            return None if codigo < 0 else tabla.categorias[clave][codigo]
+        return [tuple(decodificar(c, codigo) for c, codigo in zip(claves, etiqueta))
+                for etiqueta in segmentos.etiquetas()]
+
+    @staticmethod
+    def ajustar(tabla):
+        """
+        Ajusta el modelo desde la TablaColumnar de hechos por siembra
+        (se usan solo las siembras con cosecha).
+        Retorna: diccionario con parámetros 'global', 'cultivos' y 'lotes'
+        """
+        if len(tabla):
+            tabla = tabla.filtrar(tabla.numerica('total_kg') > 0)
+        modelo = {'global': {'media': 0.0, 'desviacion': 0.0, 'dias': PronosticoCosechas.DIAS_DEFECTO},
+                  'cultivos': {}, 'lotes': {}}
+        if not len(tabla):
+            return modelo
+
+        rendimiento = tabla.numerica('rendimiento')
+        dias = tabla.numerica('dias_cosecha')
+        anio = tabla.numerica('anio')
+        modelo['global'] = {
+            'media': float(np.mean(rendimiento)),
+            'desviacion': float(np.std(rendimiento, ddof=1)) if len(rendimiento) > 1 else 0.0,
+            'dias': float(np.nanmean(dias)) if np.any(~np.isnan(dias)) else PronosticoCosechas.DIAS_DEFECTO
+        }
+        dias = np.where(np.isnan(dias), modelo['global']['dias'], dias)
+
+        # Nivel cultivo: medias, dispersión y tendencia por año en lote
+        por_cultivo = Segmentos([tabla.columna('cultivo')])
+        media_c = por_cultivo.media(rendimiento)
+        desviacion_c = np.nan_to_num(por_cultivo.desviacion(rendimiento), nan=modelo['global']['desviacion'])
+        dias_c = por_cultivo.media(dias)
+        anios, _ = MetodosNumericos.rellenar_segmentos(anio[por_cultivo.orden], por_cultivo.inicios)
+        rend, mascara = MetodosNumericos.rellenar_segmentos(rendimiento[por_cultivo.orden], por_cultivo.inicios)
+        tendencia = MetodosNumericos.regresion_lote(anios, rend, mascara)
+        # Solo se usa la tendencia si la pendiente es clara (|t| > 2)
+        pendiente = tendencia['coeficientes'][:, 0]
+        with np.errstate(invalid='ignore'):
+            clara = np.abs(pendiente) > 2 * tendencia['error_std'][:, 0]
+        pendiente = np.where(clara, pendiente, np.nan)
+        for i, (cultivo,) in enumerate(PronosticoCosechas._etiquetas(tabla, ('cultivo',), por_cultivo)):
+            modelo['cultivos'][cultivo] = {
+                'media': float(media_c[i]),
+                'desviacion': float(desviacion_c[i]),
+                'dias': float(dias_c[i]),
+                'pendiente': float(pendiente[i]),
+                'intercepto': float(tendencia['intercepto'][i]),
+                'n': int(por_cultivo.conteos[i])
+            }
+
+        # Nivel lote: efecto respecto al cultivo, contraído según n
+        claves = ('cultivo', 'finca', 'lote')
+        por_lote = Segmentos([tabla.columna(c) for c in claves])
+        media_l = por_lote.media(rendimiento)
+        dias_l = por_lote.media(dias)
+        peso = por_lote.conteos / (por_lote.conteos + PronosticoCosechas.K_CONTRACCION)
+        for i, clave in enumerate(PronosticoCosechas._etiquetas(tabla, claves, por_lote)):
+            cultivo = modelo['cultivos'][clave[0]]
+            modelo['lotes'][clave] = {
+                'efecto': float(peso[i] * (media_l[i] - cultivo['media'])),
+                'efecto_dias': float(peso[i] * (dias_l[i] - cultivo['dias'])),
+                'n': int(por_lote.conteos[i])
+            }
+        return modelo
+
+    @staticmethod
+    def pronosticar(modelo, activas):
+        """
+        Pronóstico vectorizado para una TablaColumnar de siembras activas
+        (columnas id_siembra, cultivo, finca, lote, area_sembrada,
+        fecha_siembra y anio).
+        Retorna: lista de diccionarios ordenada por fecha estimada de cosecha
+        """
+        n = len(activas)
+        if n == 0:
+            return []
+        cultivos = activas.valores('cultivo')
+        fincas = activas.valores('finca')
+        lotes = activas.valores('lote')
+        base = modelo['global']
+        sin_lote = {'efecto': 0.0, 'efecto_dias': 0.0}
+
+        parametros_c = [modelo['cultivos'].get(c) for c in cultivos]
+        parametros_l = [modelo['lotes'].get(clave, sin_lote) for clave in zip(cultivos, fincas, lotes)]
+
+        def columna(parametros, nombre, defecto):
+            return np.array([p[nombre] if p is not None else defecto for p in parametros], dtype=np.float64)
+
+        media = columna(parametros_c, 'media', base['media'])
+        pendiente = columna(parametros_c, 'pendiente', np.nan)
+        intercepto = columna(parametros_c, 'intercepto', np.nan)
+        desviacion = columna(parametros_c, 'desviacion', base['desviacion'])
+        dias = columna(parametros_c, 'dias', base['dias']) + columna(parametros_l, 'efecto_dias', 0.0)
+
+        # Tendencia por año cuando el cultivo tiene varias temporadas
+        con_tendencia = ~(np.isnan(pendiente) | np.isnan(intercepto))
+        rendimiento = np.where(con_tendencia, intercepto + pendiente * activas.numerica('anio'), media)
+        rendimiento = np.maximum(rendimiento + columna(parametros_l, 'efecto', 0.0), 0.0)
+
+        area = activas.numerica('area_sembrada')
+        kg = area * rendimiento
+        fecha_cosecha = (activas.columna('fecha_siembra').astype('datetime64[D]')
+                         + np.round(dias).astype('timedelta64[D]'))
+        ids = activas.valores('id_siembra')
+
+        pronosticos = [{
+            'id_siembra': ids[i].item() if hasattr(ids[i], 'item') else ids[i],
+            'cultivo': cultivos[i],
+            'finca': fincas[i],
+            'lote': lotes[i],
+            'rendimiento_estimado': round(float(rendimiento[i]), 2),
+            'kg_estimado': round(float(kg[i]), 2),
+            'kg_minimo': round(float(max(kg[i] - area[i] * desviacion[i], 0.0)), 2),
+            'kg_maximo': round(float(kg[i] + area[i] * desviacion[i]), 2),
+            'fecha_cosecha': fecha_cosecha[i].item()
+        } for i in range(n)]
+        pronosticos.sort(key=lambda p: (p['fecha_cosecha'], p['id_siembra']))
+        return pronosticos
+
+    @staticmethod
+    def resumen_por_cultivo(pronosticos):
+        """Siembras activas, kg esperados y próxima cosecha por cultivo"""
+        resumen = {}
+        for p in pronosticos:
+            r = resumen.setdefault(p['cultivo'], {'cultivo': p['cultivo'], 'siembras': 0,
+                                                  'kg_estimado': 0.0, 'kg_minimo': 0.0,
+                                                  'kg_maximo': 0.0, 'proxima_cosecha': p['fecha_cosecha']})
+            r['siembras'] += 1
+            for campo in ('kg_estimado', 'kg_minimo', 'kg_maximo'):
+                r[campo] += p[campo]
+            r['proxima_cosecha'] = min(r['proxima_cosecha'], p['fecha_cosecha'])
+        return sorted(resumen.values(), key=lambda r: -r['kg_estimado'])
+
+    # ---------- Acceso a datos y caché ----------
+
+    def _tabla(self, filtro, params):
+        cursor = self.conexion.cursor()
+        cursor.execute(SQL_HECHOS_SIEMBRA.format(filtro=filtro), params)
+        tabla = TablaColumnar.desde_cursor(cursor)
+        cursor.close()
+        return tabla
+
+    def modelo(self, user_id=None):
+        """Modelo del usuario, re-ajustado solo si cambiaron sus datos"""
+        filtro = "AND f.user_id = %s" if user_id is not None else ""
+        params = (user_id,) if user_id is not None else ()
+
+        cursor = self.conexion.cursor()
+        cursor.execute(SQL_VERSION_DATOS if user_id is not None else SQL_VERSION_DATOS_TOTAL, params)
+        version = int(cursor.fetchone()[0])
+        cursor.close()
+
+        with PronosticoCosechas._bloqueo:
+            guardado = PronosticoCosechas._modelos.get(user_id)
+        if guardado is not None and guardado[0] == version:
+            return guardado[1]
+
+        modelo = PronosticoCosechas.ajustar(self._tabla(filtro + " AND co.total_kg > 0", params))
+        with PronosticoCosechas._bloqueo:
+            PronosticoCosechas._modelos[user_id] = (version, modelo)
+        return modelo
+
+    def pronosticar_activas(self, user_id=None):
+        """Pronóstico de todas las siembras activas (en el suelo, sin cosechas) del usuario"""
+        filtro = FILTRO_SIEMBRAS_ACTIVAS
+        params = ()
+        if user_id is not None:
+            filtro += " AND f.user_id = %s"
+            params = (user_id,)
+        activas = self._tabla(filtro, params)
+        return PronosticoCosechas.pronosticar(self.modelo(user_id), activas)
+
+    @staticmethod
+    def invalidar(user_id=None):
+        """Descarta el modelo cacheado de un usuario (o todos con None)"""
+        with PronosticoCosechas._bloqueo:
+            if user_id is None:
+                PronosticoCosechas._modelos.clear()
+            else:
+                PronosticoCosechas._modelos.pop(user_id, None)
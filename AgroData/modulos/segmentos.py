@@ -0,0 +1,154 @@
+# Módulo de reducciones por segmentos (estadísticas agrupadas vectorizadas)
+# Archivo: modulos/segmentos.py
+
+import numpy as np
+
+
+class Segmentos:
+    """
+    Agrupa filas por una o varias claves ordenándolas una sola vez, de modo
+    que cada grupo quede como un segmento contiguo [inicio, fin). Todas las
+    estadísticas se calculan después para todos los grupos a la vez con
+    reducciones de NumPy (np.add.reduceat, np.minimum.reduceat, ...), sin
+    bucles de Python por grupo.
+    Demuestra: Estadística II + Análisis de Algoritmos (O(n log n) total)
+    """
+
+    def __init__(self, claves):
+        """
+        claves: lista de arreglos de la misma longitud (códigos, números,
+        fechas o textos). Cada combinación distinta de valores es un grupo.
+        """
+        claves = [np.asarray(c) for c in claves]
+        self.n = len(claves[0]) if claves else 0
+        # Cada clave se factoriza a códigos densos para ordenar con lexsort
+        codigos, self.niveles = [], []
+        for clave in claves:
+            niveles, codigo = np.unique(clave, return_inverse=True)
+            self.niveles.append(niveles)
+            codigos.append(codigo.reshape(-1))
+        self.orden = np.lexsort(codigos[::-1]) if codigos else np.arange(self.n)
+
+        if self.n == 0:
+            self.inicios = np.empty(0, dtype=np.int64)
+            self.claves = [np.empty(0, dtype=np.int64) for _ in codigos]
+        else:
+            ordenados = [c[self.orden] for c in codigos]
+            cambio = np.zeros(self.n, dtype=bool)
+            cambio[0] = True
+            for c in ordenados:
+                cambio[1:] |= c[1:] != c[:-1]
+            self.inicios = np.flatnonzero(cambio)
+            self.claves = [c[self.inicios] for c in ordenados]
+        self.conteos = np.diff(np.append(self.inicios, self.n))
+        # Grupo de cada fila ya ordenada (para difundir resultados por grupo)
+        self.grupo_ordenado = np.repeat(np.arange(len(self.inicios)), self.conteos)
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def etiquetas(self):
+        """Lista con la tupla de valores de clave de cada grupo"""
+        columnas = [niveles[codigos] for niveles, codigos in zip(self.niveles, self.claves)]
+        return [tuple(v.item() if hasattr(v, 'item') else v for v in fila)
+                for fila in zip(*columnas)]
+
+    # ---------- Reducciones ----------
+
+    def _ordenar(self, valores):
+        return np.asarray(valores, dtype=np.float64)[self.orden]
+
+    def suma(self, valores):
+        if not len(self):
+            return np.empty(0)
+        return np.add.reduceat(self._ordenar(valores), self.inicios)
+
+    def media(self, valores):
+        return self.suma(valores) / self.conteos if len(self) else np.empty(0)
+
+    def varianza(self, valores, ddof=1):
+        """Varianza por grupo en dos pasadas (centrando con la media del grupo)"""
+        if not len(self):
+            return np.empty(0)
+        ordenados = self._ordenar(valores)
+        media = np.add.reduceat(ordenados, self.inicios) / self.conteos
+        desvios = ordenados - media[self.grupo_ordenado]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.add.reduceat(desvios * desvios, self.inicios) / (self.conteos - ddof)
+
+    def desviacion(self, valores, ddof=1):
+        return np.sqrt(self.varianza(valores, ddof))
+
+    def minimo(self, valores):
+        return np.minimum.reduceat(self._ordenar(valores), self.inicios) if len(self) else np.empty(0)
+
+    def maximo(self, valores):
+        return np.maximum.reduceat(self._ordenar(valores), self.inicios) if len(self) else np.empty(0)
+
+    def cuantiles(self, valores, qs=(0.25, 0.5, 0.75)):
+        """
+        Cuantiles por grupo con interpolación lineal (como np.quantile).
+        Ordena los valores dentro de cada segmento con un único lexsort.
+        Retorna: arreglo (grupos, len(qs))
+        """
+        qs = np.asarray(qs, dtype=np.float64)
+        if not len(self):
+            return np.empty((0, len(qs)))
+        datos = np.asarray(valores, dtype=np.float64)
+        grupo_fila = np.empty(self.n, dtype=np.int64)
+        grupo_fila[self.orden] = self.grupo_ordenado
+        ordenados = datos[np.lexsort((datos, grupo_fila))]
+
+        posicion = (self.conteos - 1)[:, None] * qs[None, :]
+        abajo = np.floor(posicion).astype(np.int64)
+        arriba = np.minimum(abajo + 1, (self.conteos - 1)[:, None])
+        fraccion = posicion - abajo
+        base = self.inicios[:, None]
+        v_abajo = ordenados[base + abajo]
+        v_arriba = ordenados[base + arriba]
+        return v_abajo + fraccion * (v_arriba - v_abajo)
+
+    def mediana(self, valores):
+        return self.cuantiles(valores, (0.5,))[:, 0]
+
+    def _momentos(self, x, y):
+        """Sumas de productos centrados por grupo: (Sxx, Syy, Sxy, media_x, media_y)"""
+        xo, yo = self._ordenar(x), self._ordenar(y)
+        media_x = np.add.reduceat(xo, self.inicios) / self.conteos
+        media_y = np.add.reduceat(yo, self.inicios) / self.conteos
+        dx = xo - media_x[self.grupo_ordenado]
+        dy = yo - media_y[self.grupo_ordenado]
+        sxx = np.add.reduceat(dx * dx, self.inicios)
+        syy = np.add.reduceat(dy * dy, self.inicios)
+        sxy = np.add.reduceat(dx * dy, self.inicios)
+        return sxx, syy, sxy, media_x, media_y
+
+    def correlacion(self, x, y):
+        """Correlación de Pearson por grupo (NaN si un grupo no varía)"""
+        if not len(self):
+            return np.empty(0)
+        sxx, syy, sxy, _, _ = self._momentos(x, y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sxy / np.sqrt(sxx * syy)
+
+    def regresion(self, x, y):
+        """
+        Regresión lineal simple y = pendiente * x + intercepto por grupo.
+        Retorna diccionario de arreglos: pendiente, intercepto, r_cuadrado
+        y error_std (error estándar de la pendiente, como stats.linregress).
+        """
+        if not len(self):
+            vacio = np.empty(0)
+            return {'pendiente': vacio, 'intercepto': vacio, 'r_cuadrado': vacio, 'error_std': vacio}
+        sxx, syy, sxy, media_x, media_y = self._momentos(x, y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pendiente = sxy / sxx
+            r = sxy / np.sqrt(sxx * syy)
+            residuo = np.maximum(syy - pendiente * sxy, 0.0)
+            error_std = np.sqrt(residuo / (self.conteos - 2) / sxx)
+        return {
+            'pendiente': pendiente,
+            'intercepto': media_y - pendiente * media_x,
+            'r_cuadrado': r * r,
+            'error_std': error_std
+        }
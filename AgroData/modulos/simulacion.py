@@ -0,0 +1,287 @@
+# Módulo de simulación Monte Carlo de riesgo (rendimiento, precio y costos)
+# Archivo: modulos/simulacion.py
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .columnar import TablaColumnar
+from .consultas import ESTADOS_FINALES
+from .segmentos import Segmentos
+
+
+def _estadisticas(utilidad, percentiles):
+    """Media, percentiles y probabilidad de pérdida de cada columna (escenarios x columnas)"""
+    return {
+        'media': utilidad.mean(axis=0),
+        'percentiles': np.percentile(utilidad, percentiles, axis=0).T,
+        'prob_perdida': (utilidad < 0).mean(axis=0),
+    }
+
+
+def _simular_bloque(tarea):
+    """
+    Simula un bloque de siembras (ordenadas por finca) para todos los
+    escenarios. Es una función de módulo para poder enviarse a los procesos
+    del pool.
+    Retorna las estadísticas por siembra y, por finca, sus estadísticas si
+    el bloque contiene fincas completas o el vector de utilidad sumada si
+    es un tramo de una finca partida en varios bloques.
+    """
+    (semilla, escenarios, precios, cultivo, inicios_finca, parcial, area, costo_siembra,
+     mu_rend, sigma_rend, mu_costo, sigma_costo, percentiles) = tarea
+    rng = np.random.default_rng(semilla)
+    n = len(area)
+
+    rendimiento = rng.lognormal(mu_rend, sigma_rend, size=(escenarios, n))
+    costo_ha = rng.lognormal(mu_costo, sigma_costo, size=(escenarios, n))
+    costo_ha[:, np.isneginf(mu_costo)] = 0.0  # Cultivos sin historial de insumos
+    # El precio es común a todas las siembras de un cultivo en cada escenario
+    utilidad = area * (rendimiento * precios[:, cultivo] - costo_ha) - costo_siembra
+
+    resultado = _estadisticas(utilidad, percentiles)
+    # Suma por finca de columnas contiguas: escenarios x fincas del bloque
+    por_finca = np.add.reduceat(utilidad, inicios_finca, axis=1)
+    if parcial:
+        resultado['utilidad_finca'] = por_finca[:, 0]
+    else:
+        resultado['fincas'] = _estadisticas(por_finca, percentiles)
+    return resultado
+
+
+class SimulacionRiesgo:
+    """
+    Simulación Monte Carlo de la utilidad de cada siembra:
+    utilidad = área * (rendimiento/ha * precio - costo insumos/ha) - costo siembra
+    con rendimiento, precio y costo de insumos muestreados de distribuciones
+    lognormales ajustadas al historial de cada cultivo (cosecha y
+    aplicacion_insumo). Reporta percentiles y probabilidad de pérdida por
+    siembra y por finca.
+
+    Los escenarios se generan por bloques de siembras para acotar la
+    memoria, los bloques pueden repartirse en un pool de procesos y cada
+    bloque usa su propia semilla derivada (SeedSequence), por lo que el
+    resultado es reproducible y no depende del número de procesos.
+    Demuestra: Estadística II - Simulación Monte Carlo
+    """
+
+    PERCENTILES = (5, 25, 50, 75, 95)
+    VARIABLES = ('rendimiento', 'precio', 'costo_ha')
+    SIGMA_DEFECTO = 0.25  # Dispersión relativa si un cultivo tiene un solo dato
+
+    @staticmethod
+    def parametros_historicos(tabla):
+        """
+        Ajusta (mu, sigma) lognormales por cultivo desde la TablaColumnar
+        de hechos por siembra, solo con siembras cosechadas:
+        - rendimiento: kg/ha
+        - precio: ingreso total / kg
+        - costo_ha: costo de insumos / ha
+        Retorna: {cultivo: {variable: (mu, sigma)}} con la clave None para
+        los parámetros globales (usados con cultivos sin historial).
+        """
+        kg = tabla.numerica('total_kg')
+        area = tabla.numerica('area_sembrada')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variables = {
+                'rendimiento': tabla.numerica('rendimiento'),
+                'precio': tabla.numerica('ingreso_total') / kg,
+                'costo_ha': tabla.numerica('costo_insumos') / area,
+            }
+        cosechadas = kg > 0
+        cultivos = tabla.valores('cultivo')
+
+        parametros = {}
+        for variable, valores in variables.items():
+            positivos = cosechadas & (valores > 0) & np.isfinite(valores)
+            logs = np.log(valores[positivos])
+            if len(logs):
+                sigma_global = float(np.std(logs, ddof=1)) if len(logs) > 1 else SimulacionRiesgo.SIGMA_DEFECTO
+                globales = (float(np.mean(logs)), sigma_global)
+            else:
+                globales = (-np.inf, 0.0)
+            parametros.setdefault(None, {})[variable] = globales
+
+            segmentos = Segmentos([tabla.columna('cultivo')[positivos]])
+            medias = segmentos.media(logs)
+            sigmas = segmentos.desviacion(logs)
+            for (codigo,), mu, sigma in zip(segmentos.etiquetas(), medias, sigmas):
+                cultivo = tabla.categorias['cultivo'][codigo] if codigo >= 0 else None
+                sigma = globales[1] if np.isnan(sigma) else float(sigma)
+                parametros.setdefault(cultivo, {})[variable] = (float(mu), sigma)
+
+        # Cultivos sin historial de alguna variable usan los parámetros globales
+        for cultivo in set(cultivos) | set(parametros):
+            for variable in SimulacionRiesgo.VARIABLES:
+                parametros.setdefault(cultivo, {}).setdefault(variable, parametros[None][variable])
+        return parametros
+
+    @staticmethod
+    def _bloques(finca, tamano_bloque):
+        """
+        Cortes (inicio, fin, parcial) sobre siembras ordenadas por finca.
+        Cada bloque contiene fincas completas; una finca con más siembras
+        que el tamaño de bloque se parte en tramos marcados como parciales.
+        """
+        cortes = np.flatnonzero(np.diff(finca)) + 1
+        inicios = np.concatenate(([0], cortes))
+        fines = np.concatenate((cortes, [len(finca)]))
+        bloques, inicio = [], 0
+        for a, b in zip(inicios.tolist(), fines.tolist()):
+            if b - a > tamano_bloque:
+                if a > inicio:
+                    bloques.append((inicio, a, False))
+                bloques.extend((c, min(c + tamano_bloque, b), True) for c in range(a, b, tamano_bloque))
+                inicio = b
+            elif b - inicio > tamano_bloque:
+                bloques.append((inicio, a, False))
+                inicio = a
+        if inicio < len(finca):
+            bloques.append((inicio, len(finca), False))
+        return bloques
+
+    @staticmethod
+    def simular(siembras, parametros, escenarios=10000, semilla=42, procesos=1,
+                memoria_max_mb=64, percentiles=PERCENTILES):
+        """
+        Simula la utilidad de las siembras indicadas.
+
+        Parámetros:
+        - siembras: TablaColumnar o lista de diccionarios con id_siembra,
+          cultivo, id_finca, finca, area_sembrada y costo_siembra
+        - parametros: resultado de parametros_historicos
+        - escenarios: número de escenarios Monte Carlo
+        - semilla: semilla raíz (mismo valor -> mismos resultados)
+        - procesos: procesos del pool (1 = en el proceso actual)
+        - memoria_max_mb: memoria aproximada por bloque de siembras
+
+        Las siembras se agrupan por id_finca (fincas de distintos dueños
+        pueden llamarse igual). Cada bloque resume sus fincas completas, de
+        modo que la memoria no crece con el número de fincas.
+
+        Retorna diccionario con 'siembras' y 'fincas' (listas de resultados
+        con utilidad media, percentiles p5..p95 y prob_perdida) y 'meta'.
+        """
+        if not isinstance(siembras, TablaColumnar):
+            siembras = TablaColumnar.desde_filas(siembras, categoricas=('cultivo', 'finca'))
+        n = len(siembras)
+        if n == 0:
+            return {'siembras': [], 'fincas': [], 'meta': {'escenarios': escenarios, 'semilla': semilla}}
+
+        # Orden por finca: las siembras de cada finca quedan contiguas
+        ids_finca, finca = np.unique(siembras.valores('id_finca'), return_inverse=True)
+        orden = np.argsort(finca, kind='stable')
+        finca = finca[orden]
+        cultivos = siembras.valores('cultivo')[orden]
+        etiquetas_cultivo, cultivo = np.unique(cultivos.astype(str), return_inverse=True)
+        nombres_finca = siembras.valores('finca')[orden]
+        area = siembras.numerica('area_sembrada')[orden]
+        costo_siembra = np.nan_to_num(siembras.numerica('costo_siembra'))[orden]
+
+        def parametro(variable, indice):
+            return np.array([parametros.get(c, parametros[None])[variable][indice] for c in cultivos])
+
+        # Semillas: una para los precios de mercado y una por bloque de siembras
+        raiz = np.random.SeedSequence(semilla)
+        semilla_precios, semilla_bloques = raiz.spawn(2)
+        rng = np.random.default_rng(semilla_precios)
+        precios = np.column_stack([
+            rng.lognormal(*parametros.get(c, parametros[None])['precio'], size=escenarios)
+            for c in etiquetas_cultivo
+        ])
+
+        # Cada bloque usa ~4 matrices (escenarios x siembras) de float64
+        tamano_bloque = max(1, int(memoria_max_mb * 2**20 // (escenarios * 8 * 4)))
+        bloques = SimulacionRiesgo._bloques(finca, tamano_bloque)
+        semillas = semilla_bloques.spawn(len(bloques))
+        mu_rend, sigma_rend = parametro('rendimiento', 0), parametro('rendimiento', 1)
+        mu_costo, sigma_costo = parametro('costo_ha', 0), parametro('costo_ha', 1)
+        tareas = (
+            (semillas[k], escenarios, precios, cultivo[i:j],
+             np.flatnonzero(np.r_[True, finca[i + 1:j] != finca[i:j - 1]]), parcial,
+             area[i:j], costo_siembra[i:j], mu_rend[i:j], sigma_rend[i:j],
+             mu_costo[i:j], sigma_costo[i:j], percentiles)
+            for k, (i, j, parcial) in enumerate(bloques)
+        )
+
+        media = np.empty(n)
+        valores_p = np.empty((n, len(percentiles)))
+        prob_perdida = np.empty(n)
+        estadisticas_finca = {}  # código de finca -> (media, percentiles, prob_perdida)
+        pendiente = None  # [código, utilidad sumada] de la finca partida en curso
+
+        def cerrar_pendiente():
+            if pendiente is not None:
+                e = _estadisticas(pendiente[1][:, None], percentiles)
+                estadisticas_finca[pendiente[0]] = (e['media'][0], e['percentiles'][0], e['prob_perdida'][0])
+
+        def recorrer(resultados):
+            nonlocal pendiente
+            for (i, j, parcial), r in zip(bloques, resultados):
+                media[i:j] = r['media']
+                valores_p[i:j] = r['percentiles']
+                prob_perdida[i:j] = r['prob_perdida']
+                if parcial:
+                    if pendiente is not None and pendiente[0] == finca[i]:
+                        pendiente[1] += r['utilidad_finca']
+                        continue
+                    cerrar_pendiente()
+                    pendiente = [finca[i], r['utilidad_finca']]
+                    continue
+                cerrar_pendiente()
+                pendiente = None
+                presentes = np.unique(finca[i:j])
+                f = r['fincas']
+                for k, codigo in enumerate(presentes):
+                    estadisticas_finca[codigo] = (f['media'][k], f['percentiles'][k], f['prob_perdida'][k])
+            cerrar_pendiente()
+
+        if procesos > 1 and len(bloques) > 1:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                recorrer(pool.map(_simular_bloque, tareas))
+        else:
+            recorrer(map(_simular_bloque, tareas))
+
+        def resumen(base, media_i, percentiles_i, perdida_i):
+            base['utilidad_media'] = float(media_i)
+            for p, valor in zip(percentiles, percentiles_i):
+                base[f'p{p}'] = float(valor)
+            base['prob_perdida'] = float(perdida_i)
+            return base
+
+        def nativo(valor):
+            return valor.item() if hasattr(valor, 'item') else valor
+
+        ids = siembras.valores('id_siembra')[orden]
+        por_siembra = [None] * n
+        for posicion, i in enumerate(orden.tolist()):
+            por_siembra[i] = resumen({'id_siembra': nativo(ids[posicion]), 'cultivo': cultivos[posicion],
+                                      'id_finca': nativo(ids_finca[finca[posicion]]),
+                                      'finca': nombres_finca[posicion]},
+                                     media[posicion], valores_p[posicion], prob_perdida[posicion])
+        conteos = np.bincount(finca, minlength=len(ids_finca))
+        primera = np.searchsorted(finca, np.arange(len(ids_finca)))
+        resultado_fincas = [
+            resumen({'id_finca': nativo(ids_finca[codigo]), 'finca': str(nombres_finca[primera[codigo]]),
+                     'siembras': int(conteos[codigo])}, *estadisticas_finca[codigo])
+            for codigo in range(len(ids_finca))
+        ]
+        return {
+            'siembras': por_siembra,
+            'fincas': resultado_fincas,
+            'meta': {'escenarios': escenarios, 'semilla': semilla, 'procesos': procesos,
+                     'bloques': len(bloques), 'siembras_por_bloque': tamano_bloque}
+        }
+
+    @staticmethod
+    def simular_activas(tabla, **opciones):
+        """
+        Ajusta los parámetros con todo el historial de la TablaColumnar de
+        hechos por siembra y simula solo las siembras activas (en el suelo).
+        opciones: las de simular (escenarios, semilla, procesos, ...)
+        """
+        # Mismo criterio que FILTRO_SIEMBRAS_ACTIVAS: no finalizadas y sin cosechas
+        activas = tabla.filtrar(~np.isin(tabla.valores('estado'), ESTADOS_FINALES)
+                                & np.isnan(tabla.numerica('dias_cosecha')))
+        return SimulacionRiesgo.simular(activas, SimulacionRiesgo.parametros_historicos(tabla),
+                                        **opciones)
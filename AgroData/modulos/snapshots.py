@@ -0,0 +1,215 @@
+# Módulo de snapshots analíticos por finca (columnas .npy memory-mapped)
+# Archivo: modulos/snapshots.py
+
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+from .columnar import TablaColumnar
+from .consultas import (
+    SQL_HECHOS_APLICACION, SQL_HECHOS_COSECHA, SQL_HECHOS_SIEMBRA, SQL_IDS_SIEMBRA_FINCA, SQL_SIEMBRA_CERRADA
+)
+
+
+class SnapshotsAnaliticos:
+    """
+    Exporta los hechos históricos (siembra, cosecha, aplicación de insumos)
+    de cada finca a un formato columnar binario: un archivo .npy por columna,
+    particionado por año de siembra, más un manifest.json. Las temporadas
+    cerradas se leen luego con memory-map, sin copiar ni consultar MySQL.
+    Solo se exportan las siembras cerradas (SQL_SIEMBRA_CERRADA); las que
+    siguen en el suelo se leen siempre de MySQL aunque sean de años pasados.
+    El snapshot guarda qué siembras quedaron fuera (pendientes.npy y el
+    último id_siembra existente al exportar), de modo que la parte en vivo
+    no depende del estado que tengan después en la base de datos.
+
+    Estructura en disco:
+        <directorio>/finca_<id>/manifest.json
+        <directorio>/finca_<id>/pendientes.npy
+        <directorio>/finca_<id>/<anio>/<tabla>/<columna>.npy
+    """
+
+    VERSION = 3  # 3: registra las siembras no exportadas (las versiones previas no se usan)
+
+    # Tipo de cada columna: 'cat' (categoría internada), 'i8', 'f8' o 'M8[D]'
+    TABLAS = {
+        'siembra': (SQL_HECHOS_SIEMBRA, {
+            'id_siembra': 'i8', 'finca': 'cat', 'lote': 'cat', 'cultivo': 'cat',
+            'estado': 'cat', 'fecha_siembra': 'M8[D]', 'area_sembrada': 'f8',
+            'ph_suelo': 'f8', 'dias_cosecha': 'f8', 'costo_siembra': 'f8',
+            'total_kg': 'f8', 'rendimiento': 'f8', 'ingreso_total': 'f8',
+            'costo_insumos': 'f8', 'cantidad_insumos': 'f8'
+        }),
+        'cosecha': (SQL_HECHOS_COSECHA, {
+            'id_cosecha': 'i8', 'id_siembra': 'i8', 'fecha_cosecha': 'M8[D]',
+            'dias': 'f8', 'cantidad_kg': 'f8', 'calidad_porcentaje': 'f8',
+            'precio_venta_kg': 'f8', 'ingreso_total': 'f8'
+        }),
+        'aplicacion': (SQL_HECHOS_APLICACION, {
+            'id_aplicacion': 'i8', 'id_siembra': 'i8', 'fecha_aplicacion': 'M8[D]',
+            'insumo': 'cat', 'tipo': 'cat', 'cantidad_aplicada': 'f8',
+            'costo_aplicacion': 'f8'
+        }),
+    }
+
+    # ---------- Exportación ----------
+
+    @staticmethod
+    def _columna(valores, tipo, indice):
+        """Convierte valores de MySQL a un arreglo del tipo indicado"""
+        if tipo == 'cat':
+            return np.array([-1 if v is None else indice.setdefault(v, len(indice))
+                             for v in valores], dtype=np.int32)
+        if tipo == 'i8':
+            return np.array(valores, dtype=np.int64)
+        if tipo == 'M8[D]':
+            return np.array(['NaT' if v is None else v for v in valores], dtype='datetime64[D]')
+        return np.array([np.nan if v is None else v for v in valores], dtype=np.float64)
+
+    @staticmethod
+    def exportar_finca(conexion, directorio, id_finca, hasta_anio=None, tamano_bloque=10000):
+        """
+        Exporta las temporadas cerradas (años de siembra <= hasta_anio,
+        por defecto el año anterior al actual) de una finca, solo con las
+        siembras cerradas a esa fecha de corte.
+        Retorna: el manifest escrito.
+        """
+        if hasta_anio is None:
+            hasta_anio = date.today().year - 1
+        carpeta = Path(directorio) / f'finca_{id_finca}'
+        corte = date(hasta_anio + 1, 1, 1)
+        filtro = "AND f.id_finca = %s AND " + SQL_SIEMBRA_CERRADA
+        parametros = (id_finca, corte, corte)
+
+        manifest = {
+            'version': SnapshotsAnaliticos.VERSION,
+            'id_finca': id_finca,
+            'hasta_anio': hasta_anio,
+            'generado': datetime.now().isoformat(timespec='seconds'),
+            'anios': [],
+            'tablas': {}
+        }
+        anios = set()
+        cursor = conexion.cursor()
+        for tabla, (sql, esquema) in SnapshotsAnaliticos.TABLAS.items():
+            cursor.execute(sql.format(filtro=filtro), parametros)
+            nombres = [d[0] for d in cursor.description]
+            # Las categorías se internan a nivel de finca, compartidas por
+            # todos los años, para poder concatenar códigos sin re-mapear.
+            indices = {c: {} for c, t in esquema.items() if t == 'cat'}
+            bloques = {c: [] for c in esquema}
+            bloques['anio'] = []
+            while True:
+                filas = cursor.fetchmany(tamano_bloque)
+                if not filas:
+                    break
+                por_columna = dict(zip(nombres, zip(*filas)))
+                bloques['anio'].append(np.array(por_columna['anio'], dtype=np.int32))
+                for columna, tipo in esquema.items():
+                    bloques[columna].append(SnapshotsAnaliticos._columna(
+                        por_columna[columna], tipo, indices.get(columna)))
+
+            completas = {c: np.concatenate(b) for c, b in bloques.items() if b}
+            anio_filas = completas.get('anio', np.empty(0, np.int32))
+            if tabla == 'siembra':
+                exportadas = completas.get('id_siembra', np.empty(0, np.int64))
+            filas_por_anio = {}
+            for anio in np.unique(anio_filas):
+                mascara = anio_filas == anio
+                destino = carpeta / str(int(anio)) / tabla
+                destino.mkdir(parents=True, exist_ok=True)
+                for columna in esquema:
+                    np.save(destino / f'{columna}.npy', completas[columna][mascara])
+                filas_por_anio[str(int(anio))] = int(mascara.sum())
+                anios.add(int(anio))
+
+            manifest['tablas'][tabla] = {
+                'columnas': {c: ('int32' if t == 'cat' else np.dtype(t).name) for c, t in esquema.items()},
+                'categorias': {c: list(indice.keys()) for c, indice in indices.items()},
+                'filas': filas_por_anio
+            }
+
+        # Siembras de la finca que no entraron al snapshot: se leerán de
+        # MySQL junto con las creadas después (id mayor al último actual)
+        cursor.execute(SQL_IDS_SIEMBRA_FINCA, (id_finca,))
+        existentes = np.array([fila[0] for fila in cursor.fetchall()], dtype=np.int64)
+        cursor.close()
+        pendientes = np.setdiff1d(existentes, exportadas)
+        manifest['ultimo_id_siembra'] = int(max(existentes.max(initial=0), exportadas.max(initial=0)))
+        manifest['siembras_pendientes'] = len(pendientes)
+
+        manifest['anios'] = sorted(anios)
+        carpeta.mkdir(parents=True, exist_ok=True)
+        np.save(carpeta / 'pendientes.npy', pendientes)
+        with open(carpeta / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False, default=str)
+        return manifest
+
+    @staticmethod
+    def exportar(conexion, directorio, id_fincas=None, hasta_anio=None):
+        """Exporta varias fincas (todas si id_fincas es None). Retorna los manifests."""
+        if id_fincas is None:
+            cursor = conexion.cursor()
+            cursor.execute("SELECT id_finca FROM finca ORDER BY id_finca")
+            id_fincas = [fila[0] for fila in cursor.fetchall()]
+            cursor.close()
+        return [SnapshotsAnaliticos.exportar_finca(conexion, directorio, id_finca, hasta_anio)
+                for id_finca in id_fincas]
+
+    # ---------- Lectura ----------
+
+    @staticmethod
+    def no_exportadas(directorio, id_finca, manifest):
+        """
+        Siembras de la finca que no están en el snapshot: (ultimo_id, ids).
+        Son las pendientes al exportar más toda siembra con id > ultimo_id.
+        """
+        ruta = Path(directorio) / f'finca_{id_finca}' / 'pendientes.npy'
+        return manifest['ultimo_id_siembra'], np.load(ruta)
+
+    @staticmethod
+    def filtro_no_exportadas(ultimo_id, ids):
+        """Filtro {filtro} de SQL_HECHOS_SIEMBRA para las siembras fuera del snapshot: (filtro, params)"""
+        en_lista = f" OR s.id_siembra IN ({', '.join(['%s'] * len(ids))})" if len(ids) else ""
+        return f"AND (s.id_siembra > %s{en_lista})", (int(ultimo_id),) + tuple(int(i) for i in ids)
+
+    @staticmethod
+    def manifest(directorio, id_finca):
+        """Lee el manifest de una finca; None si no hay snapshot"""
+        ruta = Path(directorio) / f'finca_{id_finca}' / 'manifest.json'
+        if not ruta.exists():
+            return None
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def cargar(directorio, id_finca, tabla='siembra', anios=None):
+        """
+        Carga una tabla del snapshot como TablaColumnar.
+        Con un solo año las columnas son memory-maps de solo lectura
+        (zero-copy); con varios años se concatenan en memoria.
+        Retorna None si la finca no tiene snapshot.
+        """
+        manifest = SnapshotsAnaliticos.manifest(directorio, id_finca)
+        if manifest is None:
+            return None
+        info = manifest['tablas'][tabla]
+        carpeta = Path(directorio) / f'finca_{id_finca}'
+        categorias = {c: np.array(etiquetas, dtype=object)
+                      for c, etiquetas in info['categorias'].items()}
+
+        anios = [a for a in (anios or manifest['anios']) if info['filas'].get(str(a))]
+        partes = []
+        for anio in anios:
+            destino = carpeta / str(anio) / tabla
+            partes.append({c: np.load(destino / f'{c}.npy', mmap_mode='r') for c in info['columnas']})
+
+        if not partes:
+            columnas = {c: np.empty(0, dtype=tipo) for c, tipo in info['columnas'].items()}
+        elif len(partes) == 1:
+            columnas = partes[0]
+        else:
+            columnas = {c: np.concatenate([p[c] for p in partes]) for c in info['columnas']}
+        return TablaColumnar(columnas, categorias)
@@ -0,0 +1,69 @@
+# Ejecuta los micro-benchmarks de modulos.algoritmos y guarda el reporte JSON
+# Ejecuta: .\.venv\Scripts\python AgroData\scripts\benchmark_algoritmos.py --tamanos 100 1000 10000 --salida bench.json
+
+import argparse
+import sys
+from pathlib import Path
+
+# Asegurar importación del paquete modulos
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from modulos.benchmark import Benchmark  # noqa
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks de algoritmos de AgroData')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=list(Benchmark.TAMANOS_DEFECTO),
+                        help='Tamaños de dataset (número de siembras)')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--calentamiento', type=int, default=1)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--algoritmos', nargs='*', default=None,
+                        help='Subconjunto de casos a medir (por defecto todos)')
+    parser.add_argument('--memoria', action='store_true',
+                        help='Incluir el uso de memoria de las estructuras de datos (10^5 elementos)')
+    parser.add_argument('--arbol', action='store_true',
+                        help='Incluir altura y tiempos del árbol AVL de cultivos (10^5 claves)')
+    parser.add_argument('--alertas', action='store_true',
+                        help='Incluir el costo de generar alertas con 10^5 siembras activas')
+    parser.add_argument('--regresion', action='store_true',
+                        help='Incluir ajuste de 1000 tendencias: bucle vs regresión por lotes')
+    parser.add_argument('--proyeccion', action='store_true',
+                        help='Incluir proyección de 500 horizontes: ajuste por día vs ajuste único cacheado')
+    parser.add_argument('--lagrange', action='store_true',
+                        help='Incluir Lagrange clásica vs baricéntrica (tiempo y error, n hasta 200)')
+    parser.add_argument('--salida', default=None, help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    def progreso(r):
+        print(f"{r['algoritmo']:<20} n={r['n']:<8} mediana={r['mediana_ns'] / 1e6:10.3f} ms "
+              f"p95={r['p95_ns'] / 1e6:10.3f} ms  std={r['desviacion_ns'] / 1e6:8.3f} ms",
+              file=sys.stderr)
+
+    reporte = Benchmark.ejecutar(
+        tamanos=args.tamanos,
+        repeticiones=args.repeticiones,
+        calentamiento=args.calentamiento,
+        semilla=args.semilla,
+        algoritmos=args.algoritmos,
+        progreso=progreso,
+    )
+    if args.memoria:
+        reporte['memoria'] = [Benchmark.memoria_lista_enlazada(semilla=args.semilla),
+                              Benchmark.memoria_tabla_columnar(semilla=args.semilla)]
+    if args.arbol:
+        reporte['arbol'] = Benchmark.arbol_cultivos(semilla=args.semilla)
+    if args.alertas:
+        reporte['alertas'] = Benchmark.alertas(semilla=args.semilla)
+    if args.regresion:
+        reporte['regresion'] = Benchmark.regresion(semilla=args.semilla)
+    if args.proyeccion:
+        reporte['proyeccion'] = Benchmark.proyeccion(semilla=args.semilla)
+    if args.lagrange:
+        reporte['lagrange'] = Benchmark.lagrange()
+    texto = Benchmark.a_json(reporte, args.salida)
+    if not args.salida:
+        print(texto)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ from pathlib import Path
 # Asegurar importación del módulo de configuración
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 from config import Config  # noqa
+from modulos.consultas import SQL_INCREMENTAR_VERSION_FINCA, SQL_INVALIDAR_ALERTAS_FINCA  # noqa
 
 def main():
     if len(sys.argv) < 4:
@@ -44,7 +45,13 @@ def main():
     # Asignar finca 1 al nuevo usuario (reasigna si ya estaba con otro)
     cur.execute("SELECT id_finca FROM finca WHERE id_finca=1")
     if cur.fetchone():
+        # Cambian los datos del dueño anterior y del nuevo (estadísticas cacheadas
+        # y alertas materializadas)
+        cur.execute(SQL_INCREMENTAR_VERSION_FINCA, (1,))
+        cur.execute(SQL_INVALIDAR_ALERTAS_FINCA, (1,))
         cur.execute("UPDATE finca SET user_id=%s WHERE id_finca=1", (user_id,))
+        cur.execute(SQL_INCREMENTAR_VERSION_FINCA, (1,))
+        cur.execute(SQL_INVALIDAR_ALERTAS_FINCA, (1,))
         cnx.commit()
         print("Finca 1 asignada al usuario.")
     else:
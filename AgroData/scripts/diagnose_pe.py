@@ -1,14 +1,239 @@
-# Diagnóstico de Punto de Equilibrio
-# Ejecuta: .\.venv\Scripts\python AgroData\scripts\diagnose_pe.py
+# Diagnóstico de consultas: perfila con EXPLAIN ANALYZE cada consulta de la app y los reportes
+# Ejecuta: .\.venv\Scripts\python AgroData\scripts\diagnose_pe.py [--usuario 1] [--repeticiones 5] [--json diagnostico.json]
 
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
 import mysql.connector
-from AgroData.config import Config
+from datetime import date
+from pathlib import Path
+
+# Asegurar importación del módulo AgroData
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from config import Config  # noqa
+from modulos.algoritmos import Algoritmos  # noqa
+from modulos.consultas import (  # noqa
+    FILTRO_SIEMBRAS_ACTIVAS,
+    SQL_ALERTAS_COSECHA,
+    SQL_ALERTAS_MATERIALIZADAS,
+    SQL_CORRELACION_INSUMO,
+    SQL_COSTO_FIJO,
+    SQL_COSTO_VARIABLE,
+    SQL_HECHOS_APLICACION,
+    SQL_HECHOS_COSECHA,
+    SQL_HECHOS_SIEMBRA,
+    SQL_HISTORICO_PROYECCION,
+    SQL_IDS_SIEMBRA_FINCA,
+    SQL_LISTAR_COSECHAS,
+    SQL_LISTAR_INSUMOS,
+    SQL_LISTAR_LOTES,
+    SQL_LISTAR_SIEMBRAS,
+    SQL_LOTES_ACTIVOS,
+    SQL_PRECIO_PROMEDIO,
+    SQL_RANKING_LOTES,
+    SQL_RENDIMIENTO_CULTIVOS,
+    SQL_RENDIMIENTO_POR_CULTIVO,
+    SQL_RESUMEN_DASHBOARD,
+    SQL_SIEMBRA_CERRADA,
+    SQL_SIEMBRAS_SIN_COSECHA,
+    SQL_VERSION_DATOS,
+)
+from modulos.snapshots import SnapshotsAnaliticos  # noqa
+
+SQL_MAYOR_USUARIO = """
+    SELECT f.user_id, COUNT(*) as siembras
+    FROM siembra s
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE f.user_id IS NOT NULL
+    GROUP BY f.user_id
+    ORDER BY siembras DESC
+    LIMIT 1
+"""
+
+# Finca del usuario con más siembras (historial y snapshots)
+SQL_MAYOR_FINCA = """
+    SELECT l.id_finca, COUNT(*) as siembras, MAX(s.id_siembra) as ultima
+    FROM siembra s
+    JOIN lote l ON s.id_lote = l.id_lote
+    JOIN finca f ON l.id_finca = f.id_finca
+    WHERE f.user_id = %s AND s.area_sembrada > 0
+    GROUP BY l.id_finca
+    ORDER BY siembras DESC
+    LIMIT 1
+"""
+
+# Siembras que un snapshot al corte dejaría fuera (como exportar_finca)
+SQL_NO_CERRADAS_FINCA = SQL_IDS_SIEMBRA_FINCA.rstrip() + " AND NOT " + SQL_SIEMBRA_CERRADA
+
+# Nodo de acceso a tabla del plan de EXPLAIN ANALYZE (MySQL 8.0.18+)
+RE_ACCESO = re.compile(r'-> (?P<operacion>[\w -]*?(?:scan|lookup)) on (?P<tabla>\S+)(?: using (?P<indice>\S+))?',
+                       re.IGNORECASE)
+RE_REAL = re.compile(r'\(actual time=[\d.]+\.\.(?P<tiempo>[\d.]+) rows=(?P<filas>[\d.e+]+) loops=(?P<loops>\d+)\)')
+
+
+def datos_finca(cur, user_id):
+    """
+    Finca más grande del usuario con los parámetros reales de sus snapshots:
+    corte (1 de enero del año actual) y siembras que quedarían en vivo.
+    None si el usuario no tiene siembras.
+    """
+    cur.execute(SQL_MAYOR_FINCA, (user_id,))
+    fila = cur.fetchone()
+    if not fila:
+        return None
+    id_finca, _, ultima = fila
+    corte = date(date.today().year, 1, 1)
+    cur.execute(SQL_NO_CERRADAS_FINCA, (id_finca, corte, corte))
+    pendientes = [f[0] for f in cur.fetchall()]
+    return {'id_finca': id_finca, 'corte': corte, 'ultimo_id': ultima, 'pendientes': pendientes}
+
+
+def consultas(user_id, finca=None):
+    """
+    (nombre, sql, parámetros) de cada consulta que ejecutan app.py,
+    EstadisticasAgricolas y los snapshots.
+    finca: resultado de datos_finca (historial y exportación de snapshots)
+    """
+    u = (user_id,)
+    filtro = "AND f.user_id = %s"
+    lista = [
+        ('dashboard.resumen', SQL_RESUMEN_DASHBOARD, u),
+        ('dashboard.alertas_materializadas', SQL_ALERTAS_MATERIALIZADAS, u),
+        ('dashboard.alertas_cosecha', SQL_ALERTAS_COSECHA, u),
+        ('dashboard.rendimiento_por_cultivo', SQL_RENDIMIENTO_POR_CULTIVO.format(filtro=filtro), u),
+        ('siembras.listar', SQL_LISTAR_SIEMBRAS, u),
+        ('siembras.lotes_activos', SQL_LOTES_ACTIVOS, u),
+        ('siembras.cultivos', "SELECT * FROM cultivo", ()),
+        ('siembras.buscar', """
+        SELECT s.* FROM siembra s
+        JOIN lote l ON s.id_lote = l.id_lote
+        JOIN finca f ON l.id_finca = f.id_finca
+        WHERE f.user_id = %s
+        """, u),
+        ('cosechas.listar', SQL_LISTAR_COSECHAS, u),
+        ('cosechas.siembras_sin_cosecha', SQL_SIEMBRAS_SIN_COSECHA, u),
+        ('insumos.listar', SQL_LISTAR_INSUMOS, u),
+        ('lotes.listar', SQL_LISTAR_LOTES, u),
+        ('fincas.listar', "SELECT * FROM finca WHERE user_id = %s ORDER BY nombre", u),
+    ]
+    lista += [(f'reportes.ranking_{criterio}', SQL_RANKING_LOTES.format(criterio=criterio), (user_id, 5))
+              for criterio in Algoritmos.CRITERIOS_RANKING]
+    lista += [
+        ('reportes.historico_proyeccion', SQL_HISTORICO_PROYECCION, u),
+        ('reportes.costo_fijo', SQL_COSTO_FIJO, u),
+        ('reportes.costo_variable', SQL_COSTO_VARIABLE, u),
+        ('reportes.precio_promedio', SQL_PRECIO_PROMEDIO, u),
+        ('estadisticas.correlacion_insumo', SQL_CORRELACION_INSUMO.format(filtro=filtro), u),
+        # Validación de los cachés (estadísticas, /reportes y pronóstico) en cada vista
+        ('estadisticas.version_datos', SQL_VERSION_DATOS, u),
+        ('estadisticas.hechos_siembra', SQL_HECHOS_SIEMBRA.format(filtro=filtro), u),
+        ('pronostico.siembras_activas', SQL_HECHOS_SIEMBRA.format(
+            filtro=FILTRO_SIEMBRAS_ACTIVAS + " " + filtro), u),
+        ('demo.rendimiento_cultivos', SQL_RENDIMIENTO_CULTIVOS, ()),
+    ]
+    if finca is not None:
+        # historico_siembras: parte en vivo (siembras fuera del snapshot)
+        filtro_vivo, params_vivo = SnapshotsAnaliticos.filtro_no_exportadas(finca['ultimo_id'], finca['pendientes'])
+        lista.append(('estadisticas.historico_en_vivo',
+                      SQL_HECHOS_SIEMBRA.format(filtro="AND f.id_finca = %s " + filtro_vivo),
+                      (finca['id_finca'],) + params_vivo))
+        # exportar_finca: siembras cerradas al corte de cada tabla de hechos
+        filtro_cerradas = "AND f.id_finca = %s AND " + SQL_SIEMBRA_CERRADA
+        params_cerradas = (finca['id_finca'], finca['corte'], finca['corte'])
+        for tabla, sql in (('siembra', SQL_HECHOS_SIEMBRA), ('cosecha', SQL_HECHOS_COSECHA),
+                           ('aplicacion', SQL_HECHOS_APLICACION)):
+            lista.append((f'snapshots.hechos_{tabla}', sql.format(filtro=filtro_cerradas), params_cerradas))
+        lista.append(('snapshots.ids_siembra', SQL_IDS_SIEMBRA_FINCA, (finca['id_finca'],)))
+    return lista
+
+
+def analizar_plan(texto):
+    """Filas examinadas, índices usados y scans completos a partir del árbol de EXPLAIN ANALYZE"""
+    examinadas, indices, scans = 0, set(), set()
+    for linea in texto.splitlines():
+        acceso = RE_ACCESO.search(linea)
+        real = RE_REAL.search(linea)
+        if not acceso or acceso.group('tabla').startswith('<'):
+            continue
+        if real:
+            examinadas += float(real.group('filas')) * int(real.group('loops'))
+        if acceso.group('indice'):
+            indices.add(f"{acceso.group('tabla')}.{acceso.group('indice')}")
+        elif acceso.group('operacion').lower() == 'table scan':
+            scans.add(acceso.group('tabla'))
+    return int(examinadas), sorted(indices), sorted(scans)
+
+
+def explicar(cur, sql, params):
+    """
+    Plan de la consulta: EXPLAIN ANALYZE (filas reales) y, si el servidor
+    no lo soporta, EXPLAIN tradicional (filas estimadas).
+    """
+    try:
+        cur.execute("EXPLAIN ANALYZE " + sql, params)
+        texto = "\n".join(fila[0] for fila in cur.fetchall())
+        examinadas, indices, scans = analizar_plan(texto)
+        return {'fuente': 'EXPLAIN ANALYZE', 'plan': texto, 'filas_examinadas': examinadas,
+                'indices': indices, 'scans_completos': scans}
+    except mysql.connector.Error:
+        cur.execute("EXPLAIN " + sql, params)
+        columnas = [d[0] for d in cur.description]
+        filas = [dict(zip(columnas, fila)) for fila in cur.fetchall()]
+        texto = "\n".join(f"{f.get('table')}: type={f.get('type')} key={f.get('key')} rows={f.get('rows')}"
+                          for f in filas)
+        return {
+            'fuente': 'EXPLAIN (estimado)',
+            'plan': texto,
+            'filas_examinadas': int(sum(float(f.get('rows') or 0) for f in filas)),
+            'indices': sorted({f"{f['table']}.{f['key']}" for f in filas if f.get('key')}),
+            'scans_completos': sorted({f['table'] for f in filas if f.get('type') == 'ALL'}),
+        }
+
+
+def perfilar(cur, nombre, sql, params, repeticiones):
+    """Tiempo de pared (ms) en varias repeticiones + análisis del plan"""
+    tiempos, devueltas = [], 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        cur.execute(sql, params)
+        devueltas = len(cur.fetchall())
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    resultado = {
+        'consulta': nombre,
+        'mediana_ms': statistics.median(tiempos),
+        'min_ms': min(tiempos),
+        'max_ms': max(tiempos),
+        'filas_devueltas': devueltas,
+    }
+    resultado.update(explicar(cur, sql, params))
+    resultado['examinadas_por_devuelta'] = resultado['filas_examinadas'] / max(devueltas, 1)
+    return resultado
+
+
+def imprimir_tabla(resultados):
+    print(f"{'consulta':<36} {'mediana':>9} {'min':>9} {'max':>9} {'devueltas':>10} "
+          f"{'examinadas':>11} {'exam/dev':>9}  scans completos / índices")
+    for r in resultados:
+        detalle = ', '.join(r['scans_completos']) or '-'
+        print(f"{r['consulta']:<36} {r['mediana_ms']:9.2f} {r['min_ms']:9.2f} {r['max_ms']:9.2f} "
+              f"{r['filas_devueltas']:>10} {r['filas_examinadas']:>11} {r['examinadas_por_devuelta']:9.1f}  "
+              f"{detalle} / {', '.join(r['indices']) or '-'}")
 
-def q1(cur, sql):
-    cur.execute(sql)
-    return cur.fetchone()
 
 def main():
+    parser = argparse.ArgumentParser(description='Perfila las consultas de la app con EXPLAIN ANALYZE')
+    parser.add_argument('--usuario', type=int, default=None,
+                        help='Usuario a perfilar (por defecto el de más siembras)')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--planes', type=int, default=3, help='Planes completos a mostrar (los más lentos)')
+    parser.add_argument('--filtro', default=None, help='Solo consultas cuyo nombre contenga este texto')
+    parser.add_argument('--json', default=None, help='Archivo JSON de salida')
+    args = parser.parse_args()
+
     cnx = mysql.connector.connect(
         host=Config.MYSQL_HOST,
         user=Config.MYSQL_USER,
@@ -17,27 +242,42 @@ def main():
     )
     cur = cnx.cursor()
 
-    costo_fijo = q1(cur, "SELECT AVG(s.costo_siembra) FROM siembra s")[0]
-    costo_apps, kg_totales = q1(cur, (
-        "SELECT COALESCE(SUM(ai.costo_aplicacion),0), COALESCE(SUM(co.cantidad_kg),0) "
-        "FROM siembra s LEFT JOIN aplicacion_insumo ai ON ai.id_siembra=s.id_siembra "
-        "LEFT JOIN cosecha co ON co.id_siembra=s.id_siembra"
-    ))
-    precio_prom = q1(cur, "SELECT AVG(precio_venta_kg) FROM cosecha WHERE precio_venta_kg>0")[0]
-
-    costo_variable = None
-    if kg_totales and float(kg_totales) > 0:
-        costo_variable = float(costo_apps)/float(kg_totales)
-
-    print({
-        'costo_fijo_avg': float(costo_fijo) if costo_fijo is not None else None,
-        'costo_apps_sum': float(costo_apps or 0),
-        'kg_totales_sum': float(kg_totales or 0),
-        'costo_variable_por_kg': costo_variable,
-        'precio_prom_kg': float(precio_prom) if precio_prom is not None else None,
-    })
+    user_id = args.usuario
+    if user_id is None:
+        cur.execute(SQL_MAYOR_USUARIO)
+        fila = cur.fetchone()
+        if not fila:
+            print("No hay usuarios con siembras para perfilar.")
+            cur.close(); cnx.close()
+            return
+        user_id = fila[0]
+        print(f"Perfilando al usuario {user_id} ({fila[1]} siembras)")
+
+    finca = datos_finca(cur, user_id)
+    if finca is not None:
+        print(f"Historial y snapshots de la finca {finca['id_finca']} "
+              f"({len(finca['pendientes'])} siembras en vivo al corte {finca['corte']})")
 
+    resultados = []
+    for nombre, sql, params in consultas(user_id, finca):
+        if args.filtro and args.filtro not in nombre:
+            continue
+        try:
+            resultados.append(perfilar(cur, nombre, sql, params, args.repeticiones))
+        except mysql.connector.Error as err:
+            print(f"{nombre}: error {err}")
     cur.close(); cnx.close()
 
+    resultados.sort(key=lambda r: r['mediana_ms'], reverse=True)
+    imprimir_tabla(resultados)
+    for r in resultados[:args.planes]:
+        print(f"\n=== {r['consulta']} ({r['mediana_ms']:.2f} ms, {r['fuente']}) ===\n{r['plan']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'usuario': user_id, 'repeticiones': args.repeticiones, 'consultas': resultados},
+                      f, indent=2, ensure_ascii=False)
+
+
 if __name__ == '__main__':
     main()
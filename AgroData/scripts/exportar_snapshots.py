@@ -0,0 +1,43 @@
+# Exporta snapshots columnares (.npy + manifest) de las temporadas cerradas por finca
+# Ejecuta: .\.venv\Scripts\python AgroData\scripts\exportar_snapshots.py --directorio snapshots [--finca 1] [--hasta-anio 2024]
+
+import argparse
+import sys
+import time
+import mysql.connector
+from pathlib import Path
+
+# Asegurar importación del módulo AgroData
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from config import Config  # noqa
+from modulos.snapshots import SnapshotsAnaliticos  # noqa
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exporta snapshots analíticos por finca')
+    parser.add_argument('--directorio', default=str(Path(__file__).resolve().parents[1] / 'snapshots'))
+    parser.add_argument('--finca', type=int, nargs='*', default=None,
+                        help='Fincas a exportar (por defecto todas)')
+    parser.add_argument('--hasta-anio', type=int, default=None,
+                        help='Último año cerrado a incluir (por defecto el año anterior)')
+    args = parser.parse_args()
+
+    cnx = mysql.connector.connect(
+        host=Config.MYSQL_HOST,
+        user=Config.MYSQL_USER,
+        password=Config.MYSQL_PASSWORD,
+        database=Config.MYSQL_DB,
+    )
+    inicio = time.perf_counter()
+    manifests = SnapshotsAnaliticos.exportar(cnx, args.directorio, args.finca, args.hasta_anio)
+    cnx.close()
+
+    for m in manifests:
+        filas = {t: sum(info['filas'].values()) for t, info in m['tablas'].items()}
+        print(f"Finca {m['id_finca']}: años {m['anios']} -> {filas}, "
+              f"{m['siembras_pendientes']} siembras se leen de MySQL")
+    print(f"Snapshots escritos en {args.directorio} en {time.perf_counter() - inicio:.2f} s.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# Genera y carga datos sintéticos a escala (usuarios, fincas, lotes, siembras, cosechas, aplicaciones)
+# Ejecuta: .\.venv\Scripts\python AgroData\scripts\generar_datos.py --usuarios 10000 [--semilla 42] [--infile]
+
+import argparse
+import sys
+import time
+import mysql.connector
+from pathlib import Path
+from passlib.hash import pbkdf2_sha256
+
+# Asegurar importación del módulo AgroData
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from config import Config  # noqa
+from modulos.cargador_sql import CargadorSQL  # noqa
+from modulos.consultas import SQL_INCREMENTAR_VERSION_USUARIO  # noqa
+from modulos.generador_datos import GeneradorDatos  # noqa
+
+LLAVES = {
+    'usuario': 'id_usuario', 'finca': 'id_finca', 'lote': 'id_lote', 'insumo': 'id_insumo',
+    'siembra': 'id_siembra', 'cosecha': 'id_cosecha', 'aplicacion_insumo': 'id_aplicacion',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generador de datos sintéticos para pruebas de carga')
+    parser.add_argument('--usuarios', type=int, default=1000)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--bloque', type=int, default=1000,
+                        help=f'Usuarios cargados por transacción (múltiplo de {GeneradorDatos.SUBBLOQUE}; '
+                             'no cambia los datos generados)')
+    parser.add_argument('--fincas', type=float, default=2, help='Fincas promedio por usuario')
+    parser.add_argument('--lotes', type=float, default=4, help='Lotes promedio por finca')
+    parser.add_argument('--siembras', type=float, default=6, help='Siembras promedio por lote')
+    parser.add_argument('--aplicaciones', type=float, default=2, help='Aplicaciones promedio por siembra')
+    parser.add_argument('--anios', type=int, default=3, help='Años de historial')
+    parser.add_argument('--password', default='agro123', help='Contraseña de todos los usuarios generados')
+    parser.add_argument('--infile', action='store_true',
+                        help='Cargar con LOAD DATA LOCAL INFILE (requiere local_infile en el servidor)')
+    parser.add_argument('--sin-cargar', action='store_true', help='Solo generar (mide el generador)')
+    args = parser.parse_args()
+
+    cnx = mysql.connector.connect(
+        host=Config.MYSQL_HOST,
+        user=Config.MYSQL_USER,
+        password=Config.MYSQL_PASSWORD,
+        database=Config.MYSQL_DB,
+        allow_local_infile=args.infile,
+    )
+    cur = cnx.cursor(dictionary=True)
+    cur.execute("""
+        SELECT id_cultivo, dias_cosecha_estimado, rendimiento_esperado_kg_ha, precio_referencia_kg
+        FROM cultivo
+    """)
+    cultivos = cur.fetchall()
+    # Los ids continúan después de los existentes para enlazar llaves sin LAST_INSERT_ID
+    ids_iniciales = {}
+    for tabla, llave in LLAVES.items():
+        cur.execute(f"SELECT COALESCE(MAX({llave}), 0) + 1 AS siguiente FROM {tabla}")
+        ids_iniciales[tabla] = cur.fetchone()['siguiente']
+    cur.execute("SET FOREIGN_KEY_CHECKS = 0, UNIQUE_CHECKS = 0")
+    cur.close()
+
+    generador = GeneradorDatos(
+        cultivos,
+        semilla=args.semilla,
+        fincas_por_usuario=args.fincas,
+        lotes_por_finca=args.lotes,
+        siembras_por_lote=args.siembras,
+        aplicaciones_por_siembra=args.aplicaciones,
+        anios=args.anios,
+        password_hash=pbkdf2_sha256.hash(args.password),
+        ids_iniciales=ids_iniciales,
+    )
+    cargador = CargadorSQL(cnx)
+
+    inicio = time.perf_counter()
+    totales = {tabla: 0 for tabla in GeneradorDatos.TABLAS}
+    usuarios = 0
+    try:
+        for datos in generador.bloques(args.usuarios, args.bloque):
+            for tabla in GeneradorDatos.TABLAS:
+                filas = GeneradorDatos.filas(datos, tabla)
+                if args.sin_cargar:
+                    totales[tabla] += sum(1 for _ in filas)
+                else:
+                    totales[tabla] += cargador.cargar_filas(
+                        tabla, GeneradorDatos.COLUMNAS[tabla], filas, infile=args.infile)
+            if not args.sin_cargar:
+                # Versión de los datos de los usuarios nuevos (estadísticas cacheadas globales)
+                cur = cnx.cursor()
+                cur.executemany(SQL_INCREMENTAR_VERSION_USUARIO,
+                                [(int(u),) for u in datos['usuario']['id_usuario']])
+                cur.close()
+            cnx.commit()
+            usuarios += len(datos['usuario']['id_usuario'])
+            duracion = time.perf_counter() - inicio
+            print(f"\r  {usuarios}/{args.usuarios} usuarios, {sum(totales.values())} filas, "
+                  f"{sum(totales.values()) / duracion:.0f} filas/s", end='', flush=True)
+    except mysql.connector.Error as err:
+        cnx.rollback()
+        print(f"\nError cargando datos: {err}")
+        return
+    finally:
+        cur = cnx.cursor()
+        cur.execute("SET FOREIGN_KEY_CHECKS = 1, UNIQUE_CHECKS = 1")
+        cur.close(); cnx.close()
+
+    duracion = time.perf_counter() - inicio
+    print()
+    for tabla, total in totales.items():
+        print(f"{tabla:<20} {total:>12}")
+    print(f"{sum(totales.values())} filas en {duracion:.2f} s. "
+          f"Ejecuta refrescar_alertas.py para materializar las alertas de los nuevos usuarios.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+# Alta masiva de usuarios y asignación de fincas desde un CSV
+# Ejecuta: .\.venv\Scripts\python AgroData\scripts\provisionar_usuarios.py usuarios.csv [--procesos 4] [--dry-run]
+# CSV (con encabezado): nombre,email,password,fincas   (fincas: ids separados por ';', opcional)
+
+import argparse
+import csv
+import os
+import sys
+import time
+import mysql.connector
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from passlib.hash import pbkdf2_sha256
+from pathlib import Path
+
+# Asegurar importación del módulo AgroData
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from config import Config  # noqa
+from modulos.consultas import SQL_INCREMENTAR_VERSION_USUARIO, SQL_INVALIDAR_ALERTAS_USUARIO  # noqa
+from modulos.contrasenas import _contexto  # noqa
+
+
+def hashear(password, rondas):
+    # Función de módulo para poder enviarse a los procesos del pool. Usa el
+    # mismo contexto que el login para no forzar un re-hash en el primer acceso
+    return _contexto(rondas).hash(password)
+
+
+def leer_csv(ruta):
+    """Filas válidas del CSV (email normalizado, sin duplicados) y lista de errores"""
+    usuarios, errores, vistos = [], [], set()
+    with open(ruta, newline='', encoding='utf-8-sig') as f:
+        for linea, fila in enumerate(csv.DictReader(f), start=2):
+            email = (fila.get('email') or '').strip().lower()
+            password = fila.get('password') or ''
+            if not email or not password:
+                errores.append(f"línea {linea}: email y password son obligatorios")
+                continue
+            if email in vistos:
+                errores.append(f"línea {linea}: email repetido {email}")
+                continue
+            try:
+                fincas = [int(x) for x in (fila.get('fincas') or '').replace(',', ';').split(';') if x.strip()]
+            except ValueError:
+                errores.append(f"línea {linea}: fincas inválidas '{fila.get('fincas')}'")
+                continue
+            vistos.add(email)
+            usuarios.append({'nombre': (fila.get('nombre') or '').strip(), 'email': email,
+                             'password': password, 'fincas': fincas})
+    return usuarios, errores
+
+
+def en_bloques(valores, tamano):
+    for i in range(0, len(valores), tamano):
+        yield valores[i:i + tamano]
+
+
+def consultar_ids(cur, sql, valores, tamano=1000):
+    """Ejecuta sql (con {marcadores}) por bloques de valores para IN (...); retorna {clave: valor}"""
+    resultado = {}
+    for bloque in en_bloques(list(valores), tamano):
+        cur.execute(sql.format(marcadores=', '.join(['%s'] * len(bloque))), tuple(bloque))
+        resultado.update({clave: valor for clave, valor in cur.fetchall()})
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Alta masiva de usuarios y asignación de fincas')
+    parser.add_argument('csv', help='Archivo CSV con nombre,email,password,fincas')
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1,
+                        help='Procesos para hashear contraseñas')
+    parser.add_argument('--lote', type=int, default=500, help='Filas por executemany')
+    parser.add_argument('--dry-run', action='store_true', help='Validar y hashear sin confirmar cambios')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    usuarios, errores = leer_csv(args.csv)
+    for error in errores:
+        print(f"Omitido: {error}")
+
+    cnx = mysql.connector.connect(
+        host=Config.MYSQL_HOST,
+        user=Config.MYSQL_USER,
+        password=Config.MYSQL_PASSWORD,
+        database=Config.MYSQL_DB,
+        autocommit=False,
+    )
+    cur = cnx.cursor()
+
+    # Usuarios ya registrados (no se re-crean, pero sí reciben sus fincas)
+    existentes = consultar_ids(cur, "SELECT email, id_usuario FROM usuario WHERE email IN ({marcadores})",
+                               [u['email'] for u in usuarios])
+    nuevos = [u for u in usuarios if u['email'] not in existentes]
+
+    # Validar fincas: deben existir y no repetirse entre usuarios del CSV. Una
+    # finca reclamada por varios usuarios no se asigna a ninguno (el orden de
+    # las filas no decide el dueño)
+    reclamos = {}
+    for u in usuarios:
+        for id_finca in u['fincas']:
+            reclamos.setdefault(id_finca, {})[u['email']] = None  # dict: orden de aparición
+    conflictos = {id_finca: list(emails) for id_finca, emails in reclamos.items() if len(emails) > 1}
+    for id_finca, emails in sorted(conflictos.items()):
+        print(f"Omitido: finca {id_finca} asignada a {', '.join(emails)}")
+    duenos_csv = {id_finca: next(iter(emails)) for id_finca, emails in reclamos.items()
+                  if id_finca not in conflictos}
+    duenos_actuales = consultar_ids(cur, "SELECT id_finca, user_id FROM finca WHERE id_finca IN ({marcadores})",
+                                    duenos_csv)
+    for id_finca in sorted(set(duenos_csv) - set(duenos_actuales)):
+        print(f"Omitido: la finca {id_finca} no existe")
+
+    # Hashear en paralelo (pbkdf2 es CPU puro: un proceso por núcleo)
+    inicio_hash = time.perf_counter()
+    passwords = [u['password'] for u in nuevos]
+    rondas = getattr(Config, 'HASH_RONDAS', None) or pbkdf2_sha256.default_rounds
+    if args.procesos > 1 and len(passwords) > 1:
+        with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+            hashes = list(pool.map(hashear, passwords, repeat(rondas),
+                                   chunksize=max(1, len(passwords) // (args.procesos * 4))))
+    else:
+        hashes = [hashear(p, rondas) for p in passwords]
+    duracion_hash = time.perf_counter() - inicio_hash
+
+    try:
+        # Todo en una sola transacción: usuarios, asignaciones y alertas invalidadas
+        filas = [(u['email'], h, u['nombre']) for u, h in zip(nuevos, hashes)]
+        for bloque in en_bloques(filas, args.lote):
+            cur.executemany("INSERT INTO usuario (email, password_hash, nombre) VALUES (%s, %s, %s)", bloque)
+        ids = dict(existentes)
+        ids.update(consultar_ids(cur, "SELECT email, id_usuario FROM usuario WHERE email IN ({marcadores})",
+                                 [u['email'] for u in nuevos]))
+
+        asignaciones = [(ids[email], id_finca) for id_finca, email in duenos_csv.items()
+                        if id_finca in duenos_actuales]
+        for bloque in en_bloques(asignaciones, args.lote):
+            cur.executemany("UPDATE finca SET user_id = %s WHERE id_finca = %s", bloque)
+
+        # Las alertas materializadas y las estadísticas de los dueños anteriores y nuevos quedaron desactualizadas
+        afectados = {(uid,) for uid in duenos_actuales.values() if uid is not None}
+        afectados |= {(uid,) for uid, _ in asignaciones}
+        for bloque in en_bloques(sorted(afectados), args.lote):
+            cur.executemany(SQL_INVALIDAR_ALERTAS_USUARIO, bloque)
+            cur.executemany(SQL_INCREMENTAR_VERSION_USUARIO, bloque)
+
+        if args.dry_run:
+            cnx.rollback()
+        else:
+            cnx.commit()
+    except mysql.connector.Error as err:
+        cnx.rollback()
+        print(f"Error en la carga, no se aplicó ningún cambio: {err}")
+        cur.close(); cnx.close()
+        sys.exit(1)
+
+    cur.close(); cnx.close()
+    duracion = time.perf_counter() - inicio
+    print(f"{'Dry-run: ' if args.dry_run else ''}{len(nuevos)} usuarios creados, {len(existentes)} existentes, "
+          f"{len(asignaciones)} fincas asignadas, {len(errores)} filas omitidas.")
+    if conflictos:
+        print(f"{len(conflictos)} fincas sin asignar por estar en varias filas: "
+              f"{', '.join(str(id_finca) for id_finca in sorted(conflictos))}.")
+    if nuevos:
+        print(f"Hash: {len(nuevos) / duracion_hash:.1f} contraseñas/s con {args.procesos} procesos "
+              f"({duracion_hash:.2f} s). Total: {len(usuarios) / duracion:.1f} usuarios/s ({duracion:.2f} s).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Job diario: pre-calcula las alertas de cosecha de cada usuario en alerta_cosecha
+# Ejecuta: .\.venv\Scripts\python AgroData\scripts\refrescar_alertas.py [--usuario ID]
+# Programar una vez al día (Programador de tareas de Windows / cron)
+
+import argparse
+import sys
+import time
+import mysql.connector
+from pathlib import Path
+
+# Asegurar importación del módulo AgroData
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from config import Config  # noqa
+from modulos.consultas import (  # noqa
+    SQL_CALCULAR_FECHA_COSECHA,
+    SQL_MARCAR_REFRESCO_ALERTAS,
+    SQL_REFRESCAR_ALERTAS,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresca las alertas de cosecha materializadas')
+    parser.add_argument('--usuario', type=int, default=None,
+                        help='Refrescar solo las alertas de este usuario')
+    args = parser.parse_args()
+
+    cnx = mysql.connector.connect(
+        host=Config.MYSQL_HOST,
+        user=Config.MYSQL_USER,
+        password=Config.MYSQL_PASSWORD,
+        database=Config.MYSQL_DB,
+        autocommit=False,
+    )
+    cur = cnx.cursor()
+    inicio = time.perf_counter()
+
+    # Completar fechas estimadas que falten (siembras cargadas por SQL directo)
+    cur.execute(SQL_CALCULAR_FECHA_COSECHA.format(filtro="WHERE s.fecha_cosecha_estimada IS NULL"))
+    completadas = cur.rowcount
+
+    # Reemplazar la lista materializada y marcar a sus usuarios como
+    # refrescados hoy (también los que no tienen alertas) en una sola transacción
+    if args.usuario is None:
+        filtro, params = "", ()
+        cur.execute("DELETE FROM alerta_cosecha")
+    else:
+        filtro, params = "AND f.user_id = %s", (args.usuario,)
+        cur.execute("DELETE FROM alerta_cosecha WHERE user_id = %s", params)
+    cur.execute(SQL_REFRESCAR_ALERTAS.format(filtro=filtro), params)
+    alertas = cur.rowcount
+    cur.execute(SQL_MARCAR_REFRESCO_ALERTAS.format(filtro=filtro), params)
+    cnx.commit()
+
+    cur.close(); cnx.close()
+    print(f"Fechas estimadas completadas: {completadas}. "
+          f"Alertas materializadas: {alertas} en {time.perf_counter() - inicio:.2f} s.")
+
+
+if __name__ == '__main__':
+    main()
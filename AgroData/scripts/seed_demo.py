@@ -1,7 +1,7 @@
 # Script para importar agrodata.sql y seed_demo.sql usando mysql-connector-python
 # Ejecuta: .\.venv\Scripts\python AgroData\scripts\seed_demo.py
 
-import os
+import argparse
 import sys
 import mysql.connector
 from pathlib import Path
@@ -10,40 +10,25 @@ from passlib.hash import pbkdf2_sha256
 # Importar configuración
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 from config import Config  # noqa
+from modulos.cargador_sql import CargadorSQL  # noqa
+from modulos.consultas import (  # noqa
+    SQL_CALCULAR_FECHA_COSECHA, SQL_INCREMENTAR_VERSION_FINCA, SQL_INCREMENTAR_VERSIONES
+)
 
-def run_sql_file(cursor, path):
-    # Carga el archivo SQL, ignora bloques con DELIMITER (procedimientos) y ejecuta resto de sentencias
-    statements = []
-    in_delimiter_block = False
-    with open(path, 'r', encoding='utf-8') as f:
-        for line in f:
-            stripped = line.strip()
-            if stripped.upper().startswith('DELIMITER'):
-                in_delimiter_block = not in_delimiter_block
-                continue
-            if in_delimiter_block:
-                # Omitimos procedimientos/funciones que requieren delimitadores personalizados
-                continue
-            statements.append(line)
-
-    buffer = ''
-    for chunk in ''.join(statements).split(';'):
-        stmt = (buffer + chunk).strip()
-        buffer = ''
-        if not stmt:
-            continue
-        try:
-            cursor.execute(stmt)
-        except mysql.connector.Error as e:
-            # Si falla por fragmentación poco común, acumulamos y reintentamos en la próxima iteración
-            buffer = stmt + ';'
-    if buffer:
-        try:
-            cursor.execute(buffer)
-        except mysql.connector.Error:
-            pass
+
+def cargar(cargador, ruta):
+    # Tokeniza y ejecuta el archivo por lotes (incluye bloques DELIMITER) e imprime el resumen
+    r = cargador.ejecutar_archivo(ruta)
+    print(f"\n  {r['sentencias_origen']} sentencias ({r['sentencias']} enviadas), {r['filas']} filas, "
+          f"{r['errores']} errores en {r['segundos']:.2f} s ({r['sentencias_por_s']:.0f} sentencias/s)")
 
 def main():
+    parser = argparse.ArgumentParser(description='Importa el esquema y los seeds de AgroData')
+    parser.add_argument('--lote', type=int, default=500, help='Sentencias por transacción')
+    parser.add_argument('--continuar-en-error', action='store_true',
+                        help='Reportar las sentencias que fallan y seguir con el resto')
+    args = parser.parse_args()
+
     base_dir = Path(__file__).resolve().parents[1]
     db_dir = base_dir / 'database'
     sql_schema = db_dir / 'agrodata.sql'
@@ -70,21 +55,21 @@ def main():
         password=Config.MYSQL_PASSWORD,
         database=Config.MYSQL_DB,
     )
-    cur = conn.cursor()
+    cargador = CargadorSQL(conn, tamano_lote=args.lote, continuar_en_error=args.continuar_en_error,
+                           progreso=CargadorSQL.imprimir_progreso)
 
     # Ejecutar esquema base y seeds demo
     print(f"Importando esquema: {sql_schema}")
-    run_sql_file(cur, sql_schema)
-    conn.commit()
+    cargar(cargador, sql_schema)
 
     print(f"Importando seeds: {sql_seed}")
-    run_sql_file(cur, sql_seed)
-    conn.commit()
+    cargar(cargador, sql_seed)
 
     if sql_seed_more.exists():
         print(f"Importando seeds extra: {sql_seed_more}")
-        run_sql_file(cur, sql_seed_more)
-        conn.commit()
+        cargar(cargador, sql_seed_more)
+
+    cur = conn.cursor()
 
     # Aplicar migración de autenticación
     # Asegurar esquema de autenticación (compatible con MySQL sin ALTER ... IF NOT EXISTS)
@@ -128,6 +113,64 @@ def main():
         )
         conn.commit()
 
+    # Asegurar esquema de alertas de cosecha (fecha estimada + lista materializada)
+    print("Verificando esquema de alertas de cosecha...")
+    cur.execute(
+        "SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA=%s AND TABLE_NAME='siembra' AND COLUMN_NAME='fecha_cosecha_estimada'",
+        (Config.MYSQL_DB,)
+    )
+    if (cur.fetchone() or [0])[0] == 0:
+        print("Añadiendo columna siembra.fecha_cosecha_estimada ...")
+        cur.execute("ALTER TABLE siembra ADD COLUMN fecha_cosecha_estimada DATE AFTER estado")
+        conn.commit()
+
+    cur.execute(
+        "SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS WHERE TABLE_SCHEMA=%s AND TABLE_NAME='siembra' AND INDEX_NAME='idx_siembra_lote_cosecha_estimada'",
+        (Config.MYSQL_DB,)
+    )
+    if (cur.fetchone() or [0])[0] == 0:
+        print("Añadiendo índice idx_siembra_lote_cosecha_estimada ...")
+        cur.execute("CREATE INDEX idx_siembra_lote_cosecha_estimada ON siembra(id_lote, fecha_cosecha_estimada)")
+        conn.commit()
+
+    cur.execute(SQL_CALCULAR_FECHA_COSECHA.format(filtro="WHERE s.fecha_cosecha_estimada IS NULL"))
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS alerta_cosecha (
+            user_id INT NOT NULL,
+            id_siembra INT NOT NULL,
+            cultivo VARCHAR(100),
+            lote VARCHAR(50),
+            fecha_cosecha_estimada DATE NOT NULL,
+            prioridad TINYINT NOT NULL,
+            fecha_calculo DATE NOT NULL,
+            PRIMARY KEY (user_id, id_siembra),
+            INDEX idx_alerta_usuario_fecha (user_id, fecha_calculo, prioridad),
+            INDEX idx_alerta_siembra (id_siembra),
+            FOREIGN KEY (user_id) REFERENCES usuario(id_usuario) ON DELETE CASCADE,
+            FOREIGN KEY (id_siembra) REFERENCES siembra(id_siembra) ON DELETE CASCADE
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS alerta_cosecha_refresco (
+            user_id INT NOT NULL PRIMARY KEY,
+            fecha_calculo DATE NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES usuario(id_usuario) ON DELETE CASCADE
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS version_datos (
+            user_id INT NOT NULL PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.commit()
+
     # Crear usuario demo si no existe
     print("Creando usuario demo si no existe...")
     cur.execute("SELECT id_usuario FROM usuario WHERE email=%s", ("demo@agrodata.com",))
@@ -148,9 +191,16 @@ def main():
     f = cur.fetchone()
     if f and (f[1] is None or f[1] != user_id):
         print("Asignando finca 1 al usuario demo")
+        cur.execute(SQL_INCREMENTAR_VERSION_FINCA, (1,))  # El dueño anterior pierde la finca
         cur.execute("UPDATE finca SET user_id=%s WHERE id_finca=1", (user_id,))
         conn.commit()
 
+    # Los datos cambiaron por SQL directo: invalidar las estadísticas cacheadas
+    # y las alertas materializadas
+    cur.execute(SQL_INCREMENTAR_VERSIONES)
+    cur.execute("DELETE FROM alerta_cosecha_refresco")
+    conn.commit()
+
     cur.close()
     conn.close()
     print("Importación completada.")
@@ -0,0 +1,62 @@
+# Simulación Monte Carlo del riesgo de las siembras activas (por siembra y por finca)
+# Ejecuta: .\.venv\Scripts\python AgroData\scripts\simular_riesgo.py --escenarios 100000 --procesos 4 [--usuario 1] [--salida riesgo.json]
+
+import argparse
+import json
+import os
+import sys
+import time
+import mysql.connector
+from pathlib import Path
+
+# Asegurar importación del módulo AgroData
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from config import Config  # noqa
+from modulos.estadisticas import EstadisticasAgricolas  # noqa
+from modulos.simulacion import SimulacionRiesgo  # noqa
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulación Monte Carlo de utilidad y riesgo de pérdida')
+    parser.add_argument('--usuario', type=int, default=None,
+                        help='Simular solo las siembras de este usuario (por defecto todas)')
+    parser.add_argument('--escenarios', type=int, default=100000)
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--memoria-mb', type=int, default=64,
+                        help='Memoria aproximada por bloque de siembras')
+    parser.add_argument('--salida', default=None, help='Archivo JSON de salida')
+    args = parser.parse_args()
+
+    cnx = mysql.connector.connect(
+        host=Config.MYSQL_HOST,
+        user=Config.MYSQL_USER,
+        password=Config.MYSQL_PASSWORD,
+        database=Config.MYSQL_DB,
+    )
+    tabla = EstadisticasAgricolas(cnx).tabla_siembras(user_id=args.usuario)
+    cnx.close()
+
+    inicio = time.perf_counter()
+    resultado = SimulacionRiesgo.simular_activas(
+        tabla,
+        escenarios=args.escenarios,
+        semilla=args.semilla,
+        procesos=args.procesos,
+        memoria_max_mb=args.memoria_mb,
+    )
+    duracion = time.perf_counter() - inicio
+
+    for r in resultado['fincas']:
+        print(f"{r['id_finca']:>6} {r['finca']:<25} siembras={r['siembras']:<5} media={r['utilidad_media']:14.2f} "
+              f"p5={r['p5']:14.2f} p95={r['p95']:14.2f} P(pérdida)={r['prob_perdida']:.3f}")
+    print(f"{len(resultado['siembras'])} siembras x {args.escenarios} escenarios "
+          f"en {duracion:.2f} s ({resultado['meta'].get('bloques', 0)} bloques).")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False, default=str)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,104 @@
 # Actualiza fechas a un rango reciente (último año hasta hoy)
-# Ejecuta: .\.venv\Scripts\python AgroData\scripts\update_recent_dates.py
+# Ejecuta: .\.venv\Scripts\python AgroData\scripts\update_recent_dates.py [--dry-run] [--lote 5000]
 
-from datetime import date, timedelta
-import random
-import mysql.connector
+import argparse
 import sys
+import time
+import mysql.connector
+import numpy as np
+from datetime import date
 from pathlib import Path
 
 # Asegurar importación del módulo AgroData
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 from config import Config  # noqa
-
-random.seed(42)
-
-
-def clamp(d, min_d, max_d):
-    if d < min_d:
-        return min_d
-    if d > max_d:
-        return max_d
-    return d
+from modulos.cargador_sql import CargadorSQL  # noqa
+from modulos.consultas import SQL_INCREMENTAR_VERSIONES  # noqa
+
+COLUMNAS_TEMPORAL = ('id_siembra', 'fecha_siembra', 'fecha_cosecha_estimada', 'fecha_cosecha', 'fecha_aplicacion')
+
+SQL_CREAR_TEMPORAL = """
+    CREATE TEMPORARY TABLE tmp_fechas_recientes (
+        id_siembra INT PRIMARY KEY,
+        fecha_siembra DATE NOT NULL,
+        fecha_cosecha_estimada DATE NOT NULL,
+        fecha_cosecha DATE NOT NULL,
+        fecha_aplicacion DATE NOT NULL
+    )
+"""
+
+# Cada UPDATE se aplica por rangos de id_siembra para acotar el tiempo de bloqueo
+SQL_APLICAR = {
+    'siembra': """
+        UPDATE siembra s
+        JOIN tmp_fechas_recientes t ON s.id_siembra = t.id_siembra
+        SET s.fecha_siembra = t.fecha_siembra, s.fecha_cosecha_estimada = t.fecha_cosecha_estimada
+        WHERE t.id_siembra BETWEEN %s AND %s
+    """,
+    'cosecha': """
+        UPDATE cosecha co
+        JOIN tmp_fechas_recientes t ON co.id_siembra = t.id_siembra
+        SET co.fecha_cosecha = t.fecha_cosecha
+        WHERE t.id_siembra BETWEEN %s AND %s
+    """,
+    'aplicacion_insumo': """
+        UPDATE aplicacion_insumo ai
+        JOIN tmp_fechas_recientes t ON ai.id_siembra = t.id_siembra
+        SET ai.fecha_aplicacion = t.fecha_aplicacion
+        WHERE t.id_siembra BETWEEN %s AND %s
+    """,
+}
+
+# Filas que cambiarían (para --dry-run)
+SQL_CONTAR_CAMBIOS = {
+    'siembra': """
+        SELECT COUNT(*) FROM siembra s JOIN tmp_fechas_recientes t ON s.id_siembra = t.id_siembra
+        WHERE NOT (s.fecha_siembra <=> t.fecha_siembra) OR NOT (s.fecha_cosecha_estimada <=> t.fecha_cosecha_estimada)
+    """,
+    'cosecha': """
+        SELECT COUNT(*) FROM cosecha co JOIN tmp_fechas_recientes t ON co.id_siembra = t.id_siembra
+        WHERE NOT (co.fecha_cosecha <=> t.fecha_cosecha)
+    """,
+    'aplicacion_insumo': """
+        SELECT COUNT(*) FROM aplicacion_insumo ai JOIN tmp_fechas_recientes t ON ai.id_siembra = t.id_siembra
+        WHERE NOT (ai.fecha_aplicacion <=> t.fecha_aplicacion)
+    """,
+}
+
+
+def calcular_fechas(ids, dias, hoy, semilla=42):
+    """
+    Nuevas fechas de todas las siembras a la vez (mismo criterio que antes):
+    - siembra: espaciadas a lo largo del último año (entre ~1 y 11 meses atrás)
+    - cosecha: siembra + días estimados del cultivo +/- 15 (mínimo 20 días)
+    - aplicación: siembra + 15 días
+    Todas acotadas a [hoy - 365, hoy - 1].
+    """
+    rng = np.random.default_rng(semilla)
+    n = len(ids)
+    hoy = np.datetime64(hoy, 'D')
+    minimo, maximo = hoy - 365, hoy - 1
+
+    desplazamiento = 30 + (np.arange(n) * 330) // max(1, n)
+    fecha_siembra = np.clip(hoy - desplazamiento, minimo, maximo)
+    delta = np.maximum(20, dias + rng.integers(-15, 16, n))
+    fecha_cosecha = np.clip(fecha_siembra + delta, fecha_siembra + 20, maximo)
+    fecha_aplicacion = np.clip(fecha_siembra + 15, minimo, maximo)
+    return {
+        'id_siembra': ids,
+        'fecha_siembra': fecha_siembra,
+        'fecha_cosecha_estimada': fecha_siembra + dias,
+        'fecha_cosecha': fecha_cosecha,
+        'fecha_aplicacion': fecha_aplicacion,
+    }
 
 
 def main():
-    today = date.today()
-    min_date = today - timedelta(days=365)
-    max_date = today - timedelta(days=1)
+    parser = argparse.ArgumentParser(description='Mueve las fechas de siembras, cosechas y aplicaciones al último año')
+    parser.add_argument('--lote', type=int, default=5000, help='Siembras por rango de UPDATE (y por commit)')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--dry-run', action='store_true', help='Solo reportar lo que cambiaría')
+    args = parser.parse_args()
 
     cnx = mysql.connector.connect(
         host=Config.MYSQL_HOST,
@@ -35,35 +108,59 @@ def main():
         autocommit=False,
     )
     cur = cnx.cursor()
-
-    # Mover siembras al último año, distribuyendo fechas
-    cur.execute("SELECT id_siembra, id_cultivo FROM siembra ORDER BY id_siembra")
-    siembras = cur.fetchall()
-
-    # Mapear cultivo -> dias_cosecha_estimado
-    cur.execute("SELECT id_cultivo, COALESCE(dias_cosecha_estimado,90) FROM cultivo")
-    dias_map = {row[0]: int(row[1]) for row in cur.fetchall()}
-
-    for i, (id_siembra, id_cultivo) in enumerate(siembras):
-        # Espaciar las fechas a lo largo del último año
-        offset_days = 30 + int((i * 330) / max(1, len(siembras)))  # entre ~1 y 11 meses
-        new_siembra = clamp(today - timedelta(days=offset_days), min_date, max_date)
-        cur.execute("UPDATE siembra SET fecha_siembra=%s WHERE id_siembra=%s", (new_siembra, id_siembra))
-
-        # Actualizar cosechas de esa siembra
-        dias_estim = dias_map.get(id_cultivo, 90)
-        # Variación +/- 15 días
-        delta = dias_estim + random.randint(-15, 15)
-        new_cosecha = clamp(new_siembra + timedelta(days=max(20, delta)), new_siembra + timedelta(days=20), max_date)
-        cur.execute("UPDATE cosecha SET fecha_cosecha=%s WHERE id_siembra=%s", (new_cosecha, id_siembra))
-
-        # Actualizar aplicaciones de insumo cercanas a la siembra
-        app_date = clamp(new_siembra + timedelta(days=15), min_date, max_date)
-        cur.execute("UPDATE aplicacion_insumo SET fecha_aplicacion=%s WHERE id_siembra=%s", (app_date, id_siembra))
-
+    inicio = time.perf_counter()
+
+    # Siembras con los días estimados de su cultivo, en una sola consulta
+    cur.execute("""
+        SELECT s.id_siembra, COALESCE(c.dias_cosecha_estimado, 90)
+        FROM siembra s
+        LEFT JOIN cultivo c ON s.id_cultivo = c.id_cultivo
+        ORDER BY s.id_siembra
+    """)
+    filas = cur.fetchall()
+    if not filas:
+        print("No hay siembras para actualizar.")
+        cur.close(); cnx.close()
+        return
+    ids = np.array([f[0] for f in filas], dtype=np.int64)
+    dias = np.array([f[1] for f in filas], dtype=np.int64)
+    fechas = calcular_fechas(ids, dias, date.today(), args.semilla)
+
+    # Tabla temporal con las fechas nuevas (INSERT extendidos por lotes)
+    cur.execute("DROP TEMPORARY TABLE IF EXISTS tmp_fechas_recientes")
+    cur.execute(SQL_CREAR_TEMPORAL)
+    CargadorSQL(cnx).cargar_filas(
+        'tmp_fechas_recientes', COLUMNAS_TEMPORAL,
+        zip(*[fechas[c].tolist() for c in COLUMNAS_TEMPORAL]))
+
+    if args.dry_run:
+        for tabla, sql in SQL_CONTAR_CAMBIOS.items():
+            cur.execute(sql)
+            print(f"{tabla:<20} {cur.fetchone()[0]:>10} filas cambiarían")
+        print(f"Siembras entre {fechas['fecha_siembra'].min()} y {fechas['fecha_siembra'].max()}, "
+              f"cosechas entre {fechas['fecha_cosecha'].min()} y {fechas['fecha_cosecha'].max()}.")
+        cnx.rollback()
+        cur.close(); cnx.close()
+        print("Dry-run: no se modificó ninguna fila.")
+        return
+
+    # Tres UPDATE ... JOIN por rango de ids, con commit por rango
+    totales = {tabla: 0 for tabla in SQL_APLICAR}
+    for desde in range(int(ids[0]), int(ids[-1]) + 1, args.lote):
+        hasta = desde + args.lote - 1
+        for tabla, sql in SQL_APLICAR.items():
+            cur.execute(sql, (desde, hasta))
+            totales[tabla] += cur.rowcount
+        cnx.commit()
+
+    # La lista de alertas materializada y las estadísticas cacheadas quedaron desactualizadas
+    cur.execute("DELETE FROM alerta_cosecha_refresco")
+    cur.execute(SQL_INCREMENTAR_VERSIONES)
+    cur.execute("DROP TEMPORARY TABLE IF EXISTS tmp_fechas_recientes")
     cnx.commit()
     cur.close(); cnx.close()
-    print("Fechas actualizadas al último año.")
+    print(f"Fechas actualizadas al último año en {time.perf_counter() - inicio:.2f} s: "
+          + ", ".join(f"{tabla}={total}" for tabla, total in totales.items()))
 
 
 if __name__ == '__main__':
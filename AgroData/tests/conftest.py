@@ -0,0 +1,7 @@
+# Configuración de pruebas: permite importar `modulos` desde AgroData/
+# Ejecuta: python -m pytest -q   (desde AgroData)
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,187 @@
+# Pruebas de los acumuladores incrementales contra numpy
+
+import math
+
+import numpy as np
+import pytest
+
+from modulos.acumuladores import AcumuladorEstadistico, EstadisticasIncrementales, HistogramaStreaming
+
+
+@pytest.fixture
+def datos():
+    return np.random.default_rng(7).gamma(4.0, 900.0, size=500)
+
+
+def acumular(valores, max_centroides=64):
+    acumulador = AcumuladorEstadistico(max_centroides)
+    for x in valores:
+        acumulador.agregar(x)
+    return acumulador
+
+
+def comparar(resultado, valores):
+    assert resultado['total_siembras'] == len(valores)
+    assert resultado['media'] == pytest.approx(np.mean(valores), rel=1e-12)
+    assert resultado['varianza'] == pytest.approx(np.var(valores, ddof=1), rel=1e-9)
+    assert resultado['desviacion_std'] == pytest.approx(np.std(valores, ddof=1), rel=1e-9)
+
+
+# ---------- AcumuladorEstadistico ----------
+
+def test_agregar_igual_a_numpy(datos):
+    resultado = acumular(datos).resultado()
+    comparar(resultado, datos)
+    assert resultado['minimo'] == datos.min()
+    assert resultado['maximo'] == datos.max()
+    # Mediana aproximada: dentro del rango intercuartílico cercano
+    assert np.quantile(datos, 0.45) <= resultado['mediana'] <= np.quantile(datos, 0.55)
+
+
+def test_mediana_exacta_con_pocos_valores():
+    assert acumular([5, 1, 3]).resultado()['mediana'] == 3
+    assert acumular([4, 1, 3, 2]).resultado()['mediana'] == 2.5
+
+
+def test_vacio_y_un_valor():
+    assert AcumuladorEstadistico().resultado() is None
+    resultado = acumular([42]).resultado()
+    assert resultado['media'] == 42 and math.isnan(resultado['varianza'])
+
+
+def test_combinar_igual_a_un_solo_recorrido(datos):
+    particiones = np.array_split(datos, [50, 51, 300])
+    total = AcumuladorEstadistico()
+    for particion in particiones:
+        total.combinar(acumular(particion))
+    total.combinar(AcumuladorEstadistico())   # Partición vacía
+    resultado = total.resultado()
+    comparar(resultado, datos)
+    assert resultado['minimo'] == datos.min()
+    assert resultado['maximo'] == datos.max()
+    assert total.histograma.total == len(datos)
+
+
+def test_quitar_igual_a_recalcular(datos):
+    acumulador = acumular(datos)
+    quitados = datos[::3]
+    for x in quitados:
+        acumulador.quitar(x)
+    comparar(acumulador.resultado(), np.delete(datos, np.arange(0, len(datos), 3)))
+    assert acumulador.histograma.total == acumulador.n
+
+
+def test_quitar_extremos_actualiza_minimo_y_maximo():
+    acumulador = acumular([1.0, 2.0, 3.0, 4.0])
+    acumulador.quitar(1.0)
+    acumulador.quitar(4.0)
+    resultado = acumulador.resultado()
+    assert (resultado['minimo'], resultado['maximo']) == (2.0, 3.0)
+    comparar(resultado, [2.0, 3.0])
+
+
+def test_quitar_todo_reinicia():
+    acumulador = acumular([1.0, 2.0])
+    acumulador.quitar(1.0)
+    acumulador.quitar(2.0)
+    assert acumulador.resultado() is None
+    acumulador.agregar(7.0)
+    assert acumulador.resultado()['media'] == 7.0
+
+
+def test_reemplazar(datos):
+    acumulador = acumular(datos)
+    esperado = datos.copy()
+    for i in range(0, len(datos), 10):
+        acumulador.reemplazar(datos[i], datos[i] * 1.5)
+        esperado[i] = datos[i] * 1.5
+    comparar(acumulador.resultado(), esperado)
+
+
+# ---------- HistogramaStreaming ----------
+
+def test_histograma_respeta_max_centroides(datos):
+    histograma = HistogramaStreaming(16)
+    for x in datos:
+        histograma.agregar(x)
+    assert len(histograma.valores) <= 16
+    assert sum(histograma.conteos) == histograma.total == len(datos)
+    assert histograma.valores == sorted(histograma.valores)
+
+
+def test_histograma_combinar_y_quitar():
+    a, b = HistogramaStreaming(), HistogramaStreaming()
+    for x in [1, 2, 2, 5]:
+        a.agregar(x)
+    for x in [2, 3, 9]:
+        b.agregar(x)
+    a.combinar(b)
+    assert a.valores == [1, 2, 3, 5, 9]
+    assert a.conteos == [1, 3, 1, 1, 1]
+    assert a.total == 7
+    assert 2 <= a.cuantil(0.5) <= 3
+
+    a.quitar(9)
+    a.quitar(2, conteo=3)
+    assert a.valores == [1, 3, 5]
+    assert a.total == sum(a.conteos) == 3
+    assert HistogramaStreaming().cuantil(0.5) is None
+
+
+# ---------- EstadisticasIncrementales ----------
+
+def filas_siembras(n=300, semilla=3):
+    rng = np.random.default_rng(semilla)
+    return [{'id_siembra': i,
+             'cultivo': ['Maíz', 'Papa', 'Café'][i % 3],
+             'finca': f'Finca {i % 4}',
+             'lote': f'L{i % 5}',
+             'rendimiento': float(rng.normal(3000, 400))}
+            for i in range(n)]
+
+
+def test_registrar_por_grupos():
+    filas = filas_siembras()
+    estadisticas = EstadisticasIncrementales().cargar(filas)
+    comparar(estadisticas.consultar(), [f['rendimiento'] for f in filas])
+    for cultivo, resultado in estadisticas.por_nivel('cultivo').items():
+        comparar(resultado, [f['rendimiento'] for f in filas if f['cultivo'] == cultivo])
+    # El lote se agrupa por (finca, lote): 4 fincas x 5 lotes
+    assert len(estadisticas.por_nivel('lote')) == 20
+    assert estadisticas.consultar('cultivo', 'Trigo') is None
+
+
+def test_registrar_de_nuevo_reemplaza_la_observacion():
+    filas = filas_siembras()
+    estadisticas = EstadisticasIncrementales().cargar(filas)
+    # La siembra 0 recibe su cosecha y además cambia de cultivo
+    actualizada = dict(filas[0], rendimiento=9000.0, cultivo='Papa')
+    estadisticas.registrar(actualizada)
+    filas[0] = actualizada
+    comparar(estadisticas.consultar(), [f['rendimiento'] for f in filas])
+    comparar(estadisticas.consultar('cultivo', 'Maíz'),
+             [f['rendimiento'] for f in filas if f['cultivo'] == 'Maíz'])
+    comparar(estadisticas.consultar('cultivo', 'Papa'),
+             [f['rendimiento'] for f in filas if f['cultivo'] == 'Papa'])
+
+
+def test_rendimiento_nulo_cuenta_como_cero():
+    estadisticas = EstadisticasIncrementales().cargar([
+        {'id_siembra': 1, 'cultivo': 'Maíz', 'finca': 'F', 'lote': 'L', 'rendimiento': None},
+        {'id_siembra': 2, 'cultivo': 'Maíz', 'finca': 'F', 'lote': 'L', 'rendimiento': 10},
+    ])
+    assert estadisticas.consultar()['media'] == 5.0
+
+
+def test_combinar_particiones_disjuntas():
+    filas = filas_siembras()
+    total = EstadisticasIncrementales().cargar(filas[:120]).combinar(
+        EstadisticasIncrementales().cargar(filas[120:]))
+    unico = EstadisticasIncrementales().cargar(filas)
+    assert total.siembras.keys() == unico.siembras.keys()
+    for nivel in EstadisticasIncrementales.NIVELES:
+        combinados, esperados = total.por_nivel(nivel), unico.por_nivel(nivel)
+        assert combinados.keys() == esperados.keys()
+        for clave, resultado in combinados.items():
+            for campo in ('media', 'varianza', 'minimo', 'maximo', 'total_siembras'):
+                assert resultado[campo] == pytest.approx(esperados[clave][campo], rel=1e-9)
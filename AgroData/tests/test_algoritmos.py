@@ -0,0 +1,54 @@
+# Pruebas de la comparación de búsquedas y de la selección Top-k
+
+import pytest
+
+from modulos.algoritmos import Algoritmos
+from modulos.columnar import TablaColumnar
+
+
+def test_comparar_busqueda_recorre_una_vez_por_corrida(monkeypatch):
+    llamadas = {'lineal': 0, 'binaria': 0}
+    lineal = Algoritmos.busqueda_lineal
+    binaria = Algoritmos.busqueda_binaria
+
+    def contar_lineal(*args, **kwargs):
+        llamadas['lineal'] += 1
+        return lineal(*args, **kwargs)
+
+    def contar_binaria(*args, **kwargs):
+        llamadas['binaria'] += 1
+        return binaria(*args, **kwargs)
+
+    monkeypatch.setattr(Algoritmos, 'busqueda_lineal', staticmethod(contar_lineal))
+    monkeypatch.setattr(Algoritmos, 'busqueda_binaria', staticmethod(contar_binaria))
+
+    siembras = [{'id_siembra': i} for i in (7, 3, 9, 1)]
+    resultado = Algoritmos.comparar_algoritmos_busqueda(siembras, 9, repeticiones=1, calentamiento=0)
+
+    assert llamadas == {'lineal': 1, 'binaria': 1}
+    assert resultado['lineal']['encontrado'] and resultado['lineal']['indice'] == 2
+    assert resultado['binaria']['encontrado']
+    assert resultado['lineal']['tiempo'] >= 0
+
+
+def test_medir_tiempo_conserva_ultimo_resultado():
+    valores = iter(range(10))
+    medicion = Algoritmos.medir_tiempo(lambda: next(valores), repeticiones=3,
+                                       calentamiento=1, conservar_resultado=True)
+    assert medicion['repeticiones'] == 3
+    assert medicion['resultado'] == 3
+    assert 'resultado' not in Algoritmos.medir_tiempo(lambda: 1, repeticiones=1)
+
+
+@pytest.mark.parametrize('descendente', [True, False])
+def test_top_k_deja_faltantes_al_final(descendente):
+    filas = [{'id': 1, 'rendimiento': None}, {'id': 2, 'rendimiento': -4.0},
+             {'id': 3, 'rendimiento': 0.0}, {'id': 4, 'rendimiento': 12.5},
+             {'id': 5, 'rendimiento': None}]
+    esperado = [4, 3, 2, 1, 5] if descendente else [2, 3, 4, 1, 5]
+
+    for k in (3, 5):
+        top = Algoritmos.top_k(filas, k=k, descendente=descendente)
+        assert [f['id'] for f in top] == esperado[:k]
+        columnar = Algoritmos.top_k(TablaColumnar.desde_filas(filas), k=k, descendente=descendente)
+        assert [f['id'] for f in columnar] == esperado[:k]
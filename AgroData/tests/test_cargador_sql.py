@@ -0,0 +1,254 @@
+# Pruebas del tokenizador y de la unión de INSERT de CargadorSQL
+
+import pytest
+
+from modulos.cargador_sql import CargadorSQL
+
+
+def sentencias(texto):
+    return list(CargadorSQL.sentencias(texto))
+
+
+# ---------- Tokenizador ----------
+
+def test_separa_por_punto_y_coma():
+    assert sentencias("SELECT 1;\nSELECT 2;\n  SELECT 3") == ['SELECT 1', 'SELECT 2', 'SELECT 3']
+
+
+def test_omite_sentencias_vacias():
+    assert sentencias(";;\n ; SELECT 1;;\n") == ['SELECT 1']
+
+
+@pytest.mark.parametrize('literal', [
+    "'a;b'",
+    "'it\\'s; ok'",
+    "'dos '' comillas;'",
+    '"x;y"',
+    '"esc\\";"',
+    '`col;umna`',
+    "'--no es comentario'",
+    "'# tampoco'",
+    "'/* ni esto */'",
+])
+def test_delimitador_dentro_de_literales(literal):
+    assert sentencias(f"SELECT {literal};SELECT 2;") == [f"SELECT {literal}", 'SELECT 2']
+
+
+def test_descarta_comentarios():
+    texto = ("-- encabezado; con punto y coma\n"
+             "SELECT 1; # fin de línea;\n"
+             "SELECT /* en; medio */ 2;\n"
+             "/* bloque\n de; varias líneas */\n"
+             "SELECT 3;\n")
+    assert sentencias(texto) == ['SELECT 1', 'SELECT   2', 'SELECT 3']
+
+
+def test_guion_doble_sin_espacio_no_es_comentario():
+    # En MySQL "--" solo inicia comentario si le sigue un espacio
+    assert sentencias("SELECT 5--1;") == ['SELECT 5--1']
+
+
+def test_conserva_comentarios_ejecutables():
+    assert sentencias("/*!40101 SET NAMES utf8mb4 */;\nSELECT 1;") == [
+        '/*!40101 SET NAMES utf8mb4 */', 'SELECT 1']
+
+
+def test_bloques_delimiter():
+    texto = ("DROP PROCEDURE IF EXISTS p;\n"
+             "DELIMITER //\n"
+             "CREATE PROCEDURE p()\n"
+             "BEGIN\n"
+             "  SELECT 1;\n"
+             "  SELECT 'a//b';\n"
+             "END //\n"
+             "DELIMITER ;\n"
+             "CALL p();\n")
+    assert sentencias(texto) == [
+        'DROP PROCEDURE IF EXISTS p',
+        "CREATE PROCEDURE p()\nBEGIN\n  SELECT 1;\n  SELECT 'a//b';\nEND",
+        'CALL p()',
+    ]
+
+
+def test_delimiter_solo_al_inicio_de_sentencia():
+    # Dentro de una sentencia, DELIMITER es texto común
+    assert sentencias("SELECT 'x' AS\nDELIMITER;") == ["SELECT 'x' AS\nDELIMITER"]
+
+
+def test_ultima_sentencia_sin_delimitador_y_literal_sin_cerrar():
+    assert sentencias("SELECT 1;\nSELECT 'abierto") == ['SELECT 1', "SELECT 'abierto"]
+
+
+TEXTO_MIXTO = (
+    "-- volcado\n"
+    "/*!40101 SET NAMES utf8mb4 */;\n"
+    "INSERT INTO cultivo (nombre) VALUES ('Maíz; amarillo'), (\"Café\");\n"
+    "INSERT INTO t (a) VALUES ('it\\'s'); # comentario\n"
+    "/* bloque\n   largo; */ SELECT `a;b` FROM t;\n"
+    "DELIMITER $$\n"
+    "CREATE TRIGGER tg BEFORE INSERT ON t FOR EACH ROW\n"
+    "BEGIN\n  SET NEW.a = 'x;y';\nEND $$\n"
+    "DELIMITER ;\n"
+    "SELECT 'línea\nnueva';\n"
+)
+
+
+@pytest.mark.parametrize('partir', [
+    lambda t: [t],
+    lambda t: t.splitlines(keepends=True),
+    lambda t: list(t),
+    lambda t: [t[i:i + 7] for i in range(0, len(t), 7)],
+], ids=['completo', 'lineas', 'caracteres', 'trozos_7'])
+def test_resultado_no_depende_de_los_bloques(partir):
+    assert list(CargadorSQL.sentencias(partir(TEXTO_MIXTO))) == sentencias(TEXTO_MIXTO)
+
+
+def test_texto_mixto():
+    resultado = sentencias(TEXTO_MIXTO)
+    assert resultado[0] == '/*!40101 SET NAMES utf8mb4 */'
+    assert resultado[1] == "INSERT INTO cultivo (nombre) VALUES ('Maíz; amarillo'), (\"Café\")"
+    assert resultado[2] == "INSERT INTO t (a) VALUES ('it\\'s')"
+    assert resultado[3].endswith('SELECT `a;b` FROM t')
+    assert resultado[4].endswith("SET NEW.a = 'x;y';\nEND")
+    assert resultado[5] == "SELECT 'línea\nnueva'"
+    assert len(resultado) == 6
+
+
+def test_leer_bloques_descarta_bom_y_cuenta_bytes(tmp_path):
+    ruta = tmp_path / 'volcado.sql'
+    contenido = "SELECT 'ñ';\n" * 50
+    ruta.write_bytes(b'\xef\xbb\xbf' + contenido.encode('utf-8'))
+    contador = [0]
+    bloques = list(CargadorSQL.leer_bloques(ruta, tamano=64, contador=contador))
+    assert len(bloques) > 1
+    assert all(b.endswith('\n') for b in bloques)
+    assert ''.join(bloques) == contenido
+    assert contador[0] == ruta.stat().st_size
+    assert list(CargadorSQL.sentencias(bloques)) == ["SELECT 'ñ'"] * 50
+
+
+# ---------- INSERT extendidos ----------
+
+def agrupar(sentencias, **kwargs):
+    return list(CargadorSQL.agrupar_inserts(sentencias, **kwargs))
+
+
+def test_une_inserts_consecutivos_de_la_misma_tabla():
+    # Los espacios del prefijo se normalizan; cada sentencia cuenta como una de origen
+    resultado = agrupar([
+        "INSERT INTO t (a, b) VALUES (1, 'x')",
+        "INSERT INTO t (a, b) VALUES (2, 'y'), (3, 'z')",
+        "INSERT INTO t (a, b)\n VALUES (4, 'w')",
+    ])
+    assert resultado == [("INSERT INTO t (a, b) VALUES (1, 'x'),(2, 'y'), (3, 'z'),(4, 'w')", 3)]
+
+
+def test_no_une_tablas_o_columnas_distintas():
+    resultado = agrupar([
+        "INSERT INTO t (a) VALUES (1)",
+        "INSERT INTO u (a) VALUES (2)",
+        "INSERT INTO u (b) VALUES (3)",
+        "SELECT 1",
+        "INSERT INTO u (b) VALUES (4)",
+    ])
+    assert [origen for _, origen in resultado] == [1, 1, 1, 1, 1]
+    assert resultado[3] == ('SELECT 1', 1)
+
+
+@pytest.mark.parametrize('sentencia', [
+    "INSERT INTO t (a) VALUES (@x)",
+    "INSERT INTO t (a) VALUES (LAST_INSERT_ID())",
+    "INSERT INTO t (a) VALUES (1) ON DUPLICATE KEY UPDATE a = 1",
+])
+def test_no_une_sentencias_no_agrupables(sentencia):
+    resultado = agrupar(["INSERT INTO t (a) VALUES (0)", sentencia, "INSERT INTO t (a) VALUES (2)"])
+    assert resultado == [("INSERT INTO t (a) VALUES (0)", 1), (sentencia, 1), ("INSERT INTO t (a) VALUES (2)", 1)]
+
+
+def test_separa_la_ultima_fila_antes_de_last_insert_id():
+    dependiente = "INSERT INTO cosecha (id_siembra) VALUES (LAST_INSERT_ID())"
+    resultado = agrupar([
+        "INSERT INTO siembra (a) VALUES (1)",
+        "INSERT INTO siembra (a) VALUES (2)",
+        "INSERT INTO siembra (a) VALUES (3)",
+        dependiente,
+    ])
+    assert resultado == [
+        ("INSERT INTO siembra (a) VALUES (1),(2)", 2),
+        ("INSERT INTO siembra (a) VALUES (3)", 1),
+        (dependiente, 1),
+    ]
+
+
+def test_respeta_filas_por_insert_y_max_bytes():
+    filas = [f"INSERT INTO t (a) VALUES ({i:04d})" for i in range(10)]
+    por_filas = agrupar(filas, filas_por_insert=4)
+    assert [origen for _, origen in por_filas] == [4, 4, 2]
+
+    por_bytes = agrupar(filas, max_bytes=20)   # "(0000)" ocupa 6 bytes + coma
+    assert [origen for _, origen in por_bytes] == [3, 3, 3, 1]
+    assert all(len(sql.split('VALUES ', 1)[1]) <= 20 for sql, _ in por_bytes)
+
+    assert sum(origen for _, origen in por_filas) == sum(origen for _, origen in por_bytes) == 10
+
+
+# ---------- Ejecución ----------
+
+class CursorFalso:
+    def __init__(self, registro, fallar_en=None):
+        self.registro = registro
+        self.fallar_en = fallar_en
+        self.with_rows = False
+        self.rowcount = 0
+
+    def execute(self, sql):
+        if self.fallar_en and self.fallar_en in sql:
+            raise ValueError('fallo simulado')
+        self.registro.append(sql)
+        self.rowcount = sql.count('),(') + 1 if sql.startswith('INSERT') else 0
+
+    def close(self):
+        pass
+
+
+class ConexionFalsa:
+    def __init__(self, fallar_en=None):
+        self.ejecutadas, self.commits, self.rollbacks = [], 0, 0
+        self.fallar_en = fallar_en
+
+    def cursor(self):
+        return CursorFalso(self.ejecutadas, self.fallar_en)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_ejecutar_archivo(tmp_path):
+    ruta = tmp_path / 'seed.sql'
+    ruta.write_text("".join(f"INSERT INTO t (a) VALUES ({i});\n" for i in range(25)) + "SELECT 1;\n",
+                    encoding='utf-8')
+    conexion = ConexionFalsa()
+    resumen = CargadorSQL(conexion, tamano_lote=2, filas_por_insert=10).ejecutar_archivo(ruta)
+    assert resumen['sentencias'] == 4
+    assert resumen['sentencias_origen'] == 26
+    assert resumen['filas'] == 25
+    assert resumen['bytes'] == resumen['bytes_total'] == ruta.stat().st_size
+    assert conexion.commits == 3   # cada 2 sentencias y al final
+
+
+def test_ejecutar_revierte_en_error():
+    conexion = ConexionFalsa(fallar_en='roto')
+    cargador = CargadorSQL(conexion)
+    with pytest.raises(RuntimeError, match='sentencia 2'):
+        cargador.ejecutar(['SELECT 1', 'SELECT roto', 'SELECT 3'])
+    assert conexion.rollbacks == 1 and conexion.commits == 0
+
+
+def test_ejecutar_continua_en_error():
+    conexion = ConexionFalsa(fallar_en='roto')
+    resumen = CargadorSQL(conexion, continuar_en_error=True).ejecutar(['SELECT 1', 'SELECT roto', 'SELECT 3'])
+    assert resumen['errores'] == 1
+    assert conexion.ejecutadas == ['SELECT 1', 'SELECT 3']
@@ -0,0 +1,48 @@
+# Pruebas de la inferencia de tipos de TablaColumnar
+
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from modulos.columnar import TablaColumnar
+
+
+class CursorFalso:
+    def __init__(self, nombres, filas):
+        self.description = [(n,) for n in nombres]
+        self.filas = list(filas)
+
+    def fetchmany(self, tamano):
+        bloque, self.filas = self.filas[:tamano], self.filas[tamano:]
+        return bloque
+
+
+@pytest.mark.parametrize('valores, esperado', [
+    ([3, 5, 7], np.int64),
+    ([3, 2.5, 7], np.float64),
+    ([3, Decimal('2.75'), 7], np.float64),
+    ([3, None, 7], np.float64),
+    ([True, False], np.bool_),
+])
+def test_tipo_inferido_de_todos_los_valores(valores, esperado):
+    tabla = TablaColumnar.desde_filas([{'x': v} for v in valores])
+    assert tabla.columna('x').dtype == esperado
+    if esperado is np.float64:
+        np.testing.assert_array_equal(tabla.columna('x'),
+                                      [np.nan if v is None else float(v) for v in valores])
+
+
+def test_bloques_del_cursor_con_tipos_distintos():
+    filas = [(1, 'Maíz', date(2024, 3, 1)), (2, 'Papa', date(2024, 4, 1)),
+             (Decimal('2.5'), None, None), (None, None, None),
+             (4, 'Maíz', date(2024, 6, 1))]
+    tabla = TablaColumnar.desde_cursor(CursorFalso(['kg', 'cultivo', 'fecha'], filas), tamano_bloque=2)
+
+    assert tabla.columna('kg').dtype == np.float64
+    np.testing.assert_array_equal(tabla.columna('kg'), [1.0, 2.0, 2.5, np.nan, 4.0])
+    assert tabla.es_categorica('cultivo')
+    assert tabla.valores('cultivo').tolist() == ['Maíz', 'Papa', None, None, 'Maíz']
+    assert tabla.columna('fecha').dtype == np.dtype('datetime64[D]')
+    assert np.isnat(tabla.columna('fecha')).tolist() == [False, False, True, True, False]
@@ -0,0 +1,117 @@
+# Pruebas del caché de estadísticas incrementales validado por versión
+
+import pytest
+
+from modulos.consultas import SQL_HECHOS_SIEMBRA, SQL_VERSION_DATOS
+from modulos.columnar import TablaColumnar
+from modulos.estadisticas import EstadisticasAgricolas
+
+PREFIJO_HECHOS = SQL_HECHOS_SIEMBRA[:SQL_HECHOS_SIEMBRA.index('{filtro}')]
+
+
+class BaseFalsa:
+    """Siembras de un usuario y su versión de datos en memoria"""
+
+    def __init__(self):
+        self.version = 0
+        self.siembras = {}
+        self.lecturas_completas = 0
+
+    def escribir(self, id_siembra, cultivo, rendimiento):
+        # Como app.py: la escritura y luego el incremento de la versión
+        self.siembras[id_siembra] = {'id_siembra': id_siembra, 'cultivo': cultivo, 'finca': 'F',
+                                     'lote': 'L1', 'rendimiento': rendimiento}
+        self.version += 1
+
+    def cursor(self, dictionary=False):
+        return CursorFalso(self)
+
+
+class CursorFalso:
+    def __init__(self, base):
+        self.base = base
+        self.filas = []
+
+    def execute(self, sql, params=()):
+        if sql == SQL_VERSION_DATOS:
+            self.filas = [(self.base.version,)]
+        elif sql.startswith(PREFIJO_HECHOS):
+            if 's.id_siembra = %s' in sql:
+                self.filas = [dict(self.base.siembras[params[0]])]
+            else:
+                self.base.lecturas_completas += 1
+                self.filas = [dict(f) for f in self.base.siembras.values()]
+        else:
+            raise AssertionError(f'consulta inesperada: {sql}')
+
+    def fetchone(self):
+        return self.filas.pop(0)
+
+    def fetchmany(self, tamano):
+        bloque, self.filas = self.filas[:tamano], self.filas[tamano:]
+        return bloque
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def base():
+    EstadisticasAgricolas._incrementales.clear()
+    base = BaseFalsa()
+    for i, (cultivo, rendimiento) in enumerate([('Maíz', 100.0), ('Maíz', 200.0), ('Papa', 50.0)], 1):
+        base.escribir(i, cultivo, rendimiento)
+    yield base
+    EstadisticasAgricolas._incrementales.clear()
+
+
+def test_consultas_sin_escrituras_no_releen(base):
+    estadisticas = EstadisticasAgricolas(base)
+    assert estadisticas.estadisticas_descriptivas(7)['media'] == pytest.approx(350 / 3)
+    estadisticas.estadisticas_descriptivas(7)
+    estadisticas.estadisticas_por_grupo('cultivo', 7)
+    assert base.lecturas_completas == 1
+
+
+def test_escritura_propia_se_aplica_sin_releer(base):
+    estadisticas = EstadisticasAgricolas(base)
+    estadisticas.estadisticas_descriptivas(7)
+    base.escribir(2, 'Maíz', 400.0)          # La siembra 2 recibió otra cosecha
+    estadisticas.actualizar_siembra(2, 7)
+    assert estadisticas.estadisticas_descriptivas(7, 'cultivo', 'Maíz')['media'] == 250.0
+    assert base.lecturas_completas == 1
+
+
+def test_escritura_concurrente_reconstruye(base):
+    estadisticas = EstadisticasAgricolas(base)
+    estadisticas.estadisticas_descriptivas(7)
+    base.escribir(3, 'Papa', 80.0)           # Otro proceso: cosecha de otra siembra
+    base.escribir(2, 'Maíz', 400.0)          # Nuestra escritura
+    estadisticas.actualizar_siembra(2, 7)
+    assert EstadisticasAgricolas._incrementales.get(7) is None
+    assert estadisticas.estadisticas_descriptivas(7, 'cultivo', 'Papa')['media'] == 80.0
+    assert estadisticas.estadisticas_descriptivas(7, 'cultivo', 'Maíz')['media'] == 250.0
+    assert base.lecturas_completas == 2
+
+
+def test_escritura_de_otro_proceso_se_detecta_al_consultar(base):
+    estadisticas = EstadisticasAgricolas(base)
+    estadisticas.estadisticas_descriptivas(7)
+    base.escribir(4, 'Papa', 150.0)
+    assert estadisticas.estadisticas_descriptivas(7)['total_siembras'] == 4
+    assert base.lecturas_completas == 2
+
+
+def test_regresion_por_grupo_separa_lotes_homonimos_de_fincas_distintas():
+    filas = []
+    for id_finca, pendiente in ((1, 2.0), (2, -3.0)):
+        for x in range(1, 9):
+            filas.append({'id_finca': id_finca, 'finca': f'Finca {id_finca}', 'lote': 'Lote 1',
+                          'cantidad_insumos': float(x), 'rendimiento': 10 + pendiente * x})
+    tabla = TablaColumnar.desde_filas(filas, categoricas=('finca', 'lote'))
+
+    grupos = EstadisticasAgricolas(None).regresion_por_grupo(tabla=tabla, variables=('cantidad_insumos',))
+
+    assert [(g['id_finca'], g['finca'], g['lote'], g['n']) for g in grupos] == [
+        (1, 'Finca 1', 'Lote 1', 8), (2, 'Finca 2', 'Lote 1', 8)]
+    assert [g['coeficientes']['cantidad_insumos'] for g in grupos] == pytest.approx([2.0, -3.0])
@@ -0,0 +1,36 @@
+# Pruebas de reproducibilidad del generador de datos sintéticos
+
+import numpy as np
+import pytest
+
+from modulos.generador_datos import GeneradorDatos
+
+CULTIVOS = [
+    {'id_cultivo': 1, 'dias_cosecha_estimado': 120, 'rendimiento_esperado_kg_ha': 8000, 'precio_referencia_kg': 0.4},
+    {'id_cultivo': 2, 'dias_cosecha_estimado': 150, 'rendimiento_esperado_kg_ha': 20000, 'precio_referencia_kg': 0.3},
+]
+
+
+def generar(tamano_bloque, usuarios=250):
+    generador = GeneradorDatos(CULTIVOS, semilla=7, hoy='2026-01-15')
+    return GeneradorDatos.concatenar(list(generador.bloques(usuarios, tamano_bloque)))
+
+
+@pytest.mark.parametrize('tamano_bloque', [1, 100, 150, 1000])
+def test_datos_no_dependen_del_tamano_de_bloque(tamano_bloque):
+    referencia = generar(200)
+    datos = generar(tamano_bloque)
+    for tabla in GeneradorDatos.TABLAS:
+        for columna in GeneradorDatos.COLUMNAS[tabla]:
+            np.testing.assert_array_equal(datos[tabla][columna], referencia[tabla][columna])
+
+
+def test_ids_consecutivos_y_llaves_foraneas():
+    datos = generar(100)
+    assert len(datos['usuario']['id_usuario']) == 250
+    for tabla in GeneradorDatos.TABLAS:
+        ids = datos[tabla][GeneradorDatos.COLUMNAS[tabla][0]]
+        np.testing.assert_array_equal(ids, np.arange(1, len(ids) + 1))
+    assert np.isin(datos['finca']['user_id'], datos['usuario']['id_usuario']).all()
+    assert np.isin(datos['siembra']['id_lote'], datos['lote']['id_lote']).all()
+    assert np.isin(datos['cosecha']['id_siembra'], datos['siembra']['id_siembra']).all()
@@ -0,0 +1,92 @@
+# Pruebas de la regresión por lotes contra numpy y scipy
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from modulos.metodos_numericos import MetodosNumericos
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(5)
+    s, n = 40, 30
+    x = np.sort(rng.uniform(0, 365, size=(s, n)), axis=1)
+    pendientes = rng.normal(2, 1, size=s)
+    y = pendientes[:, None] * x + rng.normal(500, 50, size=(s, 1)) + rng.normal(0, 40, size=(s, n))
+    return x, y
+
+
+def test_regresion_simple_igual_a_linregress(series):
+    x, y = series
+    ajuste = MetodosNumericos.regresion_lote(x, y)
+    for i in range(len(x)):
+        esperado = stats.linregress(x[i], y[i])
+        assert ajuste['coeficientes'][i, 0] == pytest.approx(esperado.slope, rel=1e-9)
+        assert ajuste['intercepto'][i] == pytest.approx(esperado.intercept, rel=1e-9)
+        assert ajuste['r_cuadrado'][i] == pytest.approx(esperado.rvalue ** 2, rel=1e-9)
+        assert ajuste['error_std'][i, 0] == pytest.approx(esperado.stderr, rel=1e-8)
+        assert ajuste['error_std_intercepto'][i] == pytest.approx(esperado.intercept_stderr, rel=1e-8)
+    assert (ajuste['n'] == x.shape[1]).all()
+
+
+def test_regresion_multiple_igual_a_lstsq():
+    rng = np.random.default_rng(9)
+    s, n, p = 12, 50, 3
+    X = rng.normal(size=(s, n, p))
+    y = np.einsum('snp,sp->sn', X, rng.normal(size=(s, p))) + 4 + rng.normal(0, 0.1, size=(s, n))
+    ajuste = MetodosNumericos.regresion_lote(X, y)
+    for i in range(s):
+        diseno = np.column_stack([np.ones(n), X[i]])
+        beta = np.linalg.lstsq(diseno, y[i], rcond=None)[0]
+        np.testing.assert_allclose(ajuste['intercepto'][i], beta[0], rtol=1e-9)
+        np.testing.assert_allclose(ajuste['coeficientes'][i], beta[1:], rtol=1e-8)
+
+        residuos = y[i] - diseno @ beta
+        sigma2 = residuos @ residuos / (n - p - 1)
+        errores = np.sqrt(sigma2 * np.diag(np.linalg.inv(diseno.T @ diseno)))
+        np.testing.assert_allclose(ajuste['error_std_intercepto'][i], errores[0], rtol=1e-7)
+        np.testing.assert_allclose(ajuste['error_std'][i], errores[1:], rtol=1e-7)
+
+
+def test_series_de_distinto_largo_con_nan_y_mascara(series):
+    x, y = series
+    x, y = x.copy(), y.copy()
+    largos = np.random.default_rng(1).integers(6, x.shape[1] + 1, size=len(x))
+    mascara = np.ones_like(x, dtype=bool)
+    for i, largo in enumerate(largos):
+        y[i, largo:] = np.nan          # Relleno con NaN
+    mascara[::2, :3] = False            # Además se excluyen puntos con la máscara
+    ajuste = MetodosNumericos.regresion_lote(x, y, mascara)
+    for i, largo in enumerate(largos):
+        validos = mascara[i, :largo]
+        pendiente, intercepto = np.polyfit(x[i, :largo][validos], y[i, :largo][validos], 1)
+        assert ajuste['n'][i] == validos.sum()
+        assert ajuste['coeficientes'][i, 0] == pytest.approx(pendiente, rel=1e-8)
+        assert ajuste['intercepto'][i] == pytest.approx(intercepto, rel=1e-8)
+
+
+def test_series_invalidas_quedan_en_nan():
+    x = np.array([[1.0, 2.0, 3.0, 4.0],     # válida
+                  [1.0, 2.0, np.nan, np.nan],   # solo 2 puntos (< p + 2)
+                  [2.0, 2.0, 2.0, 2.0],     # x constante
+                  [1.0, 2.0, 3.0, 4.0]])    # y constante
+    y = np.array([[2.0, 4.1, 5.9, 8.0],
+                  [1.0, 2.0, 3.0, 4.0],
+                  [1.0, 2.0, 3.0, 4.0],
+                  [5.0, 5.0, 5.0, 5.0]])
+    ajuste = MetodosNumericos.regresion_lote(x, y)
+    assert not np.isnan(ajuste['coeficientes'][0, 0])
+    for campo in ('intercepto', 'r_cuadrado', 'error_std_intercepto'):
+        assert np.isnan(ajuste[campo][1:]).all()
+    assert np.isnan(ajuste['coeficientes'][1:]).all()
+    assert np.isnan(ajuste['error_std'][1:]).all()
+
+
+def test_tendencia_lineal_lote_igual_a_la_version_por_serie(series):
+    x, y = series
+    pendientes, ordenadas = MetodosNumericos.tendencia_lineal_lote(x, y)
+    for i in range(len(x)):
+        m, b = MetodosNumericos.calcular_tendencia_lineal(x[i], y[i])
+        assert pendientes[i] == pytest.approx(m, rel=1e-9)
+        assert ordenadas[i] == pytest.approx(b, rel=1e-9)
@@ -0,0 +1,88 @@
+# Pruebas de las reducciones por segmentos contra numpy y scipy
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from modulos.segmentos import Segmentos
+
+
+@pytest.fixture
+def tabla():
+    rng = np.random.default_rng(11)
+    n = 2000
+    cultivo = rng.choice(np.array(['Maíz', 'Papa', 'Café', 'Arroz']), size=n)
+    finca = rng.integers(1, 6, size=n)
+    x = rng.uniform(10, 200, size=n)
+    y = 25 * x + rng.normal(0, 300, size=n) + (finca * 100)
+    return cultivo, finca, x, y
+
+
+def grupos_numpy(cultivo, finca):
+    """{(cultivo, finca): índices} calculado grupo por grupo"""
+    return {(c, int(f)): np.flatnonzero((cultivo == c) & (finca == f))
+            for c, f in sorted(set(zip(cultivo.tolist(), finca.tolist())))}
+
+
+def test_etiquetas_y_conteos(tabla):
+    cultivo, finca, _, _ = tabla
+    segmentos = Segmentos([cultivo, finca])
+    esperados = grupos_numpy(cultivo, finca)
+    assert segmentos.etiquetas() == list(esperados)
+    assert segmentos.conteos.tolist() == [len(i) for i in esperados.values()]
+    assert len(segmentos) == len(esperados)
+
+
+def test_reducciones_igual_a_numpy(tabla):
+    cultivo, finca, _, y = tabla
+    segmentos = Segmentos([cultivo, finca])
+    indices = list(grupos_numpy(cultivo, finca).values())
+    np.testing.assert_allclose(segmentos.suma(y), [y[i].sum() for i in indices], rtol=1e-12)
+    np.testing.assert_allclose(segmentos.media(y), [y[i].mean() for i in indices], rtol=1e-12)
+    np.testing.assert_allclose(segmentos.varianza(y), [y[i].var(ddof=1) for i in indices], rtol=1e-10)
+    np.testing.assert_allclose(segmentos.varianza(y, ddof=0), [y[i].var() for i in indices], rtol=1e-10)
+    np.testing.assert_allclose(segmentos.desviacion(y), [y[i].std(ddof=1) for i in indices], rtol=1e-10)
+    np.testing.assert_array_equal(segmentos.minimo(y), [y[i].min() for i in indices])
+    np.testing.assert_array_equal(segmentos.maximo(y), [y[i].max() for i in indices])
+
+
+def test_cuantiles_igual_a_np_quantile(tabla):
+    cultivo, finca, _, y = tabla
+    segmentos = Segmentos([cultivo, finca])
+    indices = list(grupos_numpy(cultivo, finca).values())
+    qs = (0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+    np.testing.assert_allclose(segmentos.cuantiles(y, qs), [np.quantile(y[i], qs) for i in indices], rtol=1e-12)
+    np.testing.assert_allclose(segmentos.mediana(y), [np.median(y[i]) for i in indices], rtol=1e-12)
+
+
+def test_correlacion_y_regresion_igual_a_scipy(tabla):
+    cultivo, _, x, y = tabla
+    segmentos = Segmentos([cultivo])
+    correlacion = segmentos.correlacion(x, y)
+    regresion = segmentos.regresion(x, y)
+    for g, (nombre,) in enumerate(segmentos.etiquetas()):
+        i = cultivo == nombre
+        ajuste = stats.linregress(x[i], y[i])
+        assert correlacion[g] == pytest.approx(stats.pearsonr(x[i], y[i])[0], rel=1e-10)
+        assert regresion['pendiente'][g] == pytest.approx(ajuste.slope, rel=1e-10)
+        assert regresion['intercepto'][g] == pytest.approx(ajuste.intercept, rel=1e-9)
+        assert regresion['r_cuadrado'][g] == pytest.approx(ajuste.rvalue ** 2, rel=1e-10)
+        assert regresion['error_std'][g] == pytest.approx(ajuste.stderr, rel=1e-9)
+
+
+def test_grupos_degenerados():
+    segmentos = Segmentos([np.array([1, 1, 2, 3, 3])])
+    x = np.array([1.0, 1.0, 5.0, 2.0, 4.0])
+    y = np.array([3.0, 7.0, 1.0, 2.0, 2.0])
+    assert np.isnan(segmentos.varianza(y)[1])            # Un solo valor con ddof=1
+    correlacion = segmentos.correlacion(x, y)
+    assert np.isnan(correlacion[0]) and np.isnan(correlacion[2])   # x o y constantes
+    assert np.isnan(segmentos.regresion(x, y)['pendiente'][0])
+
+
+def test_sin_filas():
+    segmentos = Segmentos([np.array([], dtype=np.int64)])
+    assert len(segmentos) == 0
+    assert segmentos.media([]).shape == (0,)
+    assert segmentos.cuantiles([], (0.5, 0.9)).shape == (0, 2)
+    assert segmentos.regresion([], [])['pendiente'].shape == (0,)
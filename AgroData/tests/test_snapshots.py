@@ -0,0 +1,128 @@
+# Pruebas de los snapshots por finca con una conexión simulada
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from modulos.consultas import ESTADOS_FINALES, SQL_HECHOS_SIEMBRA, SQL_IDS_SIEMBRA_FINCA
+from modulos.estadisticas import EstadisticasAgricolas
+from modulos.snapshots import SnapshotsAnaliticos
+
+COLUMNAS = ['id_siembra', 'anio', 'id_finca', 'finca', 'lote', 'cultivo', 'estado', 'fecha_siembra',
+            'area_sembrada', 'ph_suelo', 'dias_cosecha', 'costo_siembra', 'total_kg', 'rendimiento',
+            'ingreso_total', 'costo_insumos', 'cantidad_insumos']
+PREFIJO_HECHOS = SQL_HECHOS_SIEMBRA[:SQL_HECHOS_SIEMBRA.index('{filtro}')]
+
+
+class BaseFalsa:
+    """Siembras de una finca en memoria; responde las consultas que usan los snapshots"""
+
+    def __init__(self):
+        self.siembras = {}  # id -> {'fecha', 'estado', 'cosechas': [(fecha, kg)]}
+
+    def sembrar(self, id_siembra, fecha, estado='crecimiento', cosechas=()):
+        self.siembras[id_siembra] = {'fecha': fecha, 'estado': estado, 'cosechas': list(cosechas)}
+
+    def cosechar(self, id_siembra, fecha, kg=1000.0):
+        self.siembras[id_siembra]['cosechas'].append((fecha, kg))
+        self.siembras[id_siembra]['estado'] = 'cosechado'
+
+    def cerrada(self, s, corte):
+        fechas = [f for f, _ in s['cosechas']]
+        return s['fecha'] < corte and (s['estado'] in ESTADOS_FINALES or (
+            bool(fechas) and all(f < corte for f in fechas)))
+
+    def fila(self, id_siembra):
+        s = self.siembras[id_siembra]
+        kg = sum(k for _, k in s['cosechas'])
+        dias = (min(f for f, _ in s['cosechas']) - s['fecha']).days if s['cosechas'] else None
+        return (id_siembra, s['fecha'].year, 1, 'Finca', 'L1', 'Maíz', s['estado'], s['fecha'],
+                2.0, 6.5, dias, 100.0, kg, kg / 2.0, kg * 0.5, 0.0, 0.0)
+
+    def cursor(self, dictionary=False):
+        return CursorFalso(self)
+
+
+class CursorFalso:
+    def __init__(self, base):
+        self.base = base
+        self.filas, self.description = [], []
+
+    def execute(self, sql, params=()):
+        base = self.base
+        if sql == SQL_IDS_SIEMBRA_FINCA:
+            self.description = [('id_siembra',)]
+            self.filas = [(i,) for i in base.siembras]
+            return
+        self.description = [(c,) for c in COLUMNAS]
+        if not sql.startswith(PREFIJO_HECHOS):
+            self.filas = []   # cosechas y aplicaciones: no se usan en estas pruebas
+            return
+        if 'NOT EXISTS' in sql:
+            # Exportación: siembras cerradas al corte
+            corte = params[1]
+            ids = [i for i, s in base.siembras.items() if base.cerrada(s, corte)]
+        elif len(params) > 1:
+            # Lectura en vivo: solo las que no están en el snapshot
+            assert 'cosecha cx' not in sql
+            ultimo, pendientes = params[1], set(params[2:])
+            ids = [i for i in base.siembras if i > ultimo or i in pendientes]
+        else:
+            ids = list(base.siembras)
+        self.filas = [base.fila(i) for i in sorted(ids)]
+
+    def fetchmany(self, tamano):
+        bloque, self.filas = self.filas[:tamano], self.filas[tamano:]
+        return bloque
+
+    def fetchall(self):
+        return self.fetchmany(len(self.filas))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def base():
+    base = BaseFalsa()
+    base.sembrar(1, date(2024, 3, 1), 'cosechado', [(date(2024, 8, 1), 800.0)])
+    base.sembrar(2, date(2024, 11, 20))                                # En el suelo al exportar
+    base.sembrar(3, date(2024, 5, 1), 'crecimiento', [(date(2024, 9, 1), 500.0)])
+    return base
+
+
+def test_abierta_al_exportar_y_cosechada_despues(base, tmp_path):
+    manifest = SnapshotsAnaliticos.exportar_finca(base, tmp_path, 1, hasta_anio=2024)
+    assert manifest['ultimo_id_siembra'] == 3
+    assert manifest['siembras_pendientes'] == 1
+    cerradas = SnapshotsAnaliticos.cargar(tmp_path, 1, 'siembra')
+    assert sorted(cerradas.columna('id_siembra').tolist()) == [1, 3]
+
+    base.cosechar(2, date(2025, 2, 10), 1200.0)   # Ahora cuenta como cerrada
+    base.cosechar(3, date(2025, 1, 15), 300.0)    # Ahora cuenta como abierta
+    base.sembrar(4, date(2025, 3, 1))             # Temporada nueva
+    base.sembrar(5, date(2024, 6, 1))             # Registrada tarde con fecha pasada
+
+    historico = EstadisticasAgricolas(base).historico_siembras(1, tmp_path)
+    ids = historico.columna('id_siembra').tolist()
+    assert sorted(ids) == [1, 2, 3, 4, 5]
+    fila_2 = historico.fila(ids.index(2))
+    assert fila_2['total_kg'] == 1200.0 and fila_2['estado'] == 'cosechado'
+
+
+def test_sin_snapshot_vigente_lee_todo_de_mysql(base, tmp_path):
+    historico = EstadisticasAgricolas(base).historico_siembras(1, tmp_path)
+    assert sorted(historico.columna('id_siembra').tolist()) == [1, 2, 3]
+
+
+def test_pendientes_vacias(tmp_path):
+    base = BaseFalsa()
+    base.sembrar(7, date(2023, 4, 1), 'perdido')
+    SnapshotsAnaliticos.exportar_finca(base, tmp_path, 1, hasta_anio=2024)
+    ultimo, pendientes = SnapshotsAnaliticos.no_exportadas(
+        tmp_path, 1, SnapshotsAnaliticos.manifest(tmp_path, 1))
+    assert ultimo == 7 and len(pendientes) == 0 and pendientes.dtype == np.int64
+    base.sembrar(8, date(2025, 1, 5))
+    historico = EstadisticasAgricolas(base).historico_siembras(1, tmp_path)
+    assert sorted(historico.columna('id_siembra').tolist()) == [7, 8]